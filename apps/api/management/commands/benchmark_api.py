@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Command benchmark_api to compare the serialization of API list pages.
+
+For each resource, a list page is dehydrated from model instances (the
+tastypie way) and from values() rows, if the resource allows, and encoded as
+JSON, NDJSON and MessagePack. Resources with an export, like smsregister,
+are compared with it, too. Reports the time of the whole request, of
+encoding alone and the size of the payload.
+"""
+__docformat__ = 'epytext en'
+
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test.client import RequestFactory
+from django.utils.importlib import import_module
+
+
+#: resources benchmarked by default, numeric heavy lists
+RESOURCES = (
+    'api.resources.res_votingrecord.VotingRecordResultResource',
+    'api.resources.res_incomedeclaration.DeclarationWageResource',
+    'api.resources.res_incomedeclaration.DeclarationDepositResource',
+    'api.resources.res_incomedeclaration.IncomeDeclarationResource',
+    'api.resources.res_smsregister.SMSRegisterResource',
+)
+#: formats compared, if supported by the serializer
+FORMATS = ('json', 'ndjson', 'msgpack')
+
+
+
+class Command (BaseCommand):
+    """Command to benchmark serialization of API list pages."""
+    args = '[<dotted path of resource class> ...]'
+    #: help string
+    help = 'Compares time and size of API list pages by dehydration and format.'
+    #: options
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--limit',
+            dest='limit',
+            type='int',
+            default=500,
+            help='Number of objects per page.'
+        ),
+        make_option(
+            '--repeat',
+            dest='repeat',
+            type='int',
+            default=5,
+            help='Number of runs, the fastest one is reported.'
+        ),
+    )
+
+
+    def _get_resource (self, path):
+        """Instantiate the resource of given dotted path."""
+        module, name = path.rsplit('.', 1)
+        try:
+            return getattr(import_module(module), name)(api_name='v1')
+        except (ImportError, AttributeError), e:
+            raise CommandError('Unknown resource %s: %s' % (path, e))
+
+
+    def _time (self, func):
+        """Get the result of given function and its fastest time in ms."""
+        best = None
+        for i in xrange(self.repeat):
+            started = time.time()
+            result = func()
+            elapsed = (time.time() - started) * 1000
+            best = elapsed if best is None else min(best, elapsed)
+        return result, best
+
+
+    def _benchmark (self, resource, get_list, format):
+        """Benchmark a list page.
+
+        @param resource: the resource
+        @type resource: tastypie.resources.Resource
+        @param get_list: unbound get_list to dehydrate with
+        @type get_list: function
+        @param format: short name of the format
+        @type format: str
+        @return: time of request and of encoding in ms, size in bytes
+        @rtype: (float, float, int)
+        """
+        request = RequestFactory().get('/', {'format': format,
+            'limit': str(self.limit)})
+        response, total = self._time(lambda: get_list(resource, request))
+
+        # encode the dehydrated page again, without fetching it
+        pages = []
+        create_response = resource.create_response
+        resource.create_response = lambda request, data: pages.append(data) or HttpResponse()
+        try:
+            get_list(resource, request)
+        finally:
+            resource.create_response = create_response
+        mime = resource._meta.serializer.get_mime_for_format(format)
+        content, encode = self._time(lambda: resource.serialize(request, pages[0], mime))
+        return total, encode, len(response.content)
+
+
+    def handle (self, *args, **options):
+        """Command handler."""
+        from tastypie.resources import Resource
+        from api.resources.common import ValuesMixin, _get_value_columns
+        self.limit = options.get('limit')
+        self.repeat = max(1, options.get('repeat'))
+
+        self.stdout.write('%-28s %-9s %-8s %10s %10s %10s\n' % (
+            'resource', 'dehydrate', 'format', 'total ms', 'encode ms', 'bytes'))
+        for path in args or RESOURCES:
+            resource = self._get_resource(path)
+            paths = [('objects', Resource.get_list)]
+            if isinstance(resource, ValuesMixin) and _get_value_columns(resource,
+                    resource._meta.object_class, resource.fields) is not None:
+                paths.append(('values', ValuesMixin.get_list))
+            if hasattr(resource, 'get_export'):
+                paths.append(('export', type(resource).get_export))
+            for name, get_list in paths:
+                for format in FORMATS:
+                    if format not in resource._meta.serializer.formats:
+                        continue
+                    total, encode, size = self._benchmark(resource, get_list, format)
+                    self.stdout.write('%-28s %-9s %-8s %10.1f %10.1f %10d\n' % (
+                        type(resource).__name__, name, format, total, encode, size))
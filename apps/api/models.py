@@ -1,5 +1,30 @@
 # -*- coding: utf-8 -*-
 
-from django.db import models
+"""
+Models api
 
-# Create your models here.
+There are none, but API responses are versioned by the data versions of the
+models they show, so saves and deletes of any model bump its version here.
+"""
+__docformat__ = 'epytext en'
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from util import versions
+
+
+
+@receiver(post_save, dispatch_uid='apps.api.post_save.bump_version')
+@receiver(post_delete, dispatch_uid='apps.api.post_delete.bump_version')
+def bump_version (sender, **kwargs):
+    """Bump the data version of a saved or deleted object's model."""
+    versions.bump(sender)
+
+
+
+@receiver(m2m_changed, dispatch_uid='apps.api.m2m_changed.bump_version')
+def bump_version_m2m (sender, instance, model, action, **kwargs):
+    """Bump the data versions of the models of a changed many-to-many relation."""
+    if action.startswith('post_'):
+        versions.bump(sender, type(instance), model)
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+
+"""
+Paginator api
+
+Cursor pagination as an alternative to tastypie's limit/offset pagination.
+
+Clients opt in with the parameter C{cursor}, empty for the first page. Pages
+are then found by the values of the ordering columns of the last row seen
+(keyset pagination), so each page costs the same however deep into the list
+it is, and rows inserted or deleted meanwhile, e.g. by an import, don't shift
+the following pages. The total count is only computed if asked for with
+C{total_count=1}.
+"""
+__docformat__ = 'epytext en'
+
+import base64
+import binascii
+import json
+from urllib import urlencode
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.query import QuerySet
+from django.db.models.sql.constants import LOOKUP_SEP
+from tastypie.exceptions import BadRequest
+from tastypie.paginator import Paginator
+
+
+#: internal types of columns which may hold NULL even if the field doesn't
+#: say so, see util's command drop_varchar_notnull
+NULLABLE_TYPES = ('CharField', 'TextField')
+#: alias of the selected IS NULL of a nullable ordering column
+NULL_ALIAS = '_cursor_null_%d'
+
+
+
+class Key (object):
+    """Ordering column of a cursor."""
+
+    def __init__ (self, field, descending, is_pk=False):
+        """
+        @param field: model field
+        @type field: django.db.models.Field
+        @param descending: True if ordered descending
+        @type descending: bool
+        @param is_pk: True if field is the primary key
+        @type is_pk: bool
+        """
+        #: model field
+        self.field = field
+        #: True if ordered descending
+        self.descending = descending
+        #: lookup in filters
+        self.name = 'pk' if is_pk else field.name
+        #: lookup in order_by, foreign keys are ordered by their column
+        #: instead of the related model's ordering
+        self.order = self.name
+        if field.rel and not is_pk:
+            self.order += LOOKUP_SEP + field.rel.get_related_field().name
+        #: True if the column may hold NULL
+        self.null = not is_pk and (field.null or
+            field.get_internal_type() in NULLABLE_TYPES)
+
+
+    def value (self, obj):
+        """Get the value of the column of given object or values() row."""
+        if isinstance(obj, dict):
+            return obj[self.name]
+        return getattr(obj, self.field.attname)
+
+
+
+class CursorPaginator (Paginator):
+    """Paginator walking lists with opaque cursors if asked to, with limit
+    and offset otherwise.
+
+    NULLs are ordered last in either direction, whatever the database does.
+    Ordering by fields of related models isn't supported.
+    """
+    #: fields to fetch with values() instead of model instances, None for
+    #: instances
+    values = None
+
+    def get_keys (self):
+        """Get the ordering columns of the objects, made unique by the primary
+        key.
+
+        @return: ordering columns
+        @rtype: [ Key ]
+        """
+        query = self.objects.query
+        opts = self.objects.model._meta
+        ordering = query.order_by or (query.default_ordering and opts.ordering) or []
+
+        keys = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name == 'pk' or name == opts.pk.name:
+                keys.append(Key(opts.pk, descending, True))
+                break
+            if name == '?' or LOOKUP_SEP in name:
+                raise BadRequest("Cursors can't be used when ordering by '%s'." % name)
+            try:
+                field = opts.get_field(name)
+            except FieldDoesNotExist:
+                raise BadRequest("Cursors can't be used when ordering by '%s'." % name)
+            keys.append(Key(field, descending))
+        else:
+            keys.append(Key(opts.pk, False, True))
+        return keys
+
+
+    def get_ordered (self, keys):
+        """Order the objects by given columns, NULLs last.
+
+        @param keys: ordering columns
+        @type keys: [ Key ]
+        @return: ordered objects
+        @rtype: QuerySet
+        """
+        qn = connections[self.objects.db].ops.quote_name
+        select = {}
+        order_by = []
+        for i, key in enumerate(keys):
+            if key.null:
+                alias = NULL_ALIAS % i
+                select[alias] = '%s.%s IS NULL' % (
+                    qn(key.field.model._meta.db_table), qn(key.field.column))
+                order_by.append(alias)
+            order_by.append(('-' if key.descending else '') + key.order)
+        return self.objects.extra(select=select).order_by(*order_by)
+
+
+    def get_after (self, keys, values):
+        """Get the filter for objects after given values, in the order of
+        given columns.
+
+        @param keys: ordering columns
+        @type keys: [ Key ]
+        @param values: values of the last object seen
+        @type values: list
+        @return: filter, None if nothing comes after
+        @rtype: Q
+        """
+        after = same = None
+        for key, value in zip(keys, values):
+            if value is None:
+                # NULLs are last, nothing comes after in this column
+                later = None
+                equal = Q(**{key.name + '__isnull': True})
+            else:
+                lookup = key.name + ('__lt' if key.descending else '__gt')
+                later = Q(**{lookup: value})
+                if key.null:
+                    later |= Q(**{key.name + '__isnull': True})
+                equal = Q(**{key.name: value})
+
+            if later is not None:
+                if same is not None:
+                    later = same & later
+                after = later if after is None else after | later
+            same = equal if same is None else same & equal
+        return after
+
+
+    def encode (self, keys, obj):
+        """Encode the cursor pointing after given object.
+
+        @param keys: ordering columns
+        @type keys: [ Key ]
+        @param obj: last object seen
+        @type obj: django.db.models.Model
+        @return: opaque cursor
+        @rtype: str
+        """
+        values = []
+        for key in keys:
+            value = key.value(obj)
+            if not (value is None or isinstance(value, (int, long, float, basestring))):
+                value = unicode(value)
+            values.append(value)
+        data = json.dumps([[k.order for k in keys], values], separators=(',', ':'))
+        return base64.urlsafe_b64encode(data).rstrip('=')
+
+
+    def decode (self, keys, cursor):
+        """Decode given cursor.
+
+        @param keys: ordering columns
+        @type keys: [ Key ]
+        @param cursor: opaque cursor
+        @type cursor: str
+        @return: values of the last object seen
+        @rtype: list
+        """
+        try:
+            cursor = str(cursor)
+            orders, values = json.loads(base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)))
+            if orders != [k.order for k in keys] or len(values) != len(keys):
+                raise ValueError(cursor)
+            return [value if value is None else key.field.to_python(value)
+                for key, value in zip(keys, values)]
+        except (TypeError, ValueError, UnicodeError, binascii.Error, ValidationError):
+            raise BadRequest("Invalid cursor '%s' provided." % cursor)
+
+
+    def get_cursor_uri (self, limit, cursor):
+        """Get the URL of the page at given cursor."""
+        if self.resource_uri is None:
+            return None
+
+        request_params = dict([k, v.encode('utf-8')] for k, v in self.request_data.items())
+        request_params.pop('offset', None)
+        request_params.update({'limit': limit, 'cursor': cursor})
+        return '%s?%s' % (self.resource_uri, urlencode(request_params))
+
+
+    def get_values (self, keys):
+        """Get the fields to fetch with values(), including the ordering
+        columns.
+
+        @param keys: ordering columns
+        @type keys: [ Key ]
+        @return: names of fields and extra selects
+        @rtype: [ str ]
+        """
+        names = list(self.values)
+        for i, key in enumerate(keys):
+            if key.name not in names:
+                names.append(key.name)
+            if key.null:
+                names.append(NULL_ALIAS % i)
+        return names
+
+
+    def page (self):
+        if not isinstance(self.objects, QuerySet):
+            return super(CursorPaginator, self).page()
+        if 'cursor' not in self.request_data:
+            if self.values is not None:
+                self.objects = self.objects.values(*self.values)
+            return super(CursorPaginator, self).page()
+
+        limit = self.get_limit()
+        keys = self.get_keys()
+        objects = self.get_ordered(keys)
+        cursor = self.request_data['cursor']
+        if cursor:
+            after = self.get_after(keys, self.decode(keys, cursor))
+            objects = objects.none() if after is None else objects.filter(after)
+        if self.values is not None:
+            objects = objects.values(*self.get_values(keys))
+
+        if limit:
+            # one more to tell whether there is a next page
+            objects = list(objects[:limit + 1])
+            more = len(objects) > limit
+            objects = objects[:limit]
+        else:
+            objects = list(objects)
+            more = False
+
+        meta = {
+            'limit': limit,
+            'cursor': cursor or None,
+            'next': None,
+        }
+        if more:
+            meta['next'] = self.get_cursor_uri(limit, self.encode(keys, objects[-1]))
+        if self.request_data.get('total_count') in ('1', 'true'):
+            meta['total_count'] = self.get_count()
+
+        return {
+            'objects': objects,
+            'meta': meta,
+        }
@@ -5,20 +5,693 @@ Resources common
 """
 __docformat__ = 'epytext en'
 
-
+import copy
+import hashlib
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import ForeignKey, ManyToManyField
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.query import QuerySet
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils.translation import get_language
+from tastypie import fields
+from tastypie.bundle import Bundle
 from tastypie.cache import SimpleCache
+from tastypie.exceptions import BadRequest
+from tastypie.paginator import Paginator
 from tastypie.resources import ModelResource, Resource
+from tastypie.serializers import Serializer
 from tastypie.throttle import CacheThrottle
 
+from api.paginator import CursorPaginator
+from api.serializers import CommonSerializer
+from util import versions
+
 
 ALLOWED_METHODS =[ 'get' ]
 CACHE = SimpleCache()
 THROTTLE = CacheThrottle(throttle_at=150, timeframe=3600)
 DEFAULT_FORMAT = 'application/json'
+#: attribute of objects holding prefetched related objects by field attribute
+PREFETCHED = '_prefetched'
+#: how deep full ToOneFields are followed by select_related
+SELECT_RELATED_DEPTH = 3
+#: seconds serialized GET responses are cached
+RESPONSE_TIMEOUT = 60 * 60
+#: attribute of requests holding the resource handling it and its selected fields
+SELECTED = '_api_selected'
+#: fields always kept by the parameter fields
+ALWAYS_SELECTED = ('resource_uri',)
+
+
+
+def select_fields (resource, options):
+    """Get the fields of given resource selected by the request.
+
+    The parameter C{fields} lists the fields to show, C{exclude} those not to
+    show, both comma separated. C{full=0} shows related resources as URIs
+    instead of nesting them.
+
+    @param resource: resource handling the request
+    @type resource: tastypie.resources.Resource
+    @param options: request parameters
+    @type options: django.http.QueryDict
+    @return: selected fields by name
+    @rtype: { str: tastypie.fields.ApiField }
+    """
+    selected = resource.fields
+    for param in ('fields', 'exclude'):
+        names = set(n.strip() for n in options.get(param, '').split(',') if n.strip())
+        unknown = names - set(resource.fields)
+        if unknown:
+            raise BadRequest("Invalid %s '%s' provided." % (param, ','.join(sorted(unknown))))
+        if names:
+            if param == 'fields':
+                names.update(ALWAYS_SELECTED)
+                selected = dict((k, v) for k, v in selected.iteritems() if k in names)
+            else:
+                selected = dict((k, v) for k, v in selected.iteritems() if k not in names)
+
+    if options.get('full') in ('0', 'false'):
+        flat = {}
+        for name, field in selected.iteritems():
+            if getattr(field, 'full', False):
+                field = copy.copy(field)
+                field.full = False
+            flat[name] = field
+        selected = flat
+    return selected
+
+
+
+def _translations (model, attribute):
+    """Get the modeltranslation columns of given field.
+
+    @param model: the model
+    @type model: django.db.models.Model
+    @param attribute: name of the field
+    @type attribute: str
+    @return: names of the translated fields by language code
+    @rtype: { str: str }
+    """
+    names = model._meta.get_all_field_names()
+    return dict((code, attribute + '_' + code) for code, name in settings.LANGUAGES
+        if attribute + '_' + code in names)
+
+
+
+def _get_columns (resource, model, selected):
+    """Get the columns needed to dehydrate given fields of a resource.
+
+    @param resource: the resource
+    @type resource: tastypie.resources.ModelResource
+    @param model: model of the resource
+    @type model: django.db.models.Model
+    @param selected: selected fields by name
+    @type selected: { str: tastypie.fields.ApiField }
+    @return: names of model fields, None if they can't be told, e.g. for
+        fields dehydrated by methods
+    @rtype: set
+    """
+    columns = set()
+    if type(resource).dehydrate.im_func is not Resource.dehydrate.im_func:
+        if resource.dehydrated_columns is None:
+            return None
+        columns.update(resource.dehydrated_columns)
+
+    for name, field in selected.iteritems():
+        if name in ALWAYS_SELECTED:
+            continue
+        if getattr(resource, 'dehydrate_' + name, None) or\
+                not isinstance(field.attribute, basestring) or\
+                '__' in field.attribute:
+            return None
+        try:
+            model_field = model._meta.get_field(field.attribute)
+        except FieldDoesNotExist:
+            if isinstance(field, fields.ToManyField):
+                continue
+            return None
+        if isinstance(model_field, ManyToManyField):
+            continue
+        columns.add(field.attribute)
+        # modeltranslation's descriptors read the column of the language
+        columns.update(_translations(model, field.attribute).values())
+    return columns
+
+
+
+def _get_value_columns (resource, model, selected):
+    """Get the fields to dehydrate given fields of a resource from values()
+    rows instead of model instances.
+
+    @param resource: the resource
+    @type resource: tastypie.resources.ModelResource
+    @param model: model of the resource
+    @type model: django.db.models.Model
+    @param selected: selected fields by name
+    @type selected: { str: tastypie.fields.ApiField }
+    @return: name of the model field by resource field, None if some field
+        needs a model instance, e.g. nested resources or fields dehydrated by
+        methods
+    @rtype: { str: str }
+    """
+    if type(resource).dehydrate.im_func is not Resource.dehydrate.im_func:
+        return None
+
+    columns = {}
+    for name, field in selected.iteritems():
+        if name in ALWAYS_SELECTED:
+            continue
+        if getattr(resource, 'dehydrate_' + name, None) or\
+                not isinstance(field.attribute, basestring) or\
+                '__' in field.attribute or\
+                isinstance(field, (fields.ToManyField, fields.FileField)) or\
+                getattr(field, 'full', False):
+            return None
+        try:
+            model_field = model._meta.get_field(field.attribute)
+        except FieldDoesNotExist:
+            return None
+        if isinstance(model_field, ManyToManyField) or (
+                isinstance(field, fields.RelatedField) and
+                not isinstance(model_field, ForeignKey)):
+            return None
+        columns[name] = field.attribute
+    return columns
+
+
+
+def _to_one_lookups (resource, model, exclude=None, depth=SELECT_RELATED_DEPTH,
+        selected=None):
+    """Get select_related lookups for the ToOneFields of given resource.
+
+    Only foreign keys are followed; the ToOneFields of full related resources
+    are followed recursively.
+
+    @param resource: resource whose fields are dehydrated
+    @type resource: tastypie.resources.Resource
+    @param model: model of the resource
+    @type model: django.db.models.Model
+    @param exclude: attribute not to follow, e.g. the one pointing back to a parent
+    @type exclude: str
+    @param depth: how many levels to follow
+    @type depth: int
+    @param selected: fields to follow instead of all of the resource
+    @type selected: { str: tastypie.fields.ApiField }
+    @return: lookups
+    @rtype: [ str ]
+    """
+    lookups = []
+    if depth <= 0:
+        return lookups
+
+    if selected is None:
+        selected = resource.fields
+    for field in selected.itervalues():
+        if not isinstance(field, fields.ToOneField) or\
+                not isinstance(field.attribute, basestring) or\
+                field.attribute == exclude:
+            continue
+        try:
+            model_field = model._meta.get_field(field.attribute)
+        except FieldDoesNotExist:
+            continue
+        if not isinstance(model_field, ForeignKey):
+            continue
+
+        lookups.append(field.attribute)
+        if field.full:
+            lookups.extend(field.attribute + '__' + lookup for lookup in
+                _to_one_lookups(field.to_class(), model_field.rel.to,
+                    depth=depth - 1))
+    return lookups
+
+
+
+def _get_related (model, attribute):
+    """Get the reverse foreign key of given model with given accessor.
+
+    @param model: model with the related objects
+    @type model: django.db.models.Model
+    @param attribute: accessor name, e.g. names
+    @type attribute: str
+    @return: the relation, None if the attribute is no reverse foreign key
+    @rtype: django.db.models.related.RelatedObject
+    """
+    for related in model._meta.get_all_related_objects():
+        if related.get_accessor_name() == attribute:
+            return related
+    return None
+
+
+
+def prefetch (objs, resource, selected=None):
+    """Fetch the objects of the PrefetchToManyFields of given resource for all
+    given objects at once, one query per field.
+
+    The related objects get their foreign key back to the parent set and
+    their ToOneFields selected, so dehydrating them runs no further queries.
+    Fields of nested full resources are prefetched recursively.
+
+    This is not QuerySet.prefetch_related: in Django 1.4 it can't customize
+    the prefetched queryset, so nested ToOneFields would cost a query per
+    child, and the children wouldn't have their parent cached.
+
+    @param objs: objects to prefetch for
+    @type objs: [ django.db.models.Model ]
+    @param resource: resource of the objects
+    @type resource: tastypie.resources.Resource
+    @param selected: fields to prefetch for instead of all of the resource
+    @type selected: { str: tastypie.fields.ApiField }
+    """
+    if not objs:
+        return
+    if selected is None:
+        selected = resource.fields
+
+    for obj in objs:
+        if not hasattr(obj, PREFETCHED):
+            setattr(obj, PREFETCHED, {})
+
+    for field in selected.itervalues():
+        if not isinstance(field, PrefetchToManyField) or\
+                not isinstance(field.attribute, basestring):
+            continue
+        related = _get_related(type(objs[0]), field.attribute)
+        if related is None:
+            continue
+
+        to_resource = field.to_class()
+        name = related.field.name
+        by_parent = dict((obj.pk, []) for obj in objs)
+        queryset = related.model._default_manager.filter(**{
+            name + '__in': by_parent.keys()}).select_related(
+            *_to_one_lookups(to_resource, related.model, exclude=name))
+        children = list(queryset)
+
+        parents = dict((obj.pk, obj) for obj in objs)
+        cache_name = related.field.get_cache_name()
+        for child in children:
+            parent = parents[getattr(child, related.field.attname)]
+            setattr(child, cache_name, parent)
+            by_parent[parent.pk].append(child)
+        for obj in objs:
+            getattr(obj, PREFETCHED)[field.attribute] = by_parent[obj.pk]
+
+        if field.full:
+            prefetch(children, to_resource)
+
+
+
+class PrefetchToManyField (fields.ToManyField):
+    """ToManyField using the related objects set by L{prefetch}, if any."""
+
+    def dehydrate (self, bundle):
+        prefetched = getattr(bundle.obj, PREFETCHED, {})
+        if self.attribute not in prefetched:
+            return super(PrefetchToManyField, self).dehydrate(bundle)
+
+        self.m2m_resources = []
+        m2m_dehydrated = []
+        for m2m in prefetched[self.attribute]:
+            m2m_resource = self.get_related_resource(m2m)
+            m2m_bundle = Bundle(obj=m2m, request=bundle.request)
+            self.m2m_resources.append(m2m_resource)
+            m2m_dehydrated.append(self.dehydrate_related(m2m_bundle, m2m_resource))
+        return m2m_dehydrated
+
+
+
+class PrefetchQuerySet (QuerySet):
+    """QuerySet prefetching for a resource when it is evaluated, e.g. after
+    the paginator sliced it."""
+    #: resource to prefetch for
+    resource = None
+    #: fields of the resource to prefetch for, None for all
+    selected = None
+    #: options of the request, e.g. its GET parameters
+    options = None
+
+    def _clone (self, *args, **kwargs):
+        clone = super(PrefetchQuerySet, self)._clone(*args, **kwargs)
+        clone.resource = self.resource
+        clone.selected = self.selected
+        clone.options = self.options
+        return clone
+
+
+    def iterator (self):
+        objs = list(super(PrefetchQuerySet, self).iterator())
+        prefetch(objs, self.resource, self.selected)
+        if objs:
+            self.resource.load_page(objs, self.options or {})
+        return iter(objs)
+
+
+
+class PrefetchMixin (object):
+    """Resource mixin to dehydrate a list page with a fixed number of queries.
+
+    Related objects of PrefetchToManyFields are fetched for the whole page at
+    once and ToOneFields are selected with the objects. Mix in before
+    ModelResource. Details are left alone, they are cached by cached_obj_get.
+    """
+
+    def apply_sorting (self, obj_list, options=None):
+        obj_list = super(PrefetchMixin, self).apply_sorting(obj_list, options)
+        if not isinstance(obj_list, QuerySet):
+            return obj_list
+
+        selected = select_fields(self, options or {})
+        lookups = _to_one_lookups(self, obj_list.model, selected=selected)
+        if lookups:
+            obj_list = obj_list.select_related(*lookups)
+        obj_list = obj_list._clone(klass=PrefetchQuerySet)
+        obj_list.resource = self
+        obj_list.selected = selected
+        obj_list.options = options
+        return obj_list
+
+
+    def load_page (self, objs, options):
+        """Load what dehydrating needs for all objects of a list page at once,
+        after their PrefetchToManyFields. Does nothing by default.
+
+        @param objs: objects of the page
+        @type objs: [ django.db.models.Model ]
+        @param options: options of the request, e.g. its GET parameters
+        @type options: dict
+        """
+        pass
+
+
+
+class FieldsMixin (object):
+    """Resource mixin serializing only the fields selected by the request,
+    see L{select_fields}.
+
+    Lists also load only the columns of the selected fields. Related
+    resources nested in the response are shown in full.
+    """
+    #: columns read by an overridden dehydrate, None if not known
+    dehydrated_columns = None
+
+    def dispatch (self, request_type, request, **kwargs):
+        setattr(request, SELECTED, (self, select_fields(self, request.GET)))
+        return super(FieldsMixin, self).dispatch(request_type, request, **kwargs)
+
+
+    def apply_sorting (self, obj_list, options=None):
+        obj_list = super(FieldsMixin, self).apply_sorting(obj_list, options)
+        options = options or {}
+        if not isinstance(obj_list, QuerySet) or\
+                not ('fields' in options or 'exclude' in options):
+            return obj_list
+
+        columns = _get_columns(self, obj_list.model, select_fields(self, options))
+        if columns is None:
+            return obj_list
+        return obj_list.only(*columns)
+
+
+    def full_dehydrate (self, bundle):
+        resource, selected = getattr(bundle.request, SELECTED, (None, None))
+        if resource is not self:
+            return super(FieldsMixin, self).full_dehydrate(bundle)
+
+        for field_name, field_object in selected.items():
+            # A touch leaky but it makes URI resolution work.
+            if getattr(field_object, 'dehydrated_type', None) == 'related':
+                field_object.api_name = self._meta.api_name
+                field_object.resource_name = self._meta.resource_name
+
+            bundle.data[field_name] = field_object.dehydrate(bundle)
+
+            # Check for an optional method to do further dehydration.
+            method = getattr(self, "dehydrate_%s" % field_name, None)
+
+            if method:
+                bundle.data[field_name] = method(bundle)
+
+        bundle = self.dehydrate(bundle)
+        return bundle
+
+
+
+def _versioned_models (resource, seen=None):
+    """Get the models whose data given resource shows, including the models
+    of related resources.
+
+    @param resource: the resource
+    @type resource: tastypie.resources.Resource
+    @param seen: classes of resources already visited
+    @type seen: set
+    @return: model classes
+    @rtype: set
+    """
+    if seen is None:
+        seen = set()
+    seen.add(type(resource))
+
+    models = set()
+    if resource._meta.object_class:
+        models.add(resource._meta.object_class)
+    for field in resource.fields.itervalues():
+        if isinstance(field, fields.RelatedField) and field.to_class not in seen:
+            models.update(_versioned_models(field.to_class(), seen))
+    return models
+
+
+
+class VersionedMixin (object):
+    """Resource mixin caching serialized GET responses by the data versions
+    of the resource's models.
+
+    Responses get a strong ETag and Last-Modified, conditional requests for
+    unchanged data are answered with 304 from the cache alone. Both depend on
+    the format negotiated from Accept and on the active language, which comes
+    from the cookie or Accept-Language.
+    """
+
+    def _get_validators (self, request):
+        """Get the validators of a response to given request.
+
+        @param request: the GET request
+        @type request: django.http.HttpRequest
+        @return: ETag and time of last modification, None if not versioned
+        @rtype: (str, int)
+        """
+        if not hasattr(self, '_versioned'):
+            self._versioned = sorted(_versioned_models(self),
+                key=lambda model: model._meta.db_table)
+        if not self._versioned:
+            return None
+
+        current = versions.get(*self._versioned)
+        sha = hashlib.sha1(self._meta.resource_name or '')
+        for model in self._versioned:
+            sha.update(current[model][0])
+        sha.update(request.get_full_path())
+        sha.update(request.META.get('HTTP_ACCEPT', ''))
+        sha.update(get_language() or '')
+        return ('"%s"' % sha.hexdigest(),
+            max(modified for token, modified in current.itervalues()))
+
+
+    def _is_not_modified (self, request, etag, modified):
+        """Check whether the client's copy is current.
+
+        @param request: the GET request
+        @type request: django.http.HttpRequest
+        @param etag: current ETag
+        @type etag: str
+        @param modified: time of last modification
+        @type modified: int
+        @return: True if the client's copy is current
+        @rtype: bool
+        """
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            etags = [e.strip() for e in request.META['HTTP_IF_NONE_MATCH'].split(',')]
+            return etag in etags or '*' in etags
+
+        since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        return since is not None and since >= modified
+
+
+    def dispatch (self, request_type, request, **kwargs):
+        if request.method != 'GET':
+            return super(VersionedMixin, self).dispatch(request_type, request, **kwargs)
+        validators = self._get_validators(request)
+        if validators is None:
+            return super(VersionedMixin, self).dispatch(request_type, request, **kwargs)
+
+        etag, modified = validators
+        allowed_methods = getattr(self._meta, '%s_allowed_methods' % request_type, None)
+        self.method_check(request, allowed=allowed_methods)
+        # answers from the cache skip the dispatch which checks these
+        self.is_authenticated(request)
+        self.is_authorized(request)
+        if self._is_not_modified(request, etag, modified):
+            response = HttpResponseNotModified()
+        else:
+            key = 'api:response:' + etag.strip('"')
+            cached = cache.get(key)
+            if cached is None:
+                response = super(VersionedMixin, self).dispatch(request_type, request, **kwargs)
+                if response.status_code != 200:
+                    return response
+                cache.set(key, (response.content, response['Content-Type'],
+                    response.get('Content-Encoding', None)), RESPONSE_TIMEOUT)
+            else:
+                self.throttle_check(request)
+                content, content_type, encoding = cached
+                response = HttpResponse(content, content_type=content_type)
+                if encoding:
+                    response['Content-Encoding'] = encoding
+                self.log_throttled_access(request)
+
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(modified)
+        patch_vary_headers(response, ('Accept', 'Cookie', 'Accept-Language'))
+        return response
+
+
+
+class CursorMixin (object):
+    """Resource mixin paginating with cursors if asked to.
+
+    Resources define their own Meta, so the paginator is set here rather than
+    in a common Meta.
+    """
+
+    def __init__ (self, *args, **kwargs):
+        super(CursorMixin, self).__init__(*args, **kwargs)
+        if self._meta.paginator_class is Paginator:
+            self._meta.paginator_class = CursorPaginator
+
+
+
+class FormatsMixin (object):
+    """Resource mixin serializing to the formats of L{CommonSerializer}.
+
+    Resources define their own Meta, so the serializer is set here rather
+    than in a common Meta.
+    """
+
+    def __init__ (self, *args, **kwargs):
+        super(FormatsMixin, self).__init__(*args, **kwargs)
+        if type(self._meta.serializer) is Serializer:
+            self._meta.serializer = CommonSerializer()
+
+
+    def create_response (self, request, data, *args, **kwargs):
+        response = super(FormatsMixin, self).create_response(request, data,
+            *args, **kwargs)
+        encodings = getattr(self._meta.serializer, 'content_encodings', {})
+        encoding = encodings.get(response['Content-Type'].split(';')[0])
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return response
+
+
+
+class ValuesMixin (object):
+    """Resource mixin dehydrating list pages from values() rows if the
+    selected fields allow it, skipping model instances and bundles.
+
+    Mix in after L{FieldsMixin}, the page is fetched with its sorting and
+    paginator.
+    """
+
+    def get_list (self, request, **kwargs):
+        selected = select_fields(self, request.GET)
+        columns = None
+        if self._meta.object_class and\
+                issubclass(self._meta.paginator_class, CursorPaginator):
+            columns = _get_value_columns(self, self._meta.object_class, selected)
+        if columns is None:
+            return super(ValuesMixin, self).get_list(request, **kwargs)
+
+        objects = self.obj_get_list(request=request,
+            **self.remove_api_resource_names(kwargs))
+        sorted_objects = self.apply_sorting(objects, options=request.GET)
+        if not isinstance(sorted_objects, QuerySet):
+            return super(ValuesMixin, self).get_list(request, **kwargs)
+
+        language = get_language()[:2]
+        translated = {}
+        for name, column in columns.iteritems():
+            translations = _translations(self._meta.object_class, column)
+            if language in translations:
+                translated[name] = translations[language]
+
+        paginator = self._meta.paginator_class(request.GET, sorted_objects,
+            resource_uri=self.get_resource_list_uri(), limit=self._meta.limit)
+        paginator.values = ['pk'] + sorted(set(columns.values() + translated.values()))
+        to_be_serialized = paginator.page()
+        to_be_serialized['objects'] = self.dehydrate_values(
+            to_be_serialized['objects'], selected, columns, translated)
+        to_be_serialized = self.alter_list_data_to_serialize(request, to_be_serialized)
+        return self.create_response(request, to_be_serialized)
+
+
+    def dehydrate_values (self, rows, selected, columns, translated):
+        """Dehydrate values() rows like full_dehydrate does objects.
+
+        @param rows: values() rows
+        @type rows: [ dict ]
+        @param selected: selected fields by name
+        @type selected: { str: tastypie.fields.ApiField }
+        @param columns: model field by resource field
+        @type columns: { str: str }
+        @param translated: model field in the current language by resource field
+        @type translated: { str: str }
+        @return: dehydrated data
+        @rtype: [ dict ]
+        """
+        # details are below the list, resources without URLs get empty URIs
+        # like dehydrate_resource_uri gives them
+        uri = self.get_resource_list_uri()
+        uri = uri and uri + '%s/'
+        related = {}
+        for name in columns:
+            field = selected[name]
+            if isinstance(field, fields.RelatedField):
+                resource = field.to_class()
+                if resource._meta.api_name is None:
+                    resource._meta.api_name = self._meta.api_name
+                related[name] = resource.get_resource_list_uri()
+                related[name] = related[name] and related[name] + '%s/'
+
+        dehydrated = []
+        for row in rows:
+            data = {}
+            for name, column in columns.iteritems():
+                field = selected[name]
+                value = row[column]
+                if name in translated:
+                    value = row[translated[name]] or value
+                if value is None:
+                    if field.has_default():
+                        data[name] = field.convert(field.default)
+                    else:
+                        data[name] = None
+                elif name in related:
+                    data[name] = related[name] and related[name] % value
+                else:
+                    data[name] = field.convert(value)
+            if 'resource_uri' in selected:
+                data['resource_uri'] = uri and uri % row['pk']
+            dehydrated.append(data)
+        return dehydrated
 
 
 
-class CommonModelResource (ModelResource):
+class CommonModelResource (FormatsMixin, CursorMixin, VersionedMixin, ValuesMixin,
+        FieldsMixin, PrefetchMixin, ModelResource):
     class Meta:
         allowed_methods = ALLOWED_METHODS
         cache = CACHE
@@ -27,7 +700,8 @@ class CommonModelResource (ModelResource):
 
 
 
-class CommonResource (Resource):
+class CommonResource (FormatsMixin, CursorMixin, VersionedMixin, FieldsMixin,
+        Resource):
     class Meta:
         allowed_methods = ALLOWED_METHODS
         cache = CACHE
@@ -5,10 +5,13 @@ Resources draftlaw
 """
 __docformat__ = 'epytext en'
 
+from django.conf import settings
+from django.utils.translation import get_language
 from tastypie import fields
 
-from draftlaw.models import DraftLaw, DraftLawDiscussion, DraftLawChild
-from .common import CommonModelResource
+from draftlaw.models import DraftLaw, DraftLawDiscussion, DraftLawChild,\
+    DraftLawFullText, DraftLawStageStatistics
+from .common import CommonModelResource, PrefetchToManyField
 
 
 
@@ -21,15 +24,47 @@ class DraftLawDiscussionResource (CommonModelResource):
 
 
 class DraftLawChildResource (CommonModelResource):
-    parent = fields.ToOneField('api.resources.DraftLawResource', 'parent')
+    parent = fields.ToOneField('api.resources.res_draftlaw.DraftLawResource', 'parent')
 
     class Meta:
         queryset = DraftLawChild.objects.all()
 
 
 class DraftLawResource (CommonModelResource):
-    discussions = fields.ToManyField(DraftLawDiscussionResource, 'discussions', full=True)
-    children = fields.ToManyField(DraftLawChildResource, 'children', full=True)
+    discussions = PrefetchToManyField(DraftLawDiscussionResource, 'discussions', full=True)
+    children = PrefetchToManyField(DraftLawChildResource, 'children', full=True)
 
     class Meta:
         queryset = DraftLaw.objects.all()
+        excludes = ['linked_digest'] + DraftLaw.linked_html_fields() + [
+            'initiator_html', 'author_html']
+
+    #: full texts are read from their own table
+    dehydrated_columns = ()
+
+
+    def load_page (self, objs, options):
+        """Load the full texts of a list page with one query if requested."""
+        if options.get('full_text'):
+            DraftLawFullText.load(objs,
+                (get_language() or settings.LANGUAGE_CODE)[:2])
+
+
+    def dehydrate (self, bundle):
+        """Add full text if requested by parameter full_text."""
+        if bundle.request.GET.get('full_text'):
+            bundle.data['full_text'] = bundle.obj.full_text
+        return bundle
+
+
+
+class DraftLawStageStatisticsResource (CommonModelResource):
+    class Meta:
+        queryset = DraftLawStageStatistics.objects.all()
+        resource_name = 'draftlaw_statistics'
+        filtering = {
+            'group_by': ('exact',),
+            'group': ('exact',),
+            'stage': ('exact',),
+            'metric': ('exact',),
+        }
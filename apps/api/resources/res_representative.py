@@ -9,7 +9,8 @@ from tastypie import fields
 
 from representative.models import Representative, AdditionalInformation
 from popit.api import PositionResource, PersonNameResource
-from .common import CommonModelResource
+from popit.models import PRIMARY_FIELDS
+from .common import CommonModelResource, PrefetchToManyField
 
 
 
@@ -22,10 +23,12 @@ class AdditionalInformationResource (CommonModelResource):
 
 
 class RepresentativeResource (CommonModelResource):
-    additional_information = fields.ToManyField(AdditionalInformationResource, 'additional_information', full=True)
-    position = fields.ToManyField(PositionResource, 'position_set', related_name='representative', full=True)
-    names = fields.ToManyField(PersonNameResource, 'names', full=True)
+    additional_information = PrefetchToManyField(AdditionalInformationResource, 'additional_information', full=True)
+    position = PrefetchToManyField(PositionResource, 'position_set', related_name='representative', full=True)
+    names = PrefetchToManyField(PersonNameResource, 'names', full=True)
 
     class Meta:
         queryset = Representative.objects.all()
         resource_name = 'representative'
+        # the primary name is among the names
+        excludes = PRIMARY_FIELDS
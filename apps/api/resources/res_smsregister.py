@@ -5,18 +5,65 @@ Resources smsregister
 """
 __docformat__ = 'epytext en'
 
-from apps.smsregister.models import SMSRegister
+from django.conf.urls.defaults import url
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.urlresolvers import NoReverseMatch
+from django.db.models import DateTimeField
+from django.core.exceptions import ValidationError
+from apps.smsregister.models import SMSRegister, SMSUnsubscription
+from tastypie.exceptions import BadRequest
+from tastypie.utils import trailing_slash
+from api.paginator import CursorPaginator
 from .common import CommonModelResource
-from Crypto.Cipher import DES3
+from Crypto.Cipher import AES, DES3
 from settings import SMS_API_KEY
+import base64
 import binascii
+import hashlib
+import hmac
 import json
+import os
+
+
+#: fields of registrations in exports
+EXPORT_FIELDS = ('name', 'selected_language', 'phone_number', 'email', 'groups')
+#: version of sealed payloads
+SEAL_VERSION = '\x01'
+#: length of the HMAC-SHA256 of sealed payloads
+SEAL_TAG_LENGTH = 32
+
+
+
+def _derive_key (purpose):
+    """Derive a key for given purpose from SMS_API_KEY."""
+    return hmac.new(SMS_API_KEY, purpose, hashlib.sha256).digest()
+
+
+
+def _equal (a, b):
+    """Compare given strings in constant time."""
+    if len(a) != len(b):
+        return False
+    result = 0
+    for x, y in zip(a, b):
+        result |= ord(x) ^ ord(y)
+    return result == 0
 
 
 
 class SMSRegisterResource (CommonModelResource):
+    """Registrations for SMS alerts.
+
+    The list encrypts every registration on its own. The export at
+    C{export/} serializes a page of registrations at once and seals it as one
+    payload, see L{seal}. Registrations are ordered by modification, the
+    parameter C{since} limits them to those modified since then, and the
+    meta data of the last page has the C{until} to pass as C{since} on the
+    next pull. Registrations deleted since then are listed on the first page.
+    """
     class Meta:
         queryset = SMSRegister.objects.all()
+        excludes = ['modified']
 
     def obj_create(self, bundle, **kwargs):
         test = super(SMSRegisterResource, self).obj_create(bundle, user=bundle.request.user)
@@ -35,3 +82,117 @@ class SMSRegisterResource (CommonModelResource):
 
     def alter_list_data_to_serialize(self, request, data):
         return data['objects']
+
+
+    def override_urls (self):
+        return [
+            url(r'^(?P<resource_name>%s)/export%s$' % (
+                self._meta.resource_name, trailing_slash()),
+                self.wrap_view('get_export'), name='api_smsregister_export'),
+        ]
+
+
+    def seal (self, raw_string):
+        """Encrypt and authenticate given string as one payload.
+
+        The payload is base64 of a version byte, a random IV, the AES-256-CBC
+        ciphertext of the PKCS#7 padded string and the HMAC-SHA256 of all of
+        these. Keys for encryption and authentication are derived from
+        SMS_API_KEY by HMAC-SHA256 of 'encrypt' and 'authenticate'.
+
+        @param raw_string: string to seal
+        @type raw_string: str
+        @return: sealed payload
+        @rtype: str
+        """
+        iv = os.urandom(AES.block_size)
+        padding = AES.block_size - len(raw_string) % AES.block_size
+        encryptor = AES.new(_derive_key('encrypt'), AES.MODE_CBC, iv)
+        message = SEAL_VERSION + iv + encryptor.encrypt(
+            raw_string + chr(padding) * padding)
+        tag = hmac.new(_derive_key('authenticate'), message, hashlib.sha256).digest()
+        return base64.b64encode(message + tag)
+
+
+    def unseal (self, payload):
+        """Verify and decrypt a payload sealed by L{seal}.
+
+        @param payload: sealed payload
+        @type payload: str
+        @return: the string sealed
+        @rtype: str
+        @raise ValueError: if the payload is invalid or was tampered with
+        """
+        try:
+            data = base64.b64decode(payload)
+        except TypeError:
+            raise ValueError('Invalid payload.')
+        message, tag = data[:-SEAL_TAG_LENGTH], data[-SEAL_TAG_LENGTH:]
+        expected = hmac.new(_derive_key('authenticate'), message, hashlib.sha256).digest()
+        if not _equal(tag, expected):
+            raise ValueError('Invalid payload.')
+        if message[:1] != SEAL_VERSION:
+            raise ValueError('Unknown payload version.')
+
+        iv = message[1:1 + AES.block_size]
+        decryptor = AES.new(_derive_key('encrypt'), AES.MODE_CBC, iv)
+        raw_string = decryptor.decrypt(message[1 + AES.block_size:])
+        return raw_string[:-ord(raw_string[-1])]
+
+
+    def _parse_since (self, value):
+        """Parse the parameter since, an ISO 8601 date and time."""
+        if not value:
+            return None
+        try:
+            return DateTimeField().to_python(value.replace('T', ' '))
+        except ValidationError:
+            raise BadRequest("Invalid since '%s' provided." % value)
+
+
+    def get_export (self, request, **kwargs):
+        """Get a page of registrations as one sealed payload."""
+        self.method_check(request, allowed=['get'])
+        self.is_authenticated(request)
+        self.throttle_check(request)
+
+        since = self._parse_since(request.GET.get('since'))
+        objects = SMSRegister.objects.order_by('modified', 'pk')
+        if since:
+            objects = objects.filter(modified__gte=since)
+        params = request.GET.copy()
+        params.setdefault('cursor', '')
+        try:
+            uri = self._build_reverse_url('api_smsregister_export', kwargs={
+                'api_name': self._meta.api_name,
+                'resource_name': self._meta.resource_name,
+            })
+        except NoReverseMatch:
+            uri = None
+
+        paginator = CursorPaginator(params, objects, resource_uri=uri,
+            limit=self._meta.limit)
+        paginator.values = ['pk', 'modified'] + list(EXPORT_FIELDS)
+        page = paginator.page()
+
+        data = {'objects': []}
+        until = since
+        for row in page['objects']:
+            values = dict((f, row[f]) for f in EXPORT_FIELDS)
+            values['id'] = row['pk']
+            data['objects'].append(values)
+            until = row['modified']
+        if not params['cursor']:
+            deleted = SMSUnsubscription.objects.all()
+            if since:
+                deleted = deleted.filter(deleted__gte=since)
+            data['deleted'] = []
+            for registration, time in deleted.values_list('registration', 'deleted'):
+                data['deleted'].append(registration)
+                until = max(until, time) if until else time
+
+        meta = page['meta']
+        meta['until'] = until and until.isoformat()
+        payload = self.seal(json.dumps(data, cls=DjangoJSONEncoder))
+        self.log_throttled_access(request)
+        return self.create_response(request, {'meta': meta, 'payload': payload})
@@ -8,7 +8,7 @@ __docformat__ = 'epytext en'
 from tastypie import fields
 
 from votingrecord.models import VotingRecord, VotingRecordResult, VotingRecordAmendment
-from .common import CommonModelResource, CommonResource
+from .common import CommonModelResource, PrefetchToManyField, CommonResource
 
 
 class VotingRecordResultResource (CommonModelResource):
@@ -24,8 +24,8 @@ class VotingRecordAmendmentResource (CommonModelResource):
 
 
 class VotingRecordDetailResource (CommonModelResource):
-    results = fields.ToManyField(VotingRecordResultResource, 'results', full=True)
-    amendments = fields.ToManyField(VotingRecordAmendmentResource, 'amendments', full=True)
+    results = PrefetchToManyField(VotingRecordResultResource, 'results', full=True)
+    amendments = PrefetchToManyField(VotingRecordAmendmentResource, 'amendments', full=True)
 
     class Meta:
         queryset = VotingRecord.objects.all()
@@ -35,6 +35,11 @@ class VotingRecordDetailResource (CommonModelResource):
 class VotingRecordResource (CommonResource):
     name = fields.CharField(attribute='name')
 
+    class Meta (CommonResource.Meta):
+        # versions the responses by VotingRecord
+        object_class = VotingRecord
+
+
     def obj_get_list (self, **kwargs):
         return VotingRecord.objects.all()
 
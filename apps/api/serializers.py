@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Serializers api
+
+Adds compact formats to tastypie's serializer:
+
+ - msgpack: MessagePack, if the module msgpack is installed.
+ - ndjson: newline delimited JSON, gzip compressed, sent with
+   Content-Encoding gzip. Lists are written as a line with the meta data
+   followed by a line per object, so clients can stream them.
+
+Both are negotiated through Accept or the parameter format, like the formats
+of tastypie.
+"""
+__docformat__ = 'epytext en'
+
+import gzip
+from cStringIO import StringIO
+from django.core.serializers import json
+from django.utils import simplejson
+from tastypie.serializers import Serializer
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+#: gzip compression level of ndjson, a trade-off of time and size
+GZIP_LEVEL = 6
+
+
+
+class CommonSerializer (Serializer):
+    """Serializer adding the formats msgpack and ndjson."""
+    formats = Serializer.formats + ['ndjson'] + (['msgpack'] if msgpack else [])
+    content_types = dict(Serializer.content_types, **{
+        'ndjson': 'application/x-ndjson',
+        'msgpack': 'application/x-msgpack',
+    })
+    #: content encoding of formats which are compressed
+    content_encodings = {
+        'application/x-ndjson': 'gzip',
+    }
+
+
+    def to_ndjson (self, data, options=None):
+        options = options or {}
+        data = self.to_simple(data, options)
+        if isinstance(data, dict) and 'objects' in data and 'meta' in data:
+            lines = [{'meta': data['meta']}] + data['objects']
+        elif isinstance(data, list):
+            lines = data
+        else:
+            lines = [data]
+
+        buf = StringIO()
+        out = gzip.GzipFile(mode='wb', fileobj=buf, compresslevel=GZIP_LEVEL)
+        for line in lines:
+            out.write(simplejson.dumps(line, cls=json.DjangoJSONEncoder,
+                sort_keys=True, separators=(',', ':')))
+            out.write('\n')
+        out.close()
+        return buf.getvalue()
+
+
+    def from_ndjson (self, content):
+        lines = gzip.GzipFile(fileobj=StringIO(content)).read().splitlines()
+        objects = [simplejson.loads(line) for line in lines if line.strip()]
+        if len(objects) == 1:
+            return objects[0]
+        if objects and objects[0].keys() == ['meta']:
+            return {'meta': objects[0]['meta'], 'objects': objects[1:]}
+        return objects
+
+
+    def to_msgpack (self, data, options=None):
+        options = options or {}
+        return msgpack.packb(self.to_simple(data, options))
+
+
+    def from_msgpack (self, content):
+        return msgpack.unpackb(content, encoding='utf-8')
@@ -1,13 +1,21 @@
 # -*- coding: utf-8 -*-
 
 """
-This file demonstrates writing tests using the unittest module. These will pass
-when you run "manage.py test".
-
-Replace this with more appropriate tests for your application.
+Tests for app api
 """
+__docformat__ = 'epytext en'
 
+import json
 from django.test import TestCase
+from django.test.client import RequestFactory
+from django.utils import translation
+from tastypie.authentication import Authentication
+from tastypie.exceptions import BadRequest, ImmediateHttpResponse
+
+from api.paginator import CursorPaginator
+from api.serializers import CommonSerializer, msgpack
+from api.urls import v1_api
+from popit.urls import v1_api as popit_api
 
 
 class SimpleTest(TestCase):
@@ -16,3 +24,308 @@ class SimpleTest(TestCase):
         Tests that 1 + 1 always equals 2.
         """
         self.assertEqual(1 + 1, 2)
+
+
+
+class PrefetchTest (TestCase):
+    """Query counts of list pages: count, page, then one per nested field."""
+
+    def _get_list (self, resource, queries, **params):
+        request = RequestFactory().get('/', params)
+        with self.assertNumQueries(queries):
+            response = resource.get_list(request)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+
+
+class RepresentativePrefetchTest (PrefetchTest):
+    fixtures = ['representative_testdata']
+
+    def test_RepresentativeResource (self):
+        # additional_information, position, names
+        self._get_list(v1_api._registry['representative'], 2 + 3)
+
+
+    def test_PersonResource (self):
+        # data, names, codes, positions
+        self._get_list(popit_api._registry['person'], 2 + 4)
+
+
+    def test_PositionResource (self):
+        # person, organisation and type are selected with the page
+        self._get_list(popit_api._registry['position'], 2)
+
+
+
+class DraftLawPrefetchTest (PrefetchTest):
+    fixtures = ['draftlaw_testdata']
+
+    def test_DraftLawResource (self):
+        # discussions, children
+        self._get_list(v1_api._registry['draftlaw'], 2 + 2)
+
+
+    def test_DraftLawResource_full_text (self):
+        # discussions, children, full texts
+        response = self._get_list(v1_api._registry['draftlaw'], 2 + 2 + 1,
+            full_text='1')
+        self.assertTrue('"full_text"' in response.content)
+
+
+
+class VotingRecordPrefetchTest (PrefetchTest):
+    fixtures = ['votingrecord_testdata']
+
+    def test_VotingRecordDetailResource (self):
+        # results, amendments
+        self._get_list(v1_api._registry['votingrecorddetail'], 2 + 2)
+
+
+
+class VersionedTest (TestCase):
+    """Conditional and cached GET responses."""
+    fixtures = ['draftlaw_testdata']
+
+    def _get (self, resource, **headers):
+        request = RequestFactory().get('/api/v1/draftlaw/', **headers)
+        return resource.dispatch('list', request)
+
+
+    def test_dispatch (self):
+        from draftlaw.models import DraftLaw
+        resource = v1_api._registry['draftlaw']
+        response = self._get(resource)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with self.assertNumQueries(0):
+            cached = self._get(resource)
+            self.assertEqual(cached.content, response.content)
+            self.assertEqual(cached['ETag'], etag)
+            self.assertEqual(self._get(resource,
+                HTTP_IF_NONE_MATCH=etag).status_code, 304)
+            self.assertEqual(self._get(resource,
+                HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+        DraftLaw.objects.all()[0].save()
+        response = self._get(resource, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+    def test_language (self):
+        resource = v1_api._registry['draftlaw']
+        language = translation.get_language()
+        try:
+            translation.activate('en')
+            english = self._get(resource)
+            translation.activate('ka')
+            georgian = self._get(resource, HTTP_IF_NONE_MATCH=english['ETag'])
+        finally:
+            translation.activate(language)
+        self.assertEqual(georgian.status_code, 200)
+        self.assertNotEqual(georgian['ETag'], english['ETag'])
+        self.assertTrue('Accept-Language' in english['Vary'])
+        self.assertTrue('Cookie' in english['Vary'])
+        self.assertTrue('Accept,' in english['Vary'])
+
+
+    def test_authentication (self):
+        class Refused (Authentication):
+            def is_authenticated (self, request, **kwargs):
+                return False
+
+        resource = v1_api._registry['draftlaw']
+        etag = self._get(resource)['ETag']
+        authentication = resource._meta.authentication
+        resource._meta.authentication = Refused()
+        try:
+            self.assertRaises(ImmediateHttpResponse, self._get, resource)
+            self.assertRaises(ImmediateHttpResponse, self._get, resource,
+                HTTP_IF_NONE_MATCH=etag)
+        finally:
+            resource._meta.authentication = authentication
+
+
+
+class CursorTest (TestCase):
+    """Walking lists with cursors."""
+    fixtures = ['draftlaw_testdata', 'votingrecord_testdata']
+
+    def _walk (self, objects, limit):
+        """Walk given objects page by page, one query each."""
+        pks = []
+        data = {'cursor': u'', 'limit': unicode(limit)}
+        while True:
+            with self.assertNumQueries(1):
+                page = CursorPaginator(data, objects, resource_uri='/').page()
+            self.assertFalse('total_count' in page['meta'])
+            self.assertTrue(len(page['objects']) <= limit)
+            pks.extend(obj.pk for obj in page['objects'])
+            if not page['meta']['next']:
+                return pks
+            data['cursor'] = page['meta']['next'].split('cursor=')[1].split('&')[0]
+
+
+    def test_page (self):
+        from draftlaw.models import DraftLaw
+        expected = list(DraftLaw.objects.order_by('-bill_number', 'pk').values_list(
+            'pk', flat=True))
+        self.assertEqual(self._walk(DraftLaw.objects.all(), 2), expected)
+        self.assertEqual(self._walk(DraftLaw.objects.order_by('pk'), 4),
+            sorted(expected))
+
+
+    def test_null (self):
+        from votingrecord.models import VotingRecord
+        first = VotingRecord.objects.all()[0]
+        VotingRecord.objects.filter(pk=first.pk).update(date=None)
+        expected = [r.pk for r in VotingRecord.objects.all() if r.pk != first.pk]
+        self.assertEqual(self._walk(VotingRecord.objects.all(), 1),
+            expected + [first.pk])
+
+
+    def test_offset (self):
+        from draftlaw.models import DraftLaw
+        page = CursorPaginator({'limit': u'2'}, DraftLaw.objects.all()).page()
+        self.assertEqual(page['meta']['total_count'], DraftLaw.objects.count())
+
+
+    def test_invalid (self):
+        from draftlaw.models import DraftLaw
+        for cursor in (u'garbage', u'W1siLWlkIl0sWzFdXQ'):
+            paginator = CursorPaginator({'cursor': cursor}, DraftLaw.objects.all())
+            self.assertRaises(BadRequest, paginator.page)
+
+
+
+class FieldsTest (TestCase):
+    """Sparse fieldsets."""
+    fixtures = ['draftlaw_testdata']
+
+    def _get (self, queries, **params):
+        resource = v1_api._registry['draftlaw']
+        request = RequestFactory().get('/api/v1/draftlaw/', params)
+        with self.assertNumQueries(queries):
+            response = resource.dispatch('list', request)
+        return json.loads(response.content)['objects']
+
+
+    def test_fields (self):
+        # count, page, discussions as URIs
+        objects = self._get(3, fields='bill_number,discussions', full='0')
+        for obj in objects:
+            self.assertEqual(set(obj), set(['bill_number', 'discussions', 'resource_uri']))
+            for uri in obj['discussions']:
+                self.assertTrue(isinstance(uri, basestring))
+
+
+    def test_exclude (self):
+        # count, page
+        objects = self._get(2, exclude='discussions,children')
+        self.assertFalse('discussions' in objects[0] or 'children' in objects[0])
+        self.assertTrue('bill_number' in objects[0])
+
+
+    def test_invalid (self):
+        resource = v1_api._registry['draftlaw']
+        request = RequestFactory().get('/api/v1/draftlaw/', {'fields': 'nonexistent'})
+        self.assertRaises(BadRequest, resource.dispatch, 'list', request)
+
+
+
+class SerializerTest (TestCase):
+    """Compact formats."""
+    data = {
+        'meta': {'limit': 2, 'next': None},
+        'objects': [{'id': 1, 'name': u'ერთი'}, {'id': 2, 'name': u'two'}],
+    }
+
+    def test_ndjson (self):
+        serializer = CommonSerializer()
+        content = serializer.serialize(self.data, 'application/x-ndjson')
+        self.assertEqual(serializer.deserialize(content, 'application/x-ndjson'),
+            self.data)
+
+
+    def test_msgpack (self):
+        if msgpack is None:
+            return
+        serializer = CommonSerializer()
+        content = serializer.serialize(self.data, 'application/x-msgpack')
+        self.assertEqual(serializer.deserialize(content, 'application/x-msgpack'),
+            self.data)
+
+
+
+class ValuesTest (TestCase):
+    """Dehydrating lists from values() rows."""
+    fixtures = ['votingrecord_testdata']
+
+    def test_get_list (self):
+        from tastypie.resources import Resource
+        from api.resources.common import ValuesMixin
+        from api.resources.res_votingrecord import VotingRecordResultResource
+        resource = VotingRecordResultResource(api_name='v1')
+        for params in ({}, {'cursor': '', 'limit': '2'}):
+            request = RequestFactory().get('/', params)
+            expected = json.loads(Resource.get_list(resource, request).content)
+            with self.assertNumQueries(1 if 'cursor' in params else 2):
+                response = ValuesMixin.get_list(resource, request)
+            self.assertEqual(json.loads(response.content), expected)
+
+
+    def test_ndjson (self):
+        resource = v1_api._registry['votingrecorddetail']
+        request = RequestFactory().get('/', {'format': 'ndjson'})
+        response = resource.get_list(request)
+        self.assertEqual(response['Content-Type'].split(';')[0], 'application/x-ndjson')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+
+
+class SMSRegisterExportTest (TestCase):
+    """Sealed exports of registrations."""
+
+    def _pull (self, resource, **params):
+        """Pull all pages, get registrations, deleted ones and until."""
+        objects, deleted = [], []
+        params['limit'] = '2'
+        while True:
+            request = RequestFactory().get('/', params)
+            response = json.loads(resource.get_export(request).content)
+            data = json.loads(resource.unseal(response['payload']))
+            objects.extend(o['id'] for o in data['objects'])
+            deleted.extend(data.get('deleted', []))
+            if not response['meta']['next']:
+                return objects, deleted, response['meta']['until']
+            params['cursor'] = response['meta']['next'].split('cursor=')[1].split('&')[0]
+
+
+    def test_export (self):
+        from apps.smsregister.models import SMSRegister
+        from api.resources.res_smsregister import SMSRegisterResource
+        resource = SMSRegisterResource(api_name='v1')
+        registrations = [SMSRegister.objects.create(name=u'name %d' % i,
+            selected_language='ka', phone_number='59900000%d' % i,
+            email='%d@example.com' % i, groups='all') for i in range(5)]
+
+        objects, deleted, until = self._pull(resource)
+        self.assertEqual(objects, [r.pk for r in registrations])
+        self.assertEqual(deleted, [])
+
+        registrations[0].delete()
+        registrations[1].save()
+        objects, deleted, until = self._pull(resource, since=until)
+        self.assertTrue(registrations[1].pk in objects)
+        self.assertEqual(deleted, [registrations[0].pk])
+
+
+    def test_unseal (self):
+        from api.resources.res_smsregister import SMSRegisterResource
+        resource = SMSRegisterResource(api_name='v1')
+        payload = resource.seal('secret')
+        self.assertEqual(resource.unseal(payload), 'secret')
+        tampered = payload[:10] + ('A' if payload[10] != 'A' else 'B') + payload[11:]
+        self.assertRaises(ValueError, resource.unseal, tampered)
@@ -13,8 +13,9 @@ v1_api = Api(api_name='v1')
 from .resources.res_representative import RepresentativeResource
 v1_api.register(RepresentativeResource())
 
-from .resources.res_draftlaw import DraftLawResource
+from .resources.res_draftlaw import DraftLawResource, DraftLawStageStatisticsResource
 v1_api.register(DraftLawResource())
+v1_api.register(DraftLawStageStatisticsResource())
 
 from .resources.res_incomedeclaration import IncomeDeclarationResource
 v1_api.register(IncomeDeclarationResource())
@@ -5,8 +5,10 @@ Admin draftlaw
 """
 __docformat__ = 'epytext en'
 
+from django import forms
 from django.contrib import admin
 from django.db import models
+from django.utils.translation import ugettext_lazy as _
 from modeltranslation.admin import TranslationAdmin, TranslationTabularInline
 
 from .models import DraftLaw, DraftLawDiscussion, DraftLawChild
@@ -21,7 +23,31 @@ class InlineChild(TranslationTabularInline):
     model = DraftLawChild
 
 
+class DraftLawAdminForm(forms.ModelForm):
+    """Form to edit full texts, which are no model fields."""
+    full_text_en = forms.CharField(label=_('Full Text') + ' [en]',
+        required=False, widget=forms.Textarea)
+    full_text_ka = forms.CharField(label=_('Full Text') + ' [ka]',
+        required=False, widget=forms.Textarea)
+
+    class Meta:
+        model = DraftLaw
+
+    def __init__(self, *args, **kwargs):
+        super(DraftLawAdminForm, self).__init__(*args, **kwargs)
+        if self.instance.pk:
+            for field in ('full_text_en', 'full_text_ka'):
+                self.initial[field] = getattr(self.instance, field)
+
+    def save(self, commit=True):
+        for field in ('full_text_en', 'full_text_ka'):
+            if field in self.changed_data:
+                setattr(self.instance, field, self.cleaned_data[field])
+        return super(DraftLawAdminForm, self).save(commit)
+
+
 class DraftLawAdmin(TranslationAdmin):
+    form = DraftLawAdminForm
 
     def bureau_formatted(self, obj):
         return obj.bureau_date.strftime("%Y-%m-%d")
@@ -2,6 +2,13 @@
 
 """
 Command to import draft laws as provided by TIG
+
+The CSV file is streamed and handled in batches of rows. For each batch the
+changes against the database are computed first (a diff of inserts, updates
+and deletes), matching existing records by bill number from a map loaded once
+at start. The diff is then applied with bulk operations in one transaction
+per batch. Existing draft laws are updated in place, so their links to
+initiating/authoring representatives survive a re-import.
 """
 __docformat__ = 'epytext en'
 
@@ -12,11 +19,69 @@ from django.db import transaction
 from django.utils.translation import ugettext as _
 from optparse import make_option
 
+from util import versions
+from util.db import bulk_create
+
 
 #: CSV delimiter
 DELIMITER = ','
 COL_EN = 18
 COL_KA = 9
+#: columns holding the discussions of stages 0 to 5
+COL_DISCUSSION_START = 11
+COL_DISCUSSION_END = 16
+#: discussion columns which are committee discussions, the others are plenary
+COLS_COMMITTEE = (11, 13, 15)
+#: number of CSV rows handled in one transaction
+BATCH_SIZE = 500
+#: date in parentheses of a plenary / single committee discussion
+REGEX_DATE = re.compile(r'\(.+\)')
+#: draft law fields written when an existing draft law is replaced
+DRAFTLAW_FIELDS = ('slug', 'bureau_date', 'title_ka', 'initiator_ka',
+    'author_ka', 'status_ka', 'shortstatus', 'summary_ka', 'law_number')
+
+
+
+class Diff (object):
+    """Changes to be applied to the database for one batch of CSV rows."""
+
+    def __init__ (self):
+        #: new draft laws by bill number
+        self.insert = {}
+        #: changed field values of existing draft laws by primary key
+        self.update = {}
+        #: new discussions by bill number of their draft law
+        self.discussions = {}
+        #: primary keys of draft laws whose discussions are replaced
+        self.replace_discussions = set()
+        #: new draft law children as (parent's bill number, child) by bill number
+        self.insert_children = {}
+        #: changed field values of existing children by primary key
+        self.update_children = {}
+        #: primary keys of duplicate draft laws to delete
+        self.delete = set()
+        #: primary keys of duplicate children to delete
+        self.delete_children = set()
+        #: lines describing the changes, for output
+        self.lines = []
+
+
+    def __nonzero__ (self):
+        return bool(self.insert or self.update or self.insert_children or
+            self.update_children or self.delete or self.delete_children)
+
+
+    def count (self):
+        """Get number of inserted, updated and deleted records.
+
+        @return: counts of inserts, updates and deletes
+        @rtype: (int, int, int)
+        """
+        return (
+            len(self.insert) + len(self.insert_children),
+            len(self.update) + len(self.update_children),
+            len(self.delete) + len(self.delete_children),
+        )
 
 
 
@@ -35,9 +100,18 @@ class Command (BaseCommand):
             default=False,
             help='Force replacing draftlaws.'
         ),
+        make_option(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            default=False,
+            help='Only print the changes, do not write to the database.'
+        ),
     )
-    #: force overwriting income declarations even though scrape date is not newer
+    #: force overwriting already existing draft laws
     force = False
+    #: only print the changes
+    dry_run = False
 
 
     def _get_isodate(self, date):
@@ -70,49 +144,45 @@ class Command (BaseCommand):
             return default
 
 
-
-    @transaction.commit_on_success
-    def _add_discussions (self, row, draftlaw):
-        """Add discussion to a draftlaw record.
+    def _get_discussions (self, row):
+        """Get the discussions of a draftlaw record, not yet attached to it.
 
         @param row: data row
         @type row: [ str ]
-        @param draftlaw: a draftlaw
-        @type draftlaw: draftlaw.DraftLaw
+        @return: unsaved discussions
+        @rtype: [ draftlaw.DraftLawDiscussion ]
         """
         from draftlaw.models import DraftLawDiscussion
-        col_start = 11
-        col_end = 16
-        for i in xrange(col_start, col_end + 1):
+        discussions = []
+        for i in xrange(COL_DISCUSSION_START, COL_DISCUSSION_END + 1):
             if not row[i]: continue
 
-            stage = i - col_start
+            stage = i - COL_DISCUSSION_START
             stripped = row[i].strip()
             places = stripped.split(';')
 
             if len(places) > 1: # must be committees
-                for j in xrange(len(places)):
-                    parts = places[j].strip().split(':')
+                for place in places:
+                    parts = place.strip().split(':')
                     if len(parts) != 2: continue
-                    discussion = DraftLawDiscussion(draftlaw=draftlaw,
+                    discussions.append(DraftLawDiscussion(
                         date=self._get_isodate(parts[0]),
                         place_ka=parts[1].strip(),
-                        stage=stage)
-                    discussion.save()
+                        stage=stage))
             else: # plenary or single committee
-                regex = re.compile("\(.+\)")
                 try:
-                    datestr = regex.search(stripped).group()
+                    datestr = REGEX_DATE.search(stripped).group()
                 except AttributeError:
                     datestr = ""
                 date = self._get_isodate(datestr.strip('()'))
-                if i in [11, 13, 15]: # comittee
+                if i in COLS_COMMITTEE:
                     place = _('Committee')
-                else: # plenary
+                else:
                     place = _('Plenary')
-                discussion = DraftLawDiscussion(
-                    draftlaw=draftlaw, date=date, place_ka=place, stage=stage)
-                discussion.save()
+                discussions.append(DraftLawDiscussion(
+                    date=date, place_ka=place, stage=stage))
+
+        return discussions
 
 
     def _get_status (self, row):
@@ -156,7 +226,7 @@ class Command (BaseCommand):
         @rtype: str
         """
         if not col:
-            return None
+            return ''
 
         number = col.strip().replace(' ', '').decode('utf-8')
 
@@ -183,167 +253,355 @@ class Command (BaseCommand):
         return number
 
 
-    @transaction.commit_on_success
-    def _create_draftlaw (self, row):
-        """Create a complete DraftLaw record.
+    def _get_draftlaw (self, row):
+        """Get an unsaved DraftLaw record for given row.
 
         @param row: data row
         @type row: [ str ]
-        @return: a draftlaw
+        @return: a draftlaw with slug set
         @rtype: draftlaw.DraftLaw
         """
         from draftlaw.models import DraftLaw
-        bill_number = self._get_bill_number(row)
-
-        title = row[3].strip().decode('utf-8')
-        try:
-           self.stdout.write('%s | %s ... ' % (bill_number, title))
-        except UnicodeEncodeError: # need this for Python 2.6 *sigh*
-           self.stdout.write('%s | %s ... ' % (bill_number, title.encode('utf-8')))
-
         (shortstatus, status) = self._get_status(row)
-
-        law_number = self._get_law_number(row[17])
-
         draftlaw = DraftLaw(
             bureau_date=self._get_isodate(row[0]),
-            bill_number=bill_number,
-            title_ka=title,
+            bill_number=self._get_bill_number(row),
+            title_ka=row[3].strip().decode('utf-8'),
             initiator_ka=row[4].strip(),
             author_ka=row[5].strip(),
             status_ka=status,
             shortstatus=shortstatus,
             summary_ka=row[6].strip(),
-            law_number=law_number,
+            law_number=self._get_law_number(row[17]),
         )
-        draftlaw.save()
+        draftlaw.slug = draftlaw.make_slug()
+        return draftlaw
 
-        draftlaws = DraftLaw.objects.filter(bill_number=draftlaw.bill_number)
-        if len(draftlaws) > 1:
-            if self.force:
-                draftlaws.exclude(pk=draftlaw.pk).delete()
-                self.stdout.write('replace existing!')
-            else:
-                self.stdout.write('keep already existing!')
-                draftlaw.delete()
-                return None
-        else:
-            self.stdout.write('add new!')
 
-        self._add_discussions(row, draftlaw)
-        return draftlaw
+    def _load (self):
+        """Load bill numbers of existing draft laws and children.
 
+        Only primary keys are kept, so this stays small even for many laws.
+        If a bill number exists several times (left over from earlier
+        imports), the oldest record is used and the others are remembered as
+        duplicates.
+        """
+        from draftlaw.models import DraftLaw, DraftLawChild
+        self.draftlaws = {}
+        self.duplicates = {}
+        for pk, bill_number in DraftLaw.objects.order_by('pk').values_list(
+                'pk', 'bill_number'):
+            if bill_number in self.draftlaws:
+                self.duplicates.setdefault(bill_number, []).append(pk)
+            else:
+                self.draftlaws[bill_number] = pk
+
+        self.children = {}
+        self.duplicate_children = {}
+        for pk, bill_number in DraftLawChild.objects.order_by('pk').values_list(
+                'pk', 'bill_number'):
+            if bill_number in self.children:
+                self.duplicate_children.setdefault(bill_number, []).append(pk)
+            else:
+                self.children[bill_number] = pk
 
 
-    @transaction.commit_on_success
-    def _create_draftlawchild (self, row, parent):
-        """Create a DraftLawChild record.
+    def _diff_draftlaw (self, diff, row):
+        """Add changes for a parent draft law row to given diff.
 
+        @param diff: diff of current batch
+        @type diff: Diff
         @param row: data row
         @type row: [ str ]
-        @param parent: parent draft law
-        @type parent: draftlaw.DraftLaw
-        @return: a draftlaw child
-        @rtype: draftlaw.DraftLawChild
+        @return: bill number if children rows following should be handled
+        @rtype: str
+        """
+        draftlaw = self._get_draftlaw(row)
+        discussions = self._get_discussions(row)
+        bill_number = draftlaw.bill_number
+        title = draftlaw.title_ka
+
+        if bill_number not in self.draftlaws:
+            # primary key is only known once the batch is applied
+            self.draftlaws[bill_number] = None
+            diff.insert[bill_number] = draftlaw
+            diff.discussions[bill_number] = discussions
+            diff.lines.append(u'+ %s | %s (%d discussions)' % (
+                bill_number, title, len(discussions)))
+            return bill_number
+
+        if not self.force:
+            diff.lines.append(u'= %s | %s: keep already existing' % (
+                bill_number, title))
+            return None
+
+        pk = self.draftlaws[bill_number]
+        if bill_number in diff.insert: # listed twice in batch, later row wins
+            diff.insert[bill_number] = draftlaw
+        elif pk is not None:
+            diff.update[pk] = dict(
+                (name, getattr(draftlaw, name)) for name in DRAFTLAW_FIELDS)
+            diff.replace_discussions.add(pk)
+            for duplicate in self.duplicates.pop(bill_number, []):
+                diff.delete.add(duplicate)
+                diff.lines.append(u'- %s | duplicate %d' % (
+                    bill_number, duplicate))
+        diff.discussions[bill_number] = discussions
+        diff.lines.append(u'~ %s | %s (%d discussions)' % (
+            bill_number, title, len(discussions)))
+        return bill_number
+
+
+    def _diff_draftlawchild (self, diff, row, parent):
+        """Add changes for a draft law child row to given diff.
+
+        @param diff: diff of current batch
+        @type diff: Diff
+        @param row: data row
+        @type row: [ str ]
+        @param parent: bill number of the parent draft law
+        @type parent: str
         """
         from draftlaw.models import DraftLawChild
         if not parent:
-            return False
+            return
 
         bill_number = self._get_bill_number(row)
         title = row[3].strip()
-        self.stdout.write(' %s | %s ... ' % (bill_number, title))
-
         law_number = self._get_law_number(row[17])
 
-        child = DraftLawChild(
-            parent=parent,
-            bill_number=bill_number,
-            title_ka=title,
-            law_number=law_number,
-        )
-        child.save()
+        pk = self.children.get(bill_number)
+        if bill_number not in self.children:
+            # primary key is only known once the batch is applied
+            self.children[bill_number] = None
+            child = DraftLawChild(bill_number=bill_number, title_ka=title,
+                law_number=law_number)
+            diff.insert_children[bill_number] = (parent, child)
+            diff.lines.append(u'+  %s | %s' % (
+                bill_number, title.decode('utf-8')))
+        elif not self.force:
+            diff.lines.append(u'=  %s | %s: keep already existing' % (
+                bill_number, title.decode('utf-8')))
+        elif pk is not None:
+            diff.update_children[pk] = {
+                'parent': parent, # resolved to a draft law on apply
+                'title_ka': title,
+                'law_number': law_number,
+            }
+            for duplicate in self.duplicate_children.pop(bill_number, []):
+                diff.delete_children.add(duplicate)
+            diff.lines.append(u'~  %s | %s' % (
+                bill_number, title.decode('utf-8')))
+
+
+    def _diff_georgian (self, diff, row):
+        """Add georgian data of a row to the changes of the english record.
+
+        This will overwrite previous data. Records inserted by the same batch
+        get the data before they are inserted, so it doesn't matter where the
+        batch boundaries fall.
+
+        @param diff: diff of current batch
+        @type diff: Diff
+        @param row: data row
+        @type row: [ str ]
+        """
+        from draftlaw.models import DraftLaw
+        bill_number = self._get_bill_number(row)
+        title = row[3].strip()
+        values = {
+            'title_ka': title,
+            'summary_ka': row[6].strip(),
+            'initiator_ka': row[4].strip(),
+            'author_ka': row[5].strip(),
+        }
+
+        pk = self.draftlaws.get(bill_number)
+        if bill_number in diff.insert:
+            draftlaw = diff.insert[bill_number]
+            for name, value in values.iteritems():
+                setattr(draftlaw, name, value)
+            draftlaw.title_ka = title.decode('utf-8') # for the slug
+            draftlaw.slug = draftlaw.make_slug()
+        elif pk is not None:
+            draftlaw = DraftLaw(bill_number=bill_number,
+                title_ka=title.decode('utf-8'))
+            values['slug'] = draftlaw.make_slug()
+            diff.update.setdefault(pk, {}).update(values)
+        elif bill_number in diff.insert_children:
+            diff.insert_children[bill_number][1].title_ka = title
+        elif self.children.get(bill_number) is not None:
+            pk = self.children[bill_number]
+            diff.update_children.setdefault(pk, {})['title_ka'] = title
+        elif bill_number not in self.draftlaws and\
+                bill_number not in self.children:
+            diff.lines.append(u'? %s | bill number does not exist yet' % (
+                bill_number))
+            return
+        # else inserted by an earlier batch of a dry run, nothing to write
+        diff.lines.append(u'~ %s | adding georgian' % bill_number)
 
-        children = DraftLawChild.objects.filter(bill_number=child.bill_number)
-        if len(children) > 1:
-            if self.force:
-                children.exclude(pk=child.pk).delete()
-                self.stdout.write('replace existing!')
-            else:
-                self.stdout.write('keep already existing!')
-                child.delete()
-                return False
-        else:
-            self.stdout.write('add new!')
 
-        return True
+    def _diff (self, rows):
+        """Compute the changes for given batch of rows.
 
+        @param rows: data rows
+        @type rows: [ [ str ] ]
+        @return: changes to apply
+        @rtype: Diff
+        """
+        diff = Diff()
+        for row in rows:
+            if len(row) == COL_KA: # georgian version, add to english original
+                self._diff_georgian(diff, row)
+            elif row[2] == '*': # parent
+                self.parent = self._diff_draftlaw(diff, row)
+            else: # child
+                self._diff_draftlawchild(diff, row, self.parent)
+        return diff
 
-    def _add_georgian (self, row):
-        """Add georgian data to english record.
 
-        This will overwrite previous data.
+    @transaction.commit_on_success
+    def _apply (self, diff):
+        """Apply given changes to the database.
 
-        @param row: data row
-        @type row: [ str ]
-        @return: if data could be added
-        @rtype: bool
+        @param diff: changes to apply
+        @type diff: Diff
         """
-        from draftlaw.models import DraftLaw, DraftLawChild
-        bill_number = self._get_bill_number(row)
-        self.stdout.write('%s | Adding georgian to english ... ' % bill_number)
-        try:
-            obj = DraftLaw.objects.get(bill_number=bill_number)
-        except DraftLaw.DoesNotExist:
-            try:
-                obj = DraftLawChild.objects.get(bill_number=bill_number)
-            except DraftLawChild.DoesNotExist:
-                self.stdout.write('Bill number does not exist yet!')
-                return False
+        from draftlaw.models import DraftLaw, DraftLawDiscussion, DraftLawChild
+
+        if diff.delete:
+            DraftLaw.objects.filter(pk__in=diff.delete).delete()
+        if diff.delete_children:
+            DraftLawChild.objects.filter(pk__in=diff.delete_children).delete()
+
+        if diff.insert:
+            bulk_create(DraftLaw, diff.insert.values())
+            # bulk_create doesn't set primary keys, fetch them in one go
+            self.draftlaws.update(DraftLaw.objects.filter(
+                bill_number__in=diff.insert.keys()).values_list(
+                'bill_number', 'pk'))
+
+        for pk, values in diff.update.iteritems():
+            DraftLaw.objects.filter(pk=pk).update(**values)
+        # initiator/author texts are new or might have changed
+        DraftLaw.render_linked(diff.update.keys() +
+            [self.draftlaws[bill_number] for bill_number in diff.insert])
+
+        if diff.replace_discussions:
+            DraftLawDiscussion.objects.filter(
+                draftlaw__in=diff.replace_discussions).delete()
+        discussions = []
+        for bill_number, items in diff.discussions.iteritems():
+            for discussion in items:
+                discussion.draftlaw_id = self.draftlaws[bill_number]
+                discussions.append(discussion)
+        bulk_create(DraftLawDiscussion, discussions)
+        self.discussed.update(diff.replace_discussions)
+        self.discussed.update(d.draftlaw_id for d in discussions)
+
+        children = []
+        for parent, child in diff.insert_children.itervalues():
+            child.parent_id = self.draftlaws[parent]
+            children.append(child)
+        if children:
+            bulk_create(DraftLawChild, children)
+            self.children.update(DraftLawChild.objects.filter(
+                bill_number__in=[c.bill_number for c in children]).values_list(
+                'bill_number', 'pk'))
+
+        for pk, values in diff.update_children.iteritems():
+            if 'parent' in values:
+                values['parent'] = self.draftlaws[values['parent']]
+            DraftLawChild.objects.filter(pk=pk).update(**values)
+
+
+    def _read (self, filename):
+        """Read valid data rows from given file.
+
+        @param filename: name of the CSV file
+        @type filename: str
+        @return: generator of data rows
+        @rtype: generator
+        """
+        rows = csv.reader(open(filename, 'rb'), delimiter=DELIMITER)
+        rows.next() # header
+        for row in rows:
+            len_row = len(row)
+            if len_row not in [COL_KA, COL_EN]:
+                self.stdout.write('Invalid draftlaw record, only %d columns.\n' % len_row)
+                continue
+            yield row
+
 
-        obj.title_ka = row[3].strip()
-        if hasattr(obj, 'summary'):
-            obj.summary_ka = row[6].strip()
-        if hasattr(obj, 'initiator'):
-            obj.initiator_ka = row[4].strip()
-        if hasattr(obj, 'author'):
-            obj.author_ka = row[5].strip()
-        obj.save()
-        self.stdout.write('OK')
+    def _write_lines (self, lines):
+        """Write given diff lines to stdout.
 
-        return True
+        @param lines: lines to write
+        @type lines: [ unicode ]
+        """
+        for line in lines:
+            try:
+                self.stdout.write(line + '\n')
+            except UnicodeEncodeError: # need this for Python 2.6 *sigh*
+                self.stdout.write(line.encode('utf-8') + '\n')
 
 
     def handle (self, *args, **options):
         """Command handler."""
-        if options.get('force'):
-            self.force = True
-        else:
-            self.force = False
+        self.force = bool(options.get('force'))
+        self.dry_run = bool(options.get('dry_run'))
+        self.verbosity = int(options.get('verbosity', 1))
 
         if len(args) != 1:
             self.stderr.write('Missing file to read CSV data from!\n')
             return
 
-        rows = csv.reader(open(args[0], 'rb'), delimiter=DELIMITER)
-        first = True
-        parent = None
-        for row in rows:
-            if first: # header
-                first = False
+        self._load()
+        self.parent = None
+        self.discussed = set()
+        batch = []
+        totals = [0, 0, 0]
+        for row in self._read(args[0]):
+            batch.append(row)
+            if len(batch) < BATCH_SIZE:
                 continue
+            self._handle_batch(batch, totals)
+            batch = []
+        if batch:
+            self._handle_batch(batch, totals)
+        if self.discussed:
+            self._update_stage_durations()
+        if not self.dry_run:
+            # bulk writes don't send signals
+            versions.bump_app('draftlaw')
+
+        if self.dry_run:
+            fmt = 'Dry run: %d to insert, %d to update, %d to delete.\n'
+        else:
+            fmt = 'Inserted %d, updated %d, deleted %d.\n'
+        self.stdout.write(fmt % tuple(totals))
 
-            len_row = len(row)
-            if len_row not in [COL_KA, COL_EN]:
-                self.stdout.write('Invalid draftlaw record, only %d columns.\n' % len_row)
-                continue
 
-            if len_row == COL_KA: # this is the georgian version, add to english original
-                self._add_georgian(row)
-            else:
-                if row[2] == '*': # parent
-                    parent = self._create_draftlaw(row)
-                else: # child
-                    self._create_draftlawchild(row, parent)
+    @transaction.commit_on_success
+    def _update_stage_durations (self):
+        """Update stage durations of draft laws whose discussions changed."""
+        from draftlaw.models import DraftLawStageDuration
+        DraftLawStageDuration.update(sorted(self.discussed))
+
 
-            self.stdout.write('\n')
+    def _handle_batch (self, rows, totals):
+        """Compute and apply (unless dry run) the changes for given rows.
+
+        @param rows: data rows
+        @type rows: [ [ str ] ]
+        @param totals: running totals of inserts, updates and deletes
+        @type totals: [ int ]
+        """
+        diff = self._diff(rows)
+        if self.dry_run or self.verbosity > 1:
+            self._write_lines(diff.lines)
+        if diff and not self.dry_run:
+            self._apply(diff)
+        for i, count in enumerate(diff.count()):
+            totals[i] += count
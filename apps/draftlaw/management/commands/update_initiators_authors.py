@@ -1,14 +1,31 @@
 # -*- coding: utf-8 -*-
 """
 Command to link draft laws to representatives in initiator / author fields.
+
+A draft law keeps a digest of its initiator/author texts once all names in
+them were resolved, so later runs skip it until the texts change. Draft laws
+with unresolved names are processed again on every run, e.g. after new
+representatives were imported.
 """
 __docformat__ = 'epytext en'
 
+import hashlib
+from optparse import make_option
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.db.models import Q
 
 from draftlaw.models import DraftLaw
-from representative.models import Representative
+from representative.models import NameMatcher
+from util import versions
+from util.db import batches, bulk_create, bulk_update
+
+
+#: fields containing names, by base name of the representatives field
+FIELDS = (
+    ('initiator', ('initiator_en', 'initiator_ka')),
+    ('author', ('author_en', 'author_ka')),
+)
 
 
 
@@ -16,6 +33,18 @@ class Command (BaseCommand):
     """Command to link draft laws to representatives in initiator / author fields."""
     #: help string
     help = 'Command to link draft laws to representatives in initiator / author fields.'
+    #: options
+    option_list = BaseCommand.option_list + (
+        make_option('--all',
+            action='store_true',
+            dest='all',
+            default=False,
+            help='Process all draft laws, not only the ones whose initiator/author changed since the last run.'),
+        make_option('--report',
+            dest='report',
+            default=None,
+            help='Write unresolved names to given file instead of stdout.'),
+    )
 
 
     def _get_names (self, data):
@@ -23,53 +52,185 @@ class Command (BaseCommand):
 
         @param data: data which possibly contains names
         @type data: str
+        @return: names found in data
+        @rtype: [ str ]
         """
+        if not data:
+            return []
+
         names = data.split('(')[0]
         if names.lower().startswith('mp '):
-            names = linked[3:]
+            names = names[3:]
         if names.lower().startswith('mps '):
-           names = linked[4:]
+            names = names[4:]
 
         splitnames = names.split(',')
         if len(splitnames) == 1:
             splitnames = names.split(';')
-        return [n.strip() for n in splitnames]
+        return [n.strip() for n in splitnames if n.strip()]
 
 
-    def _add_representatives (self, draftlaw, field):
-        """Add representatives searching for names in given field.
+    def _digest (self, values):
+        """Get digest of the initiator/author texts of a draft law.
 
-        @param draftlaw: draftlaw to add to
-        @type draftlaw: draftlaw.Draftlaw
-        @param field: field to search for names in
-        @type field: str
+        @param values: values of the draft law, as given by values()
+        @type values: dict
+        @return: hex digest
+        @rtype: str
         """
-        try:
-            names = self._get_names(getattr(draftlaw, field))
-        except AttributeError:
-            return
+        sha = hashlib.sha1()
+        for base, fields in FIELDS:
+            for field in fields:
+                sha.update((values[field] or u'').encode('utf-8'))
+                sha.update('\0')
+        return sha.hexdigest()
 
-        base = field.split('_')[0] # remove language
-        try:
-            field_representatives = getattr(draftlaw, base + '_representatives')
-        except AttributeError:
-            return
 
-        for name in names:
-            representative = Representative.find(name)
-            if representative:
-                self.stdout.write(u'\n %s: %s' % (
-                    field, str(representative.name)))
-                field_representatives.add(representative)
+    def _collect (self, process_all):
+        """Collect names of draft laws to process.
+
+        @param process_all: whether to process draft laws which didn't change
+        @type process_all: bool
+        @return: names by draft law and base field, new digests by draft law
+        @rtype: ({ (int, str): set }, { int: str })
+        """
+        names = {}
+        digests = {}
+        values = DraftLaw.objects.values('pk', 'linked_digest',
+            *[f for base, fields in FIELDS for f in fields])
+        for v in values.iterator():
+            digest = self._digest(v)
+            if not process_all and digest == v['linked_digest']:
+                continue
+            digests[v['pk']] = digest
+            for base, fields in FIELDS:
+                found = set()
+                for field in fields:
+                    found.update(self._get_names(v[field]))
+                names[(v['pk'], base)] = found
+        return names, digests
+
+
+    def _resolve (self, names):
+        """Resolve all distinct names to representatives.
+
+        @param names: names by draft law and base field
+        @type names: { (int, str): set }
+        @return: representatives by name, unresolved names with number of occurrences
+        @rtype: ({ str: int }, { str: int })
+        """
+        matcher = NameMatcher()
+        resolved = {}
+        unresolved = {}
+        for found in names.itervalues():
+            for name in found:
+                pk = matcher.find(name)
+                if pk is None:
+                    unresolved[name] = unresolved.get(name, 0) + 1
+                else:
+                    resolved[name] = pk
+        return resolved, unresolved
+
+
+    def _link (self, base, names, resolved, draftlaws):
+        """Add missing links between draft laws and representatives in bulk.
+
+        Existing links are kept, including the ones added manually.
+
+        @param base: base name of the field, i.e. initiator or author
+        @type base: str
+        @param names: names by draft law and base field
+        @type names: { (int, str): set }
+        @param resolved: representatives by name
+        @type resolved: { str: int }
+        @param draftlaws: primary keys of processed draft laws
+        @type draftlaws: [ int ]
+        @return: number of added links
+        @rtype: int
+        """
+        through = getattr(DraftLaw, base + '_representatives').through
+        existing = set()
+        for pks in batches(draftlaws):
+            existing.update(through.objects.filter(draftlaw__in=pks).values_list(
+                'draftlaw_id', 'representative_id'))
+
+        links = set()
+        for pk in draftlaws:
+            for name in names[(pk, base)]:
+                if name in resolved:
+                    links.add((pk, resolved[name]))
+        links -= existing
+
+        return bulk_create(through, [
+            through(draftlaw_id=d, representative_id=r) for d, r in sorted(links)])
+
+
+    def _unresolved (self, pk, names, resolved):
+        """Whether a draft law has names not resolved to representatives.
+
+        @param pk: primary key of the draft law
+        @type pk: int
+        @param names: names by draft law and base field
+        @type names: { (int, str): set }
+        @param resolved: representatives by name
+        @type resolved: { str: int }
+        @return: if some name is unresolved
+        @rtype: bool
+        """
+        for base, fields in FIELDS:
+            for name in names[(pk, base)]:
+                if name not in resolved:
+                    return True
+        return False
+
+
+    def _report (self, unresolved, filename):
+        """Write names which could not be resolved to representatives.
+
+        @param unresolved: unresolved names with number of occurrences
+        @type unresolved: { str: int }
+        @param filename: file to write to, stdout if None
+        @type filename: str
+        """
+        lines = [u'%d\t%s\n' % (count, name) for name, count in
+            sorted(unresolved.items(), key=lambda x: (-x[1], x[0]))]
+        if filename:
+            out = open(filename, 'w')
+            try:
+                for line in lines:
+                    out.write(line.encode('utf-8'))
+            finally:
+                out.close()
+        else:
+            if lines:
+                self.stdout.write('Unresolved names:\n')
+            for line in lines:
+                self.stdout.write(line.encode('utf-8'))
 
 
     @transaction.commit_on_success
     def handle (self, *args, **options):
         """Command handler."""
-        for d in DraftLaw.objects.all():
-            self.stdout.write(u'Draftlaw: %s' % str(d).decode('utf-8'))
-            self._add_representatives(d, 'initiator_en')
-            self._add_representatives(d, 'initiator_ka')
-            self._add_representatives(d, 'author_en')
-            self._add_representatives(d, 'author_ka')
-            self.stdout.write('\n')
+        names, digests = self._collect(options.get('all'))
+        resolved, unresolved = self._resolve(names)
+
+        draftlaws = sorted(digests.keys())
+        for base, fields in FIELDS:
+            count = self._link(base, names, resolved, draftlaws)
+            self.stdout.write('Added %d %s links.\n' % (count, base))
+        # bulk inserts don't send m2m_changed, draft laws never rendered are
+        # rendered, too
+        unrendered = Q()
+        for field in DraftLaw.linked_html_fields():
+            unrendered |= Q(**{field + '__isnull': True})
+        DraftLaw.render_linked(draftlaws +
+            list(DraftLaw.objects.filter(unrendered).values_list('pk', flat=True)))
+
+        complete = dict((pk, digest) for pk, digest in digests.iteritems()
+            if not self._unresolved(pk, names, resolved))
+        bulk_update(DraftLaw, 'linked_digest', complete)
+        versions.bump_app('draftlaw')
+        self.stdout.write('Processed %d draft laws, resolved %d names.\n' % (
+            len(draftlaws), len(resolved)))
+
+        self._report(unresolved, options.get('report'))
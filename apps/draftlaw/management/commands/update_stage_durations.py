@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+"""
+Command to rebuild stage durations and their statistics of all draft laws.
+"""
+__docformat__ = 'epytext en'
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from draftlaw.models import DraftLawStageDuration, DraftLawStageStatistics
+from util import versions
+
+
+
+class Command (BaseCommand):
+    """Command to rebuild stage durations and their statistics of all draft laws."""
+    #: help string
+    help = 'Rebuild stage durations and their statistics of all draft laws, e.g. after discussions were edited manually.'
+
+
+    @transaction.commit_on_success
+    def handle (self, *args, **options):
+        """Command handler."""
+        DraftLawStageDuration.update()
+        versions.bump(DraftLawStageDuration, DraftLawStageStatistics)
+        self.stdout.write('%d stage durations, %d statistics.\n' % (
+            DraftLawStageDuration.objects.count(),
+            DraftLawStageStatistics.objects.count()))
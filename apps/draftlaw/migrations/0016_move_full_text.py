@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import DataMigration
+from django.db import models
+import base64
+import zlib
+
+
+#: number of draft laws whose full texts are moved at a time
+CHUNK_SIZE = 100
+#: languages of full_text columns
+LANGUAGES = ('en', 'ka')
+
+
+class Migration(DataMigration):
+
+    def forwards(self, orm):
+        "Move full texts to DraftLawFullText, compressed."
+        DraftLaw = orm['draftlaw.DraftLaw']
+        DraftLawFullText = orm['draftlaw.DraftLawFullText']
+        fields = ['full_text_' + language for language in LANGUAGES]
+
+        pks = list(DraftLaw.objects.order_by('pk').values_list('pk', flat=True))
+        for i in xrange(0, len(pks), CHUNK_SIZE):
+            texts = []
+            values = DraftLaw.objects.filter(pk__in=pks[i:i+CHUNK_SIZE]).values_list('pk', *fields)
+            for row in values:
+                for language, text in zip(LANGUAGES, row[1:]):
+                    if text:
+                        texts.append(DraftLawFullText(draftlaw_id=row[0],
+                            language=language,
+                            data=base64.b64encode(zlib.compress(text.encode('utf-8'), 9))))
+            DraftLawFullText.objects.bulk_create(texts)
+
+    def backwards(self, orm):
+        "Move full texts back to DraftLaw, uncompressed."
+        DraftLaw = orm['draftlaw.DraftLaw']
+        DraftLawFullText = orm['draftlaw.DraftLawFullText']
+
+        pks = list(DraftLawFullText.objects.order_by('pk').values_list('pk', flat=True))
+        for i in xrange(0, len(pks), CHUNK_SIZE):
+            for stored in DraftLawFullText.objects.filter(pk__in=pks[i:i+CHUNK_SIZE]):
+                text = zlib.decompress(base64.b64decode(stored.data)).decode('utf-8')
+                values = {'full_text_' + stored.language: text}
+                if stored.language == LANGUAGES[0]:
+                    values['full_text'] = text
+                DraftLaw.objects.filter(pk=stored.draftlaw_id).update(**values)
+            DraftLawFullText.objects.filter(pk__in=pks[i:i+CHUNK_SIZE]).delete()
+
+    models = {
+        'cms.cmsplugin': {
+            'Meta': {'object_name': 'CMSPlugin'},
+            'creation_date': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'language': ('django.db.models.fields.CharField', [], {'max_length': '15', 'db_index': 'True'}),
+            'level': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'lft': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'parent': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['cms.CMSPlugin']", 'null': 'True', 'blank': 'True'}),
+            'placeholder': ('django.db.models.fields.related.ForeignKey', [], {'to': "orm['cms.Placeholder']", 'null': 'True'}),
+            'plugin_type': ('django.db.models.fields.CharField', [], {'max_length': '50', 'db_index': 'True'}),
+            'position': ('django.db.models.fields.PositiveSmallIntegerField', [], {'null': 'True', 'blank': 'True'}),
+            'rght': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'}),
+            'tree_id': ('django.db.models.fields.PositiveIntegerField', [], {'db_index': 'True'})
+        },
+        'cms.placeholder': {
+            'Meta': {'object_name': 'Placeholder'},
+            'default_width': ('django.db.models.fields.PositiveSmallIntegerField', [], {'null': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'slot': ('django.db.models.fields.CharField', [], {'max_length': '50', 'db_index': 'True'})
+        },
+        'draftlaw.draftlaw': {
+            'Meta': {'ordering': "('-bill_number',)", 'object_name': 'DraftLaw'},
+            'author': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'author_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'author_html': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'author_html_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'author_html_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'author_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'author_representatives': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'draftlaw_authored'", 'blank': 'True', 'to': "orm['representative.Representative']"}),
+            'bill_number': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'bureau_date': ('django.db.models.fields.DateField', [], {}),
+            'enable_annotations': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'enacted_text_url': ('django.db.models.fields.CharField', [], {'max_length': '512', 'blank': 'True'}),
+            'full_text': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'full_text_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'full_text_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'full_text_url': ('django.db.models.fields.CharField', [], {'max_length': '512', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'initiator': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'initiator_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'initiator_html': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'initiator_html_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'initiator_html_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'initiator_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'initiator_representatives': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'draftlaw_initiated'", 'blank': 'True', 'to': "orm['representative.Representative']"}),
+            'law_number': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'linked_digest': ('django.db.models.fields.CharField', [], {'max_length': '40', 'blank': 'True'}),
+            'moderate_annotations': ('django.db.models.fields.DateField', [], {'default': 'datetime.date.today'}),
+            'related_1': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'related_2': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'related_3': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'related_4': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'related_5': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'shortstatus': ('django.db.models.fields.CharField', [], {'default': "'D'", 'max_length': '1'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '100'}),
+            'status': ('django.db.models.fields.CharField', [], {'default': "u'Registered at Bureau'", 'max_length': '255', 'blank': 'True'}),
+            'status_en': ('django.db.models.fields.CharField', [], {'default': "u'Registered at Bureau'", 'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'status_ka': ('django.db.models.fields.CharField', [], {'default': "u'Registered at Bureau'", 'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'summary': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'summary_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'summary_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'title': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'title_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'title_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'voting_record': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'voting_on'", 'null': 'True', 'to': "orm['votingrecord.VotingRecord']"})
+        },
+        'draftlaw.draftlawchild': {
+            'Meta': {'object_name': 'DraftLawChild'},
+            'bill_number': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'enacted_text_url': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'law_number': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'parent': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'children'", 'to': "orm['draftlaw.DraftLaw']"}),
+            'title': ('django.db.models.fields.TextField', [], {}),
+            'title_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'title_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'voting_record': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'voting_on_child'", 'null': 'True', 'to': "orm['votingrecord.VotingRecord']"})
+        },
+        'draftlaw.draftlawdiscussion': {
+            'Meta': {'object_name': 'DraftLawDiscussion'},
+            'date': ('django.db.models.fields.DateField', [], {}),
+            'draftlaw': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'discussions'", 'to': "orm['draftlaw.DraftLaw']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'passed': ('django.db.models.fields.CharField', [], {'default': "'N'", 'max_length': '1'}),
+            'place': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'place_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'place_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'stage': ('django.db.models.fields.IntegerField', [], {'default': '0'})
+        },
+        'draftlaw.draftlawfulltext': {
+            'Meta': {'unique_together': "(('draftlaw', 'language'),)", 'object_name': 'DraftLawFullText'},
+            'data': ('django.db.models.fields.TextField', [], {}),
+            'draftlaw': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'full_texts'", 'to': "orm['draftlaw.DraftLaw']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'language': ('django.db.models.fields.CharField', [], {'max_length': '5'})
+        },
+        'draftlaw.draftlawpluginconf': {
+            'Meta': {'object_name': 'DraftLawPluginConf', 'db_table': "'cmsplugin_draftlawpluginconf'", '_ormbases': ['cms.CMSPlugin']},
+            'cmsplugin_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['cms.CMSPlugin']", 'unique': 'True', 'primary_key': 'True'}),
+            'title': ('django.db.models.fields.CharField', [], {'default': "u'Draft Laws'", 'max_length': '32'})
+        },
+        'popit.organisation': {
+            'Meta': {'ordering': "['slug']", 'object_name': 'Organisation'},
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'ended': ('django_date_extensions.fields.ApproximateDateField', [], {'max_length': '10', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '300'}),
+            'started': ('django_date_extensions.fields.ApproximateDateField', [], {'max_length': '10', 'blank': 'True'}),
+            'summary': ('django.db.models.fields.TextField', [], {'default': "''", 'blank': 'True'}),
+            'summary_en': ('django.db.models.fields.TextField', [], {'default': "''", 'null': 'True', 'blank': 'True'}),
+            'summary_ka': ('django.db.models.fields.TextField', [], {'default': "''", 'null': 'True', 'blank': 'True'}),
+            'updated': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'})
+        },
+        'popit.person': {
+            'Meta': {'ordering': "['slug']", 'object_name': 'Person'},
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'date_of_birth': ('django_date_extensions.fields.ApproximateDateField', [], {'max_length': '10', 'blank': 'True'}),
+            'date_of_death': ('django_date_extensions.fields.ApproximateDateField', [], {'max_length': '10', 'blank': 'True'}),
+            'description': ('django.db.models.fields.TextField', [], {'default': "''", 'blank': 'True'}),
+            'description_en': ('django.db.models.fields.TextField', [], {'default': "''", 'null': 'True', 'blank': 'True'}),
+            'description_ka': ('django.db.models.fields.TextField', [], {'default': "''", 'null': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '50'}),
+            'updated': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'blank': 'True'})
+        },
+        'representative.cabinet': {
+            'Meta': {'ordering': "['position']", 'object_name': 'Cabinet'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'name_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'name_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'position': ('django.db.models.fields.IntegerField', [], {'default': 'None', 'null': 'True', 'blank': 'True'}),
+            'short': ('django.db.models.fields.CharField', [], {'max_length': '32'})
+        },
+        'representative.faction': {
+            'Meta': {'object_name': 'Faction'},
+            'cabinet': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'faction'", 'null': 'True', 'to': "orm['representative.Cabinet']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'name_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'name_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'short': ('django.db.models.fields.CharField', [], {'max_length': '32'})
+        },
+        'representative.party': {
+            'Meta': {'ordering': "['slug']", 'object_name': 'Party', '_ormbases': ['popit.Organisation']},
+            'acronym': ('django.db.models.fields.CharField', [], {'max_length': '16'}),
+            'logo': ('django.db.models.fields.files.ImageField', [], {'max_length': '100', 'null': 'True', 'blank': 'True'}),
+            'organisation_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['popit.Organisation']", 'unique': 'True', 'primary_key': 'True'}),
+            'url': ('django.db.models.fields.TextField', [], {'blank': 'True'})
+        },
+        'representative.representative': {
+            'Meta': {'ordering': "['slug']", 'object_name': 'Representative', '_ormbases': ['popit.Person']},
+            'answered': ('django.db.models.fields.FloatField', [], {'default': '0', 'null': 'True', 'blank': 'True'}),
+            'committee': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'committee_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'committee_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'contact_address_phone': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'contact_address_phone_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'contact_address_phone_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'declaration_id': ('django.db.models.fields.IntegerField', [], {'default': '0', 'null': 'True', 'blank': 'True'}),
+            'education': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'education_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'education_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'elected': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'elected_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'elected_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'electoral_district': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'electoral_district_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'electoral_district_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'entrepreneurial_salary': ('django.db.models.fields.FloatField', [], {'default': '0', 'null': 'True', 'blank': 'True'}),
+            'expenses': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'expenses_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'expenses_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'faction': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'representatives'", 'null': 'True', 'to': "orm['representative.Faction']"}),
+            'family_status': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'family_status_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'family_status_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'gender': ('django.db.models.fields.IntegerField', [], {'default': '0', 'null': 'True', 'blank': 'True'}),
+            'is_majoritarian': ('django.db.models.fields.BooleanField', [], {'default': 'False'}),
+            'main_salary': ('django.db.models.fields.FloatField', [], {'default': '0', 'null': 'True', 'blank': 'True'}),
+            'other_income': ('django.db.models.fields.FloatField', [], {'default': '0', 'null': 'True', 'blank': 'True'}),
+            'party': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'representatives'", 'null': 'True', 'to': "orm['representative.Party']"}),
+            'person_ptr': ('django.db.models.fields.related.OneToOneField', [], {'to': "orm['popit.Person']", 'unique': 'True', 'primary_key': 'True'}),
+            'photo': ('django.db.models.fields.files.ImageField', [], {'max_length': '100', 'null': 'True', 'blank': 'True'}),
+            'pob': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'pob_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'pob_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'property_assets': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'property_assets_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'property_assets_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'salary': ('django.db.models.fields.FloatField', [], {'default': '0', 'null': 'True', 'blank': 'True'}),
+            'submission_date': ('django.db.models.fields.DateField', [], {'null': 'True', 'blank': 'True'}),
+            'terms': ('django.db.models.fields.related.ManyToManyField', [], {'blank': 'True', 'related_name': "'representatives'", 'null': 'True', 'symmetrical': 'False', 'to': "orm['representative.Term']"}),
+            'unit': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'representatives'", 'null': 'True', 'to': "orm['representative.Unit']"})
+        },
+        'representative.term': {
+            'Meta': {'object_name': 'Term'},
+            'end': ('django.db.models.fields.DateField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'name_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'name_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'start': ('django.db.models.fields.DateField', [], {})
+        },
+        'representative.unit': {
+            'Meta': {'object_name': 'Unit'},
+            'active_term': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'unit_active'", 'null': 'True', 'to': "orm['representative.Term']"}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'inactive_terms': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'unit_inactive'", 'blank': 'True', 'to': "orm['representative.Term']"}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'name_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'name_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'parties': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'unit'", 'symmetrical': 'False', 'to': "orm['representative.Party']"}),
+            'short': ('django.db.models.fields.CharField', [], {'max_length': '32'})
+        },
+        'votingrecord.votingrecord': {
+            'Meta': {'ordering': "['-date', '-number']", 'object_name': 'VotingRecord'},
+            'amended_by': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'amending'", 'null': 'True', 'to': "orm['votingrecord.VotingRecord']"}),
+            'date': ('django.db.models.fields.DateField', [], {'null': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'kan_id': ('django.db.models.fields.IntegerField', [], {'null': 'True'}),
+            'kan_id_chars': ('django.db.models.fields.CharField', [], {'max_length': '512', 'blank': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '512'}),
+            'name_en': ('django.db.models.fields.CharField', [], {'max_length': '512', 'null': 'True', 'blank': 'True'}),
+            'name_ka': ('django.db.models.fields.CharField', [], {'max_length': '512', 'null': 'True', 'blank': 'True'}),
+            'number': ('django.db.models.fields.CharField', [], {'max_length': '32', 'blank': 'True'}),
+            'scrape_date': ('django.db.models.fields.DateField', [], {'null': 'True'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '100'}),
+            'url': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'})
+        }
+    }
+
+    complete_apps = ['draftlaw']
+    symmetrical = True
\ No newline at end of file
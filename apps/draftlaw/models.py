@@ -7,14 +7,73 @@ Depends on votingrecord and representative.
 """
 __docformat__ = 'epytext en'
 
+import base64
+import codecs
 import datetime
+import zlib
 from cms.models.pluginmodel import CMSPlugin
+from django.conf import settings
 from django.db import models
-from django.utils.translation import get_language, ugettext_lazy as _
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils.translation import activate, get_language, ugettext_lazy as _
 
 from glt import slughifi
 from votingrecord.models import VotingRecord
 from representative.models import Representative
+from popit.bulk import people_upserted
+from popit.models import PersonName
+from util.db import batches, bulk_create, bulk_update
+from util.stats import distribution
+
+
+#: zlib compression level of full texts
+COMPRESS_LEVEL = 9
+#: number of compressed bytes decompressed at a time when streaming full texts
+CHUNK_SIZE = 16384
+#: year of dates imported as unknown
+UNKNOWN_YEAR = 1970
+
+
+
+class FullText (object):
+    """Descriptor for the full text of a draft law.
+
+    The text is stored compressed in L{DraftLawFullText} and only loaded on
+    first access. Texts which are set are written on DraftLaw.save.
+    """
+
+    def __init__ (self, language=None):
+        """
+        @param language: language of the text, the current language if None
+        @type language: str
+        """
+        self.language = language
+
+
+    def _get_language (self):
+        return self.language or (get_language() or settings.LANGUAGE_CODE)[:2]
+
+
+    def __get__ (self, instance, owner):
+        if instance is None:
+            return self
+
+        language = self._get_language()
+        texts = instance.__dict__.setdefault('_full_texts', {})
+        if language not in texts:
+            if instance.pk:
+                texts[language] = DraftLawFullText.get_text(instance.pk, language)
+            else:
+                texts[language] = u''
+        return texts[language]
+
+
+    def __set__ (self, instance, value):
+        language = self._get_language()
+        instance.__dict__.setdefault('_full_texts', {})[language] = value or u''
+        instance.__dict__.setdefault('_full_texts_changed', set()).add(language)
 
 
 
@@ -52,8 +111,8 @@ class DraftLaw (models.Model):
         help_text=_('Short Status of the Draft Law'))
     #: summary of the law
     summary = models.TextField(help_text=_('Summary'), blank=True)
-    #: full text of the law
-    full_text = models.TextField(help_text=_('Full Text'), blank=True)
+    #: full text of the law, see DraftLawFullText
+    full_text = FullText()
     #: URL of the full text of the law
     full_text_url = models.CharField(max_length=512,
         help_text=_('Full Text URL'), blank=True)
@@ -75,6 +134,12 @@ class DraftLaw (models.Model):
     related_4 = models.FileField(upload_to='draftlaw', help_text=_('Related Document 4'), blank=True)
     #: related document 5
     related_5 = models.FileField(upload_to='draftlaw', help_text=_('Related Document 5'), blank=True)
+    #: digest of initiator/author texts when representatives were last linked
+    linked_digest = models.CharField(max_length=40, blank=True, editable=False)
+    #: rendered initiator_linked, see render_linked, None if not rendered yet
+    initiator_html = models.TextField(blank=True, null=True, editable=False)
+    #: rendered author_linked, see render_linked, None if not rendered yet
+    author_html = models.TextField(blank=True, null=True, editable=False)
     #: for moderation
     enable_annotations = models.BooleanField(default=True, editable=False)
     moderate_annotations = models.DateField(default=datetime.date.today, editable=False)
@@ -84,10 +149,27 @@ class DraftLaw (models.Model):
         ordering = ('-bill_number',)
 
 
-    def save (self, *args, **kwargs):
+    def make_slug (self):
+        """Get the slug for this draft law, without saving it.
+
+        Used by save() and by importers writing in bulk, bypassing save().
+
+        @return: slug built from bill number and title
+        @rtype: str
+        """
         max_len = self._meta.get_field('slug').max_length
-        self.slug = slughifi(str(self)[:max_len]).strip('#').replace('/','')
+        return slughifi(str(self)[:max_len]).strip('#').replace('/','')
+
+
+    def save (self, *args, **kwargs):
+        self.slug = self.make_slug()
         super(DraftLaw, self).save(*args, **kwargs)
+        # initiator/author texts might have changed
+        DraftLaw.render_linked([self.pk])
+
+        for language in self.__dict__.pop('_full_texts_changed', ()):
+            DraftLawFullText.set_text(self.pk, language,
+                self._full_texts[language])
 
 
     def __unicode__ (self):
@@ -99,19 +181,22 @@ class DraftLaw (models.Model):
         return ('draftlaw_detail', [self.slug])
 
 
-    def _linked_names (self, field_base):
+    def _linked_names (self, field_base, representatives=None):
         """Get a list of initiators/authors, possibly with links to
         representatives' pages.
 
         @param field_base: basename of the field to get the name from
         @type field_base: str
+        @param representatives: linked representatives, queried if None
+        @type representatives: [ representative.Representative ]
         @return: item with properly linked representative(s)
         @rtype: str
         """
         linked = []
         names = []
 
-        representatives = getattr(self, field_base + '_representatives').all()
+        if representatives is None:
+            representatives = getattr(self, field_base + '_representatives').all()
         if representatives:
             for r in representatives:
                 name = str(r.name).decode('utf-8')
@@ -136,13 +221,145 @@ class DraftLaw (models.Model):
         return ', '.join(linked)
 
 
+    def _linked_html (self, field_base):
+        """Get rendered initiators/authors in the current language.
+
+        Reads field <field_base>_html of the current language, stored by
+        L{render_linked}. Draft laws not rendered yet are rendered here, but
+        not stored, so showing draft laws writes nothing.
+
+        @param field_base: basename of the field to get the name from
+        @type field_base: str
+        @return: item with properly linked representative(s)
+        @rtype: str
+        """
+        html = getattr(self, field_base + '_html_' + get_language()[:2], None)
+        if html is None:
+            html = self._linked_names(field_base)
+        return html
+
+
     @property
     def initiator_linked (self):
-        return self._linked_names('initiator')
+        return self._linked_html('initiator')
 
     @property
     def author_linked (self):
-        return self._linked_names('author')
+        return self._linked_html('author')
+
+
+    @classmethod
+    def linked_html_fields (cls):
+        """Get names of the fields storing rendered initiators/authors.
+
+        @return: field names in all languages
+        @rtype: [ str ]
+        """
+        return ['%s_html_%s' % (base, lang[0])
+            for base in ('initiator', 'author') for lang in settings.LANGUAGES]
+
+
+    @classmethod
+    def render_linked (cls, pks=None):
+        """Render initiators/authors of given draft laws in all languages and
+        store them.
+
+        To be called whenever linked representatives, their names or the
+        initiator/author texts change. Commands writing m2m links or draft
+        laws in bulk send no signals and have to call this themselves. Links
+        and representatives are read with two queries per field and batch.
+
+        @param pks: primary keys of draft laws, all if None
+        @type pks: [ int ]
+        """
+        if pks is None:
+            pks = list(cls.objects.values_list('pk', flat=True))
+        pks = sorted(set(pk for pk in pks if pk is not None))
+        language = get_language()
+        try:
+            for batch in batches(pks):
+                cls._render_linked(batch)
+        finally:
+            activate(language)
+
+
+    @classmethod
+    def _render_linked (cls, pks):
+        """Render and store initiators/authors of a batch, see L{render_linked}."""
+        linked = {}
+        representatives = {}
+        for base in ('initiator', 'author'):
+            through = getattr(cls, base + '_representatives').through
+            for draftlaw, representative in through.objects.filter(
+                    draftlaw__in=pks).values_list('draftlaw_id', 'representative_id'):
+                linked.setdefault((draftlaw, base), set()).add(representative)
+                representatives[representative] = None
+        # ordered as by the related managers
+        ordered = list(Representative.objects.filter(pk__in=representatives.keys()))
+
+        values = dict((field, {}) for field in cls.linked_html_fields())
+        draftlaws = list(cls.objects.filter(pk__in=pks))
+        for code, name in settings.LANGUAGES:
+            activate(code)
+            for draftlaw in draftlaws:
+                for base in ('initiator', 'author'):
+                    links = linked.get((draftlaw.pk, base), ())
+                    values['%s_html_%s' % (base, code)][draftlaw.pk] = draftlaw._linked_names(
+                        base, [r for r in ordered if r.pk in links])
+        for field, by_pk in values.iteritems():
+            bulk_update(cls, field, by_pk)
+
+
+
+@receiver(m2m_changed, sender=DraftLaw.initiator_representatives.through,
+    dispatch_uid='apps.draftlaw.m2m_changed.initiator_representatives')
+@receiver(m2m_changed, sender=DraftLaw.author_representatives.through,
+    dispatch_uid='apps.draftlaw.m2m_changed.author_representatives')
+def render_linked_representatives (sender, instance, action, reverse, pk_set, **kwargs):
+    """Render initiators/authors when linked representatives change."""
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            DraftLaw.render_linked([instance.pk])
+    elif action in ('post_add', 'post_remove'):
+        DraftLaw.render_linked(list(pk_set))
+    elif action == 'pre_clear':
+        # draft laws are gone from the relation on post_clear
+        instance._draftlaws_cleared = list(DraftLaw.objects.filter(
+            Q(initiator_representatives=instance) |
+            Q(author_representatives=instance)).values_list('pk', flat=True))
+    elif action == 'post_clear':
+        DraftLaw.render_linked(instance.__dict__.pop('_draftlaws_cleared', []))
+
+
+
+@receiver(post_save, sender=PersonName,
+    dispatch_uid='apps.draftlaw.post_save.personname')
+@receiver(post_delete, sender=PersonName,
+    dispatch_uid='apps.draftlaw.post_delete.personname')
+def render_linked_renamed (sender, instance, **kwargs):
+    """Render initiators/authors when a representative is renamed.
+
+    Names are kept by PersonName, so saving a representative renders nothing.
+    """
+    pk = instance.person_id
+    DraftLaw.render_linked(list(DraftLaw.objects.filter(
+        Q(initiator_representatives=pk) |
+        Q(author_representatives=pk)).distinct().values_list('pk', flat=True)))
+
+
+
+@receiver(people_upserted, dispatch_uid='apps.draftlaw.people_upserted')
+def render_linked_upserted (sender, people, **kwargs):
+    """Render initiators/authors when representatives are written in bulk."""
+    pks = [person.pk for person in people]
+    DraftLaw.render_linked(list(DraftLaw.objects.filter(
+        Q(initiator_representatives__in=pks) |
+        Q(author_representatives__in=pks)).distinct().values_list('pk', flat=True)))
+
+
+
+for language in settings.LANGUAGES:
+    setattr(DraftLaw, 'full_text_' + language[0], FullText(language[0]))
 
 
 
@@ -202,6 +419,328 @@ class DraftLawChild (models.Model):
 
 
 
+class DraftLawFullText (models.Model):
+    """Full text of a draft law in one language.
+
+    Kept apart from DraftLaw and compressed, as full texts can be hundreds of
+    kilobytes each and would otherwise be loaded with every draft law.
+    """
+    #: the draft law
+    draftlaw = models.ForeignKey(DraftLaw, related_name='full_texts')
+    #: language of the text
+    language = models.CharField(max_length=5)
+    #: text compressed with zlib, base64-encoded to fit a text column
+    data = models.TextField()
+
+    class Meta:
+        unique_together = (('draftlaw', 'language'),)
+
+
+    def __unicode__ (self):
+        return u'%s (%s)' % (self.draftlaw_id, self.language)
+
+
+    @classmethod
+    def compress (cls, text):
+        """Compress given text for storage.
+
+        @param text: text to compress
+        @type text: unicode
+        @return: compressed and encoded text
+        @rtype: str
+        """
+        return base64.b64encode(zlib.compress(text.encode('utf-8'), COMPRESS_LEVEL))
+
+
+    def iter_text (self, chunk_size=CHUNK_SIZE):
+        """Decompress the text piece by piece.
+
+        @param chunk_size: number of compressed bytes to decompress at a time
+        @type chunk_size: int
+        @return: generator of parts of the text
+        @rtype: generator
+        """
+        data = base64.b64decode(self.data)
+        decompressor = zlib.decompressobj()
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        for i in xrange(0, len(data), chunk_size):
+            text = decoder.decode(decompressor.decompress(data[i:i+chunk_size]))
+            if text:
+                yield text
+        text = decoder.decode(decompressor.flush(), True)
+        if text:
+            yield text
+
+
+    @property
+    def text (self):
+        return u''.join(self.iter_text())
+
+
+    @classmethod
+    def get_text (cls, draftlaw_id, language):
+        """Get the full text of a draft law.
+
+        @param draftlaw_id: primary key of the draft law
+        @type draftlaw_id: int
+        @param language: language of the text
+        @type language: str
+        @return: the full text, empty if there is none
+        @rtype: unicode
+        """
+        try:
+            return cls.objects.get(draftlaw=draftlaw_id, language=language).text
+        except cls.DoesNotExist:
+            return u''
+
+
+    @classmethod
+    def set_text (cls, draftlaw_id, language, text):
+        """Store the full text of a draft law, deleting it if empty.
+
+        @param draftlaw_id: primary key of the draft law
+        @type draftlaw_id: int
+        @param language: language of the text
+        @type language: str
+        @param text: the full text
+        @type text: unicode
+        """
+        texts = cls.objects.filter(draftlaw=draftlaw_id, language=language)
+        if not text:
+            texts.delete()
+        elif not texts.update(data=cls.compress(text)):
+            cls.objects.create(draftlaw_id=draftlaw_id, language=language,
+                data=cls.compress(text))
+
+
+    @classmethod
+    def load (cls, draftlaws, language):
+        """Load full texts of given draft laws with one query.
+
+        For lists which explicitly need the full texts; draft laws load them
+        one by one otherwise.
+
+        @param draftlaws: draft laws to load full texts for
+        @type draftlaws: [ DraftLaw ]
+        @param language: language of the texts
+        @type language: str
+        """
+        texts = {}
+        for batch in batches([d.pk for d in draftlaws]):
+            for stored in cls.objects.filter(draftlaw__in=batch, language=language):
+                texts[stored.draftlaw_id] = stored.text
+        for draftlaw in draftlaws:
+            draftlaw.__dict__.setdefault('_full_texts', {})[language] = \
+                texts.get(draftlaw.pk, u'')
+
+
+
+class DraftLawStageDuration (models.Model):
+    """Time a draft law spent in a discussion stage.
+
+    Derived from the draft law's discussions by L{update}, to answer questions
+    about the lifecycle of laws without scanning all discussions.
+    """
+    #: the draft law
+    draftlaw = models.ForeignKey(DraftLaw, related_name='stage_durations')
+    #: stage of the discussion: [0..5]
+    stage = models.IntegerField()
+    #: date of the first discussion in this stage
+    start = models.DateField()
+    #: date of the first discussion in a later stage, None if there is none yet
+    end = models.DateField(blank=True, null=True)
+    #: days spent in this stage, None if there is no later stage yet
+    days = models.IntegerField(blank=True, null=True)
+    #: days from bureau date to the start of this stage
+    elapsed = models.IntegerField(blank=True, null=True)
+    #: initiator of the draft law, for aggregates
+    initiator = models.CharField(max_length=255, blank=True, db_index=True)
+    #: year of the bureau date of the draft law, for aggregates
+    year = models.IntegerField(db_index=True)
+
+    class Meta:
+        unique_together = (('draftlaw', 'stage'),)
+
+
+    def __unicode__ (self):
+        return u'%s %s: %s' % (self.draftlaw_id, self.stage, self.days)
+
+
+    @classmethod
+    def _get_durations (cls, draftlaw, discussions):
+        """Get stage durations of a draft law.
+
+        @param draftlaw: values of the draft law
+        @type draftlaw: dict
+        @param discussions: (stage, date) of the draft law's discussions
+        @type discussions: [ (int, datetime.date) ]
+        @return: unsaved stage durations
+        @rtype: [ DraftLawStageDuration ]
+        """
+        starts = {}
+        for stage, date in discussions:
+            if date.year == UNKNOWN_YEAR:
+                continue
+            if stage not in starts or date < starts[stage]:
+                starts[stage] = date
+
+        bureau_date = draftlaw['bureau_date']
+        if bureau_date.year == UNKNOWN_YEAR:
+            bureau_date = None
+        initiator = draftlaw['initiator_ka'] or draftlaw['initiator_en'] or u''
+
+        durations = []
+        stages = sorted(starts.keys())
+        for i, stage in enumerate(stages):
+            duration = cls(draftlaw_id=draftlaw['pk'], stage=stage,
+                start=starts[stage], initiator=initiator[:255],
+                year=draftlaw['bureau_date'].year)
+            if i + 1 < len(stages):
+                duration.end = starts[stages[i + 1]]
+                duration.days = (duration.end - duration.start).days
+            if bureau_date:
+                duration.elapsed = (duration.start - bureau_date).days
+            durations.append(duration)
+        return durations
+
+
+    @classmethod
+    def update (cls, draftlaw_ids=None):
+        """Update stage durations of given draft laws and the statistics
+        they contribute to.
+
+        To be called whenever discussions of draft laws change.
+
+        @param draftlaw_ids: primary keys of draft laws, all if None
+        @type draftlaw_ids: [ int ]
+        """
+        if draftlaw_ids is None:
+            draftlaw_ids = list(DraftLaw.objects.values_list('pk', flat=True))
+            groups = None
+        else:
+            groups = set()
+
+        for batch in batches(draftlaw_ids):
+            existing = cls.objects.filter(draftlaw__in=batch)
+            if groups is not None:
+                for initiator, year in existing.values_list('initiator', 'year'):
+                    groups.add(('initiator', initiator))
+                    groups.add(('year', unicode(year)))
+            existing.delete()
+
+            discussions = {}
+            for draftlaw_id, stage, date in DraftLawDiscussion.objects.filter(
+                    draftlaw__in=batch).values_list('draftlaw', 'stage', 'date'):
+                discussions.setdefault(draftlaw_id, []).append((stage, date))
+
+            durations = []
+            for draftlaw in DraftLaw.objects.filter(pk__in=batch).values(
+                    'pk', 'bureau_date', 'initiator_en', 'initiator_ka'):
+                durations.extend(cls._get_durations(draftlaw,
+                    discussions.get(draftlaw['pk'], [])))
+            bulk_create(cls, durations)
+
+            if groups is not None:
+                for duration in durations:
+                    groups.add(('initiator', duration.initiator))
+                    groups.add(('year', unicode(duration.year)))
+
+        DraftLawStageStatistics.update(groups)
+
+
+
+class DraftLawStageStatistics (models.Model):
+    """Distribution of stage durations for a group of draft laws.
+
+    Precomputed from L{DraftLawStageDuration}, so percentiles can be served
+    without aggregating anything.
+    """
+    GROUP_BY_CHOICES = (
+        ('all', _('All')),
+        ('initiator', _('Initiator')),
+        ('year', _('Year')),
+    )
+    METRIC_CHOICES = (
+        ('days', _('Days in stage')),
+        ('elapsed', _('Days from bureau date to stage')),
+    )
+
+    #: what the draft laws are grouped by
+    group_by = models.CharField(max_length=16, choices=GROUP_BY_CHOICES)
+    #: the group, i.e. initiator or year; empty for all
+    group = models.CharField(max_length=255, blank=True)
+    #: stage of the discussion: [0..5]
+    stage = models.IntegerField()
+    #: field of DraftLawStageDuration summarised
+    metric = models.CharField(max_length=16, choices=METRIC_CHOICES)
+    #: number of draft laws
+    count = models.IntegerField()
+    minimum = models.IntegerField(blank=True, null=True)
+    maximum = models.IntegerField(blank=True, null=True)
+    mean = models.FloatField(blank=True, null=True)
+    p10 = models.FloatField(blank=True, null=True)
+    p25 = models.FloatField(blank=True, null=True)
+    median = models.FloatField(blank=True, null=True)
+    p75 = models.FloatField(blank=True, null=True)
+    p90 = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        ordering = ('group_by', 'group', 'stage', 'metric')
+        unique_together = (('group_by', 'group', 'stage', 'metric'),)
+
+
+    def __unicode__ (self):
+        return u'%s %s %s %s' % (self.group_by, self.group, self.stage, self.metric)
+
+
+    @classmethod
+    def _update_group (cls, group_by, group):
+        """Recompute the statistics of one group.
+
+        @param group_by: what the draft laws are grouped by
+        @type group_by: str
+        @param group: the group
+        @type group: unicode
+        """
+        durations = DraftLawStageDuration.objects.all()
+        if group_by == 'initiator':
+            durations = durations.filter(initiator=group)
+        elif group_by == 'year':
+            durations = durations.filter(year=int(group))
+
+        values = {}
+        for stage, days, elapsed in durations.values_list('stage', 'days', 'elapsed'):
+            for metric, value in (('days', days), ('elapsed', elapsed)):
+                if value is not None:
+                    values.setdefault((stage, metric), []).append(value)
+
+        cls.objects.filter(group_by=group_by, group=group).delete()
+        bulk_create(cls, [cls(group_by=group_by, group=group,
+            stage=stage, metric=metric, **distribution(items))
+            for (stage, metric), items in sorted(values.items())])
+
+
+    @classmethod
+    def update (cls, groups=None):
+        """Recompute the statistics of given groups and of all draft laws.
+
+        @param groups: (group_by, group) to update, all if None
+        @type groups: set
+        """
+        if groups is None:
+            cls.objects.all().delete()
+            groups = set()
+            for initiator, year in DraftLawStageDuration.objects.values_list(
+                    'initiator', 'year').distinct():
+                groups.add(('initiator', initiator))
+                groups.add(('year', unicode(year)))
+
+        groups.add(('all', u''))
+        for group_by, group in sorted(groups):
+            cls._update_group(group_by, group)
+
+
+
 # There must be a bug in CMS plugin models. Without exception handler, on
 # running an admin command, the class definition would yield:
 #  File "/votingrecord/models.py", line 70, in <module>
@@ -21,8 +21,12 @@ class DraftLawIndex (SearchIndex):
     author = CharField(model_attr='author', null=True)
     status = CharField(model_attr='status', null=True)
     summary = CharField(model_attr='summary', null=True)
-    full_text = CharField(model_attr='full_text', null=True)
+    full_text = CharField(null=True, stored=False)
     full_text_url = CharField(model_attr='full_text_url', null=True)
     enacted_text_url = CharField(model_attr='enacted_text_url', null=True)
     law_number = CharField(model_attr='law_number', null=True)
+
+    def prepare_full_text (self, obj):
+        # only indexed, as search results would load it with every hit
+        return obj.full_text
 site.register(DraftLaw, DraftLawIndex)
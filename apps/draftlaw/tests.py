@@ -4,11 +4,19 @@ Tests for app draftlaw
 """
 __docformat__ = 'epytext en'
 
+import csv
+import os
+import tempfile
+from StringIO import StringIO
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from django.utils.translation import activate
 
-from draftlaw.models import DraftLaw
+from draftlaw.management.commands import import_draftlaws
+from draftlaw.models import DraftLaw, DraftLawChild, DraftLawFullText,\
+    DraftLawStageDuration, DraftLawStageStatistics
+from representative.models import Representative
 
 
 class DraftLawTest (TestCase):
@@ -29,6 +37,91 @@ class DraftLawTest (TestCase):
         self.assertEqual(draftlaw.author_linked, linked)
 
 
+    def test_linked_name_stored (self):
+        activate('en')
+        linked = DraftLaw.objects.get(pk=6).initiator_linked
+        # showing a draft law not rendered yet writes nothing
+        self.assertEqual(DraftLaw.objects.get(pk=6).initiator_html_en, None)
+        DraftLaw.render_linked([6])
+        self.assertEqual(DraftLaw.objects.get(pk=6).initiator_html_en, linked)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(DraftLaw.objects.get(pk=6).initiator_linked, linked)
+
+        # saving a representative doesn't rename it
+        DraftLaw.objects.filter(pk=6).update(initiator_html_en=u'stored')
+        Representative.objects.get(pk=124).save()
+        self.assertEqual(DraftLaw.objects.get(pk=6).initiator_html_en, u'stored')
+        DraftLaw.objects.filter(pk=6).update(initiator_html_en=linked)
+
+        DraftLaw.objects.get(pk=6).initiator_representatives.clear()
+        draftlaw = DraftLaw.objects.get(pk=6)
+        self.assertEqual(draftlaw.initiator_html_en, u'Tsurtsumia, Kukava')
+        self.assertEqual(draftlaw.initiator_linked, u'Tsurtsumia, Kukava')
+
+
+    def test_link_digest (self):
+        texts = dict((f, 'Tsurtsumia') for f in
+            ('initiator_en', 'initiator_ka', 'author_en', 'author_ka'))
+        DraftLaw.objects.filter(pk=3).update(**texts)
+        call_command('update_initiators_authors', stdout=StringIO())
+
+        draftlaw = DraftLaw.objects.get(pk=3)
+        self.assertEqual(list(draftlaw.initiator_representatives.values_list(
+            'pk', flat=True)), [124])
+        # resolved laws are skipped by later runs, the others are not
+        self.assertNotEqual(draftlaw.linked_digest, '')
+        self.assertEqual(DraftLaw.objects.get(pk=6).linked_digest, '')
+
+
+    def test_full_text (self):
+        activate('en')
+        text = u'Full text \u10d0 ' * 10000
+        draftlaw = DraftLaw.objects.get(pk=1)
+        self.assertEqual(draftlaw.full_text, u'')
+        draftlaw.full_text = text
+        draftlaw.save()
+
+        stored = DraftLawFullText.objects.get(draftlaw=draftlaw, language='en')
+        self.assertTrue(len(stored.data) < len(text))
+        self.assertEqual(DraftLaw.objects.get(pk=1).full_text, text)
+        self.assertEqual(DraftLaw.objects.get(pk=1).full_text_ka, u'')
+
+        draftlaw.full_text_ka = text
+        draftlaw.save()
+        url = reverse('draftlaw_full_text', args=[1])
+        response = self.client.get(url)
+        self.assertEqual(response.content.decode('utf-8'), text)
+
+        # the detail page links to the text instead of showing it
+        response = self.client.get(reverse('draftlaw_detail', args=[draftlaw.slug]))
+        self.assertContains(response, url)
+        self.assertNotContains(response, text[:100])
+
+        draftlaw.full_text_en = u''
+        draftlaw.full_text_ka = u''
+        draftlaw.save()
+        self.assertFalse(DraftLawFullText.objects.filter(draftlaw=draftlaw).exists())
+
+
+    def test_stage_durations (self):
+        DraftLawStageDuration.update([1])
+        durations = DraftLawStageDuration.objects.filter(draftlaw=1)
+        # discussion on stage 1 has unknown date
+        self.assertEqual([d.stage for d in durations.order_by('stage')], [2, 3])
+        self.assertEqual(durations.get(stage=2).days, 1)
+        self.assertEqual(durations.get(stage=3).days, None)
+
+        statistics = DraftLawStageStatistics.objects.get(group_by='all',
+            stage=2, metric='days')
+        self.assertEqual(statistics.count, 1)
+        self.assertEqual(statistics.median, 1)
+
+        url = reverse('draftlaw_statistics')
+        response = self.client.get(url, {'group_by': 'year'})
+        self.assertTemplateUsed(response, 'draftlaw/statistics.html')
+        self.assertEqual(response.context['group_by'], 'year')
+
 
     def test_List (self):
         url = reverse('draftlaw_list')
@@ -68,3 +161,104 @@ class DraftLawTest (TestCase):
         url = reverse('draftlaw_query', args=['zone'])
         response = self.client.get(url)
         self.assertContains(response, '"pk": 8')
+
+
+
+def _english_row (bill_number, title, parent=True):
+    """Get a CSV row of the english draft laws, see import_draftlaws."""
+    return ['01.02.12', bill_number, '*' if parent else '', title,
+        'Initiator', 'Author', 'Summary'] + [''] * 11
+
+
+def _georgian_row (bill_number, title):
+    """Get a CSV row of the georgian draft laws, see import_draftlaws."""
+    return ['01.02.12', bill_number, '*', title,
+        'Initiator ka', 'Author ka', 'Summary ka', '', '']
+
+
+
+class ImportTest (TestCase):
+    """Command import_draftlaws."""
+    fixtures = ['draftlaw_testdata']
+    #: law, its child and their georgian rows
+    rows = [
+        _english_row('99-1', 'Law'),
+        _english_row('99-1/1', 'Child', parent=False),
+        _georgian_row('99-1', 'Law ka'),
+        _georgian_row('99-1/1', 'Child ka'),
+        _georgian_row('99-2', 'Unknown'),
+    ]
+
+    def _write (self, rows):
+        handle = tempfile.NamedTemporaryFile(suffix='.csv', delete=False)
+        writer = csv.writer(handle)
+        writer.writerow(['header'])
+        writer.writerows(rows)
+        handle.close()
+        self.addCleanup(os.remove, handle.name)
+        return handle.name
+
+
+    def _import (self, rows, **options):
+        out = StringIO()
+        call_command('import_draftlaws', self._write(rows), stdout=out, **options)
+        return out.getvalue()
+
+
+    def test_diff (self):
+        command = import_draftlaws.Command()
+        command._load()
+        command.parent = None
+        diff = command._diff(self.rows)
+
+        self.assertEqual(diff.insert.keys(), ['#99-1'])
+        self.assertEqual(diff.insert['#99-1'].title_ka, 'Law ka')
+        self.assertEqual(diff.insert['#99-1'].initiator_ka, 'Initiator ka')
+        self.assertEqual(diff.insert_children['#99-1/1'][0], '#99-1')
+        self.assertEqual(diff.insert_children['#99-1/1'][1].title_ka, 'Child ka')
+        self.assertEqual(diff.count(), (2, 0, 0))
+        self.assertTrue(u'? #99-2 | bill number does not exist yet' in diff.lines)
+
+
+    def test_batches (self):
+        # georgian rows are kept whether they are in the batch of their law or not
+        for size in (1, import_draftlaws.BATCH_SIZE):
+            DraftLaw.objects.filter(bill_number='#99-1').delete()
+            original = import_draftlaws.BATCH_SIZE
+            import_draftlaws.BATCH_SIZE = size
+            try:
+                self._import(self.rows)
+            finally:
+                import_draftlaws.BATCH_SIZE = original
+
+            draftlaw = DraftLaw.objects.get(bill_number='#99-1')
+            self.assertEqual(draftlaw.title_ka, 'Law ka')
+            self.assertEqual(draftlaw.summary_ka, 'Summary ka')
+            child = DraftLawChild.objects.get(bill_number='#99-1/1')
+            self.assertEqual(child.parent_id, draftlaw.pk)
+            self.assertEqual(child.title_ka, 'Child ka')
+
+
+    def test_dry_run (self):
+        count = DraftLaw.objects.count()
+        out = self._import(self.rows, dry_run=True)
+        self.assertEqual(DraftLaw.objects.count(), count)
+        self.assertFalse(DraftLawChild.objects.filter(bill_number='#99-1/1').exists())
+        self.assertTrue('+ #99-1 | Law' in out)
+        self.assertTrue('Dry run: 2 to insert, 0 to update, 0 to delete.' in out)
+
+
+    def test_force (self):
+        self._import(self.rows[:1])
+        draftlaw = DraftLaw.objects.get(bill_number='#99-1')
+        representative = Representative.objects.all()[0]
+        draftlaw.initiator_representatives.add(representative)
+
+        self._import([_english_row('99-1', 'Law kept')])
+        self.assertEqual(DraftLaw.objects.get(pk=draftlaw.pk).title_ka, 'Law')
+
+        self._import([_english_row('99-1', 'Law replaced')], force=True)
+        replaced = DraftLaw.objects.get(bill_number='#99-1')
+        self.assertEqual(replaced.pk, draftlaw.pk)
+        self.assertEqual(replaced.title_ka, 'Law replaced')
+        self.assertEqual(list(replaced.initiator_representatives.all()), [representative])
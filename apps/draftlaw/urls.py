@@ -7,13 +7,15 @@ __docformat__ = 'epytext en'
 
 from django.conf.urls.defaults import patterns, url
 
-from .views import List, Detail, Info, Items, query
+from .views import List, Detail, Info, Items, Statistics, full_text, query
 from .feeds import FeedList, FeedDetail
 
 
 urlpatterns = patterns('',
     url(r'^$', List.as_view(), name='draftlaw_list'),
     url(r'^draftlaw/(?P<slug>[-\w]+)/$', Detail.as_view(), name='draftlaw_detail'),
+    url(r'^fulltext/(?P<pk>\d+)/$', full_text, name='draftlaw_full_text'),
+    url(r'^statistics/$', Statistics.as_view(), name='draftlaw_statistics'),
 
     # RSS feed
     url(r'^feed/$', FeedList(), name='draftlaw_feed_list'),
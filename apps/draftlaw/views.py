@@ -10,6 +10,8 @@ from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.core.urlresolvers import reverse
 from django.db.models import Q, Max
 from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils.translation import get_language
 from django.utils.translation import ugettext as _
 from django.views.generic import DetailView, TemplateView, ListView
 try:
@@ -17,7 +19,8 @@ try:
 except ImportError:
     from cms.utils import set_language_changer
 
-from .models import DraftLaw, DraftLawDiscussion
+from .models import DraftLaw, DraftLawDiscussion, DraftLawFullText,\
+    DraftLawStageStatistics
 
 
 
@@ -212,12 +215,35 @@ class Detail (DetailView):
         context['stages'] = DraftLawForList(obj,obj.bureau_date) 
         context['url_feed'] = reverse('draftlaw_feed_detail', args=[obj.pk])
         context['draftlaw_url'] = draftlaw_url
+        # the text is streamed by full_text, not decompressed for the page
+        context['has_full_text'] = obj.full_texts.filter(
+            language=get_language()[:2]).exists()
 
         set_language_changer(self.request, obj.get_absolute_url)
         return context
 
 
 
+class Statistics (TemplateView):
+    """Implements a view with the distributions of draft laws' stage
+    durations, as precomputed by DraftLawStageDuration.update.
+    """
+    template_name = 'draftlaw/statistics.html'
+
+
+    def get_context_data (self, **kwargs):
+        context = super(Statistics, self).get_context_data(**kwargs)
+        group_by = self.request.GET.get('group_by', 'all')
+        if group_by not in dict(DraftLawStageStatistics.GROUP_BY_CHOICES):
+            group_by = 'all'
+        context['group_by'] = group_by
+        context['group_by_choices'] = DraftLawStageStatistics.GROUP_BY_CHOICES
+        context['statistics'] = DraftLawStageStatistics.objects.filter(
+            group_by=group_by)
+        return context
+
+
+
 class Info (DetailView):
     context_object_name = 'obj'
     model = DraftLaw
@@ -225,6 +251,21 @@ class Info (DetailView):
 
 
 
+def full_text (request, pk):
+    """Stream the full text of a draft law in the current language.
+
+    The text is decompressed piece by piece while being sent.
+    """
+    draftlaw = get_object_or_404(DraftLaw.objects.only('pk'), pk=pk)
+    try:
+        stored = draftlaw.full_texts.get(language=get_language()[:2])
+        content = stored.iter_text()
+    except DraftLawFullText.DoesNotExist:
+        content = ''
+    return HttpResponse(content, content_type='text/plain; charset=utf-8')
+
+
+
 def query (request, query):
     data = []
 
@@ -53,3 +53,9 @@ class IncomeDeclarationAdmin (TranslationAdmin):
 
 admin.site.register(IncomeDeclaration, IncomeDeclarationAdmin)
 
+
+class ExchangeRateAdmin (admin.ModelAdmin):
+    list_display = ['currency', 'date', 'rate']
+    list_filter = ['currency']
+
+admin.site.register(ExchangeRate, ExchangeRateAdmin)
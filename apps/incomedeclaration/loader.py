@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+
+"""
+Loader of income declarations for display.
+
+Fetches declarations with all their sections in a fixed number of queries,
+one per section, however many declarations are loaded, and turns them into
+immutable view models, which are cached.
+
+Sections are read as values() rows rather than with prefetch_related,
+which only fills related managers with model instances.
+"""
+__docformat__ = 'epytext en'
+
+from collections import namedtuple
+from django.conf import settings
+from django.core.cache import cache
+from django.core.urlresolvers import reverse
+from django.utils.translation import get_language
+
+from .models import IncomeDeclaration, DeclarationBiography, DeclarationCash,\
+    DeclarationContract, DeclarationDeposit, DeclarationEntrepreneurial,\
+    DeclarationFamily, DeclarationGift, DeclarationOtherInclExpense,\
+    DeclarationProperty, DeclarationRealEstate, DeclarationSecurity,\
+    DeclarationWage
+
+
+#: seconds a loaded declaration is cached
+CACHE_TIMEOUT = 60 * 60 * 24
+
+#: view models of the sections
+Biography = namedtuple('Biography', 'position work_contact place_dob')
+Cash = namedtuple('Cash', 'name amt_currency')
+Contract = namedtuple('Contract',
+    'name desc_value date_period_agency financial_result')
+Deposit = namedtuple('Deposit', 'name bank type balance')
+Entrepreneurial = namedtuple('Entrepreneurial',
+    'name corp_name_addr particn_type register_agency particn_date income_rec')
+FamilyMember = namedtuple('FamilyMember', 'name surname pob dob relation')
+Gift = namedtuple('Gift', 'name desc_value giver_rel')
+OtherInclExpense = namedtuple('OtherInclExpense', 'recip_issuer type amount')
+Property = namedtuple('Property', 'name_shares prop_type description co_owners')
+RealEstate = namedtuple('RealEstate', 'name_shares prop_type loc_area co_owners')
+Security = namedtuple('Security', 'name issuer type price quantity')
+Wage = namedtuple('Wage', 'name desc_workplace desc_job income_rec')
+
+#: sections as related name, model and view model, in display order
+SECTIONS = (
+    ('biographies', DeclarationBiography, Biography),
+    ('cash', DeclarationCash, Cash),
+    ('contracts', DeclarationContract, Contract),
+    ('deposits', DeclarationDeposit, Deposit),
+    ('wages', DeclarationWage, Wage),
+    ('entrepreneurials', DeclarationEntrepreneurial, Entrepreneurial),
+    ('family', DeclarationFamily, FamilyMember),
+    ('gifts', DeclarationGift, Gift),
+    ('otherinclexpenses', DeclarationOtherInclExpense, OtherInclExpense),
+    ('properties', DeclarationProperty, Property),
+    ('realestates', DeclarationRealEstate, RealEstate),
+    ('securities', DeclarationSecurity, Security),
+)
+
+#: view model of a linked representative
+RepresentativeLink = namedtuple('RepresentativeLink', 'pk name url')
+
+
+
+class Declaration (namedtuple('Declaration',
+        'pk decl_id name date scrape_date slug representative ' +
+        ' '.join(name for name, model, view in SECTIONS))):
+    """View model of a declaration, sections are tuples of their view models."""
+    __slots__ = ()
+
+    def __unicode__ (self):
+        return u'%s %s' % (self.decl_id, self.name)
+
+
+    def get_absolute_url (self, language=None):
+        return reverse('incomedeclaration_detail', args=[self.slug])
+
+
+
+def _translated (values, field, language):
+    """Get the value of a translated field from a values() row.
+
+    Falls back to the untranslated field, like modeltranslation does.
+
+    @param values: row with the field and its translations
+    @type values: dict
+    @param field: name of the field
+    @type field: str
+    @param language: language code
+    @type language: str
+    @return: value in given language
+    @rtype: unicode
+    """
+    return values.get(field + '_' + language) or values[field]
+
+
+
+def _columns (fields):
+    """Get the columns to fetch for given translated fields.
+
+    @param fields: names of the fields
+    @type fields: [ str ]
+    @return: the fields and their translations
+    @rtype: [ str ]
+    """
+    columns = list(fields)
+    for code, name in settings.LANGUAGES:
+        columns.extend(field + '_' + code for field in fields)
+    return columns
+
+
+
+def _load_representatives (pks, language):
+    """Load representatives linked to declarations, with one query each for
+    representatives and their names.
+
+    @param pks: primary keys of representatives
+    @type pks: [ int ]
+    @param language: language code
+    @type language: str
+    @return: view models by primary key
+    @rtype: { int: RepresentativeLink }
+    """
+    from popit.models import PersonName
+    from representative.models import Representative
+    if not pks:
+        return {}
+
+    names = {}
+    # ordered by PersonName.Meta, so the first one is the main name
+    for values in PersonName.objects.filter(person__in=pks).values(
+            'person', 'title', *_columns(['name'])):
+        if values['person'] not in names:
+            name = _translated(values, 'name', language)
+            if values['title']:
+                name = u'%s %s' % (values['title'], name)
+            names[values['person']] = name
+
+    representatives = {}
+    for pk, slug in Representative.objects.filter(pk__in=pks).values_list(
+            'pk', 'slug'):
+        representatives[pk] = RepresentativeLink(pk=pk,
+            name=names.get(pk, u'Unknown'),
+            url=reverse('person', kwargs={'pk': pk, 'slug': slug}))
+    return representatives
+
+
+
+def load (pks, language=None):
+    """Load declarations with all their sections.
+
+    Runs one query for the declarations, one per section and two for linked
+    representatives.
+
+    @param pks: primary keys of declarations
+    @type pks: [ int ]
+    @param language: language code, the current language if None
+    @type language: str
+    @return: view models by primary key
+    @rtype: { int: Declaration }
+    """
+    language = language or get_language()[:2]
+    decls = list(IncomeDeclaration.objects.filter(pk__in=pks).values(
+        'pk', 'decl_id', 'date', 'scrape_date', 'slug', 'representative',
+        *_columns(['name'])))
+    if not decls:
+        return {}
+    pks = [d['pk'] for d in decls]
+
+    sections = {}
+    for name, model, view in SECTIONS:
+        items = dict((pk, []) for pk in pks)
+        # sections have no order of their own, keep the order of insertion
+        for values in model.objects.filter(declaration__in=pks).order_by(
+                'declaration', 'pk').values('declaration', *_columns(view._fields)):
+            items[values['declaration']].append(view._make(
+                _translated(values, f, language) for f in view._fields))
+        sections[name] = items
+
+    representatives = _load_representatives(
+        set(d['representative'] for d in decls if d['representative']),
+        language)
+
+    loaded = {}
+    for d in decls:
+        pk = d['pk']
+        kwargs = dict((name, tuple(sections[name][pk]))
+            for name, model, view in SECTIONS)
+        loaded[pk] = Declaration(pk=pk, decl_id=d['decl_id'],
+            name=_translated(d, 'name', language), date=d['date'],
+            scrape_date=d['scrape_date'], slug=d['slug'],
+            representative=representatives.get(d['representative']),
+            **kwargs)
+    return loaded
+
+
+
+def cache_key (pk, scrape_date, representative, language):
+    """Get the cache key of a loaded declaration.
+
+    A re-imported declaration has a new scrape date and relinking changes the
+    representative, so neither needs explicit invalidation.
+
+    @param pk: primary key of the declaration
+    @type pk: int
+    @param scrape_date: scrape date of the declaration
+    @type scrape_date: datetime.date
+    @param representative: primary key of the linked representative
+    @type representative: int
+    @param language: language code
+    @type language: str
+    @return: cache key
+    @rtype: str
+    """
+    return 'incomedeclaration:%d:%s:%s:%s' % (
+        pk, scrape_date.isoformat(), representative, language)
+
+
+
+def get (slug, language=None):
+    """Get the view model of a declaration, from the cache if possible.
+
+    @param slug: slug of the declaration
+    @type slug: str
+    @param language: language code, the current language if None
+    @type language: str
+    @return: view model, None if there is no such declaration
+    @rtype: Declaration
+    """
+    language = language or get_language()[:2]
+    try:
+        pk, scrape_date, representative = IncomeDeclaration.objects.filter(
+            slug=slug).values_list('pk', 'scrape_date', 'representative')[0]
+    except IndexError:
+        return None
+
+    key = cache_key(pk, scrape_date, representative, language)
+    declaration = cache.get(key)
+    if declaration is None:
+        declaration = load([pk], language).get(pk)
+        cache.set(key, declaration, CACHE_TIMEOUT)
+    return declaration
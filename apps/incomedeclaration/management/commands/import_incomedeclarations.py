@@ -2,23 +2,35 @@
 
 """
 Command import_incomedeclaration
+
+Which declarations to create, replace or skip is decided in memory against
+all existing declarations, loaded with one query, before anything is
+written. Section objects are then inserted in bulk, in batched transactions.
 """
 __docformat__ = 'epytext en'
 
-import os, csv, datetime
-import codecs
+import os, csv, datetime, time
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from optparse import make_option
 
+from util import versions
+from util.db import batches
+
+
+#: delimiter of CSV fields
+DELIMITER = '|'
+#: number of objects inserted per transaction
+BATCH_SIZE = 500
+
+
+
 class Command (BaseCommand):
     """Command to import income declarations from CSV files."""
     #: allowed arguments to the command
     args = '<dirname>'
     #: help string
     help = 'Imports a income declarations from a directory with CSV files.'
-    #: list of declaration IDs for whose adding is always ok.
-    addok = []
     #: custom options
     option_list = BaseCommand.option_list + (
         make_option(
@@ -69,9 +81,21 @@ class Command (BaseCommand):
         return dirname + os.sep + section + '.csv'
 
 
+    def _get_decl_id (self, row):
+        """
+        Get declaration ID of given row.
+
+        @param row: data row of any section
+        @type row: [ str ]
+        @return: declaration ID
+        @rtype: unicode
+        """
+        return row[0].strip().decode('utf-8-sig')
+
+
     def _create_declaration (self, row):
         """
-        Create an income declaration from given row.
+        Create an unsaved income declaration from given row.
 
         @param row: data required to create an income declaration
         @type row: [ str ]
@@ -80,8 +104,6 @@ class Command (BaseCommand):
         """
         from ...models import IncomeDeclaration
 
-        self.stdout.write("%s: Creating income declaration.\n" % row[0])
-
         name = row[2].strip().decode('utf-8')
 
         if not row[3]:
@@ -90,49 +112,26 @@ class Command (BaseCommand):
             date = datetime.datetime.strptime(row[3].strip(), '%d/%m/%Y')
 
         declaration = IncomeDeclaration(
-            decl_id=row[0].strip().decode('utf-8-sig'),
-            scrape_date=row[1].strip(),
+            decl_id=self._get_decl_id(row),
+            scrape_date=datetime.datetime.strptime(row[1].strip(), '%Y-%m-%d').date(),
             name_en=name, name_ka=name,
             date=date
         )
-        declaration.save()
+        declaration.slug = declaration.make_slug()
         return declaration
 
 
-    def _get_declaration (self, row):
+    def _write (self, level, msg):
         """
-        Get an income declaration object for given row.
+        Write given message if verbosity is at least given level.
 
-        @param row: data required to create an income declaration
-        @type row: [ str ]
-        @return: income declaration
-        @rtype: IncomeDeclaration or None
+        @param level: minimum verbosity
+        @type level: int
+        @param msg: message to write
+        @type msg: str
         """
-        from ...models import IncomeDeclaration
-        existing = IncomeDeclaration.objects.filter(decl_id=row[0])
-
-        if len(existing) == 0:
-            declaration = self._create_declaration(row)
-            self.addok.append(declaration.decl_id)
-            return declaration
-
-        else:
-            declaration = existing[0]
-            if declaration.decl_id in self.addok:
-                return declaration
-
-            scrape_date = datetime.datetime.strptime(row[1], '%Y-%m-%d')
-            if self.force or scrape_date.date() > declaration.scrape_date:
-                self.stdout.write("%s: Deleting old declaration.\n" % row[0])
-                declaration.delete() # this deletes all relationships as well!
-                declaration = self._create_declaration(row)
-                # after recreation adding is always ok
-                self.addok.append(declaration.decl_id)
-                return declaration
-            else:
-                fmt = "%s: Scrape date %s already imported.\n"
-                self.stdout.write(fmt % (row[0], row[1]))
-                return None
+        if self.verbosity >= level:
+            self.stdout.write(msg)
 
 
     def _get_biography (self, declaration, row):
@@ -421,29 +420,177 @@ class Command (BaseCommand):
         )
 
 
+    def _plan (self, sections):
+        """
+        Decide which declarations to create or delete and which rows to add.
+
+        Same rules as importing row by row: a declaration is created on its
+        first row if it doesn't exist yet, or replaced if its scrape date is
+        newer (or forced). Rows of a declaration created in this run are
+        added, others are skipped. Replacements keep the representative the
+        old declaration was linked to.
+
+        @param sections: section names and their rows, in import order
+        @type sections: [ (str, [ [ str ] ]) ]
+        @return: primary keys of declarations to delete, declarations to create, rows to add by section
+        @rtype: (set, [ IncomeDeclaration ], { str: [ (unicode, [ str ]) ] })
+        """
+        from ...models import IncomeDeclaration
+
+        self.known = set()
+        existing = {}
+        for pk, decl_id, scrape_date, representative in IncomeDeclaration.objects.order_by(
+                'decl_id', 'pk').values_list('pk', 'decl_id', 'scrape_date', 'representative'):
+            existing.setdefault(decl_id, (pk, scrape_date, representative))
+            self.known.add(pk)
+
+        delete = set()
+        create = {}
+        created = []
+        skipped = set()
+        rows_add = {}
+        for section, rows in sections:
+            rows_add[section] = add = []
+            for row in rows:
+                try:
+                    decl_id = self._get_decl_id(row)
+                    if decl_id not in create:
+                        representative = None
+                        if decl_id in existing:
+                            pk, scrape_date, representative = existing[decl_id]
+                            date = datetime.datetime.strptime(row[1].strip(), '%Y-%m-%d')
+                            if not self.force and date.date() <= scrape_date:
+                                if decl_id not in skipped:
+                                    fmt = "%s: Scrape date %s already imported.\n"
+                                    self._write(2, fmt % (decl_id, row[1]))
+                                    skipped.add(decl_id)
+                                self.stats['skipped'] += 1
+                                continue
+                            self._write(2, "%s: Deleting old declaration.\n" % decl_id)
+                            delete.add(pk)
+                        self._write(2, "%s: Creating income declaration.\n" % decl_id)
+                        create[decl_id] = self._create_declaration(row)
+                        create[decl_id].representative_id = representative
+                        created.append(create[decl_id])
+                except (IndexError, ValueError), e:
+                    self._error(section, row, e)
+                    continue
+                add.append((decl_id, row))
+
+        return delete, created, rows_add
+
+
+    def _error (self, section, row, error):
+        """
+        Count and report an invalid row.
+
+        @param section: section of the row
+        @type section: str
+        @param row: the invalid row
+        @type row: [ str ]
+        @param error: exception raised on the row
+        @type error: Exception
+        """
+        self.stats['errors'] += 1
+        self.stderr.write('%s: invalid row %s: %s\n' % (
+            section, DELIMITER.join(row), error))
+
+
     @transaction.commit_on_success
-    def _handle_section (self, dirname, section):
+    def _write_declarations (self, delete, create):
+        """
+        Delete replaced declarations and insert new ones.
+
+        @param delete: primary keys of declarations to delete
+        @type delete: set
+        @param create: declarations to create
+        @type create: [ IncomeDeclaration ]
+        @return: new declarations with primary key, by declaration ID
+        @rtype: { unicode: IncomeDeclaration }
+        """
+        from ...models import IncomeDeclaration
+
+        for pks in batches(sorted(delete), BATCH_SIZE):
+            # this deletes all relationships as well!
+            IncomeDeclaration.objects.filter(pk__in=pks).delete()
+
+        for declarations in batches(create, BATCH_SIZE):
+            IncomeDeclaration.objects.bulk_create(declarations)
+
+        # bulk_create doesn't set primary keys, fetch the new ones by their
+        # declaration IDs, skipping duplicates which existed before
+        declarations = {}
+        for decl_ids in batches([d.decl_id for d in create], BATCH_SIZE):
+            for pk, decl_id, date, scrape_date in IncomeDeclaration.objects.filter(
+                    decl_id__in=decl_ids).order_by('pk').values_list(
+                    'pk', 'decl_id', 'date', 'scrape_date'):
+                if pk not in self.known:
+                    declarations.setdefault(decl_id, IncomeDeclaration(pk=pk,
+                        decl_id=decl_id, date=date, scrape_date=scrape_date))
+        return declarations
+
+
+    @transaction.commit_on_success
+    def _write_batch (self, objs):
+        """
+        Insert given section objects of one model.
+
+        @param objs: unsaved section objects
+        @type objs: [ django.db.models.Model ]
+        """
+        type(objs[0]).objects.bulk_create(objs)
+
+
+    def _handle_section (self, section, rows, declarations):
         """
         Handle one income declaration section.
 
-        @param dirname: directory name with files
-        @type dirname: str
-        @param section: section to construct filename for
+        @param section: section to handle
         @type section: str
-        """
-        self.stdout.write("Handling %s.\n" % section)
-        filename = self._get_filename(dirname, section)
-        rows = csv.reader(open(filename, 'r'), delimiter='|')
-        declaration = None
-        for row in rows:
-            if not declaration or row[0] != declaration.decl_id:
-                declaration = self._get_declaration(row)
-            if not declaration:
+        @param rows: declaration IDs and rows to add
+        @type rows: [ (unicode, [ str ]) ]
+        @param declarations: new declarations by declaration ID
+        @type declarations: { unicode: IncomeDeclaration }
+        """
+        self._write(1, "Handling %s.\n" % section)
+        objs = []
+        for decl_id, row in rows:
+            declaration = declarations[decl_id]
+            try:
+                obj = self.sectionmap[section](declaration, row)
+            except IndexError, e:
+                self._error(section, row, e)
                 continue
+            if hasattr(obj, 'AMOUNTS'):
+                self.amounts.fill(obj, declaration.date or declaration.scrape_date)
+            objs.append(obj)
 
-            self.stdout.write("%s: Adding %s%s.\n" % (row[0], section, self.force))
-            obj = self.sectionmap[section](declaration, row)
-            obj.save()
+        for batch in batches(objs, BATCH_SIZE):
+            self._write_batch(batch)
+        self.stats['added'] += len(objs)
+
+
+    def _read (self, dirname):
+        """
+        Read all section files.
+
+        @param dirname: directory name with files
+        @type dirname: str
+        @return: section names and their rows, in import order
+        @rtype: [ (str, [ [ str ] ]) ]
+        """
+        sections = []
+        for section in self.sectionmap.iterkeys():
+            filename = self._get_filename(dirname, section)
+            try:
+                rows = list(csv.reader(open(filename, 'r'), delimiter=DELIMITER))
+            except (IOError, csv.Error), e:
+                self.stats['errors'] += 1
+                self.stderr.write('%s: %s\n' % (filename, e))
+                rows = []
+            self.stats['rows'] += len(rows)
+            sections.append((section, rows))
+        return sections
 
 
     def handle (self, *args, **options):
@@ -452,11 +599,27 @@ class Command (BaseCommand):
             self.stderr.write("Missing directory to read CSV files from!\n")
             return
 
-        if options.get('force'):
-            self.force = ' (forced)'
-        else:
-            self.force = '' # also evaluates as False
-
-
+        self.force = bool(options.get('force'))
+        self.verbosity = int(options.get('verbosity', 1))
+        self.stats = dict.fromkeys(('rows', 'added', 'skipped', 'errors'), 0)
+        started = time.time()
+
+        from ...models import AmountParser, RepresentativeWealth
+        sections = self._read(args[0])
+        self.amounts = AmountParser()
+        delete, create, rows = self._plan(sections)
+        del sections
+        declarations = self._write_declarations(delete, create)
         for section in self.sectionmap.iterkeys():
-            self._handle_section(args[0], section)
+            self._handle_section(section, rows[section], declarations)
+        # sections were inserted in bulk, refresh the time series of the
+        # representatives whose declarations were replaced
+        RepresentativeWealth.update(set(d.representative_id for d in create
+            if d.representative_id is not None))
+        versions.bump_app('incomedeclaration')
+
+        elapsed = max(time.time() - started, 0.001)
+        self.stdout.write(('Read %(rows)d rows, added %(added)d, skipped %(skipped)d, ' +
+            '%(errors)d errors.\n') % self.stats)
+        self.stdout.write('Created %d declarations (%d replaced) in %.1fs, %d rows/s.\n' % (
+            len(declarations), len(delete), elapsed, self.stats['rows'] / elapsed))
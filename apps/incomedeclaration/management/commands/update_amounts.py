@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+"""
+Command update_amounts to parse the free text amounts of existing declaration
+sections into numeric amount, currency and GEL columns.
+
+Run it after adding exchange rates, too.
+"""
+__docformat__ = 'epytext en'
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from util import versions
+from util.db import batches
+
+
+#: number of rows parsed at a time
+BATCH_SIZE = 1000
+
+
+
+class Command (BaseCommand):
+    """Command to parse amounts of declaration sections."""
+    #: help string
+    help = 'Parses amounts of declaration sections into numeric columns, normalised to GEL.'
+
+
+    @transaction.commit_on_success
+    def _update_batch (self, model, field, prefix, pks):
+        """Parse amounts of given rows.
+
+        Rows with the same result are updated with one query, so mostly
+        repeating amounts don't cost a query per row.
+
+        @param model: model of the section
+        @type model: django.db.models.Model
+        @param field: name of the text field
+        @type field: str
+        @param prefix: prefix of the parsed amount fields
+        @type prefix: str
+        @param pks: primary keys of the rows
+        @type pks: [ int ]
+        @return: number of rows with a parsed amount
+        @rtype: int
+        """
+        results = {}
+        values = model.objects.filter(pk__in=pks).values_list('pk',
+            field + '_en', field + '_ka',
+            'declaration__date', 'declaration__scrape_date')
+        for pk, text_en, text_ka, date, scrape_date in values:
+            amount, currency = self.amounts.parse(text_en or text_ka)
+            gel = self.amounts.to_gel(amount, currency, date or scrape_date)
+            results.setdefault((amount, currency, gel), []).append(pk)
+
+        parsed = 0
+        for (amount, currency, gel), group in results.iteritems():
+            model.objects.filter(pk__in=group).update(**{
+                prefix + '_amount': amount,
+                prefix + '_currency': currency,
+                prefix + '_gel': gel,
+            })
+            if amount is not None:
+                parsed += len(group)
+        return parsed
+
+
+    def handle (self, *args, **options):
+        """Command handler."""
+        from incomedeclaration.models import AmountParser, DeclarationCash,\
+            DeclarationDeposit, DeclarationEntrepreneurial, DeclarationWage,\
+            RepresentativeWealth
+
+        self.amounts = AmountParser()
+        for model in (DeclarationCash, DeclarationDeposit,
+                DeclarationEntrepreneurial, DeclarationWage):
+            pks = model.objects.order_by('pk').values_list('pk', flat=True)
+            for field, prefix in model.AMOUNTS:
+                total = parsed = 0
+                for batch in batches(pks.iterator(), BATCH_SIZE):
+                    parsed += self._update_batch(model, field, prefix, batch)
+                    total += len(batch)
+                self.stdout.write('%s.%s: parsed %d of %d.\n' % (
+                    model.__name__, field, parsed, total))
+
+        # amounts were updated in bulk
+        RepresentativeWealth.update()
+        versions.bump_app('incomedeclaration')
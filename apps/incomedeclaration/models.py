@@ -7,11 +7,137 @@ Depends on representative.
 """
 __docformat__ = 'epytext en'
 
+import datetime
+import re
+from bisect import bisect_right
+from decimal import Decimal, InvalidOperation
 from cms.models.pluginmodel import CMSPlugin
 from django.db import models
+from django.db.models import Count, Sum
 from django.utils.translation import ugettext_lazy as _
 
 from glt import slughifi
+from util.db import batches, bulk_create
+
+
+#: amount followed by a currency, e.g. '1 234.50 GEL'
+REGEX_AMOUNT = re.compile(r'^\s*([-+]?\d[\d\s,.]*)\s*(\S*)', re.UNICODE)
+#: currency codes by how they are written in declarations
+CURRENCIES = {
+    u'GEL': 'GEL', u'LARI': 'GEL', u'\u10da\u10d0\u10e0\u10d8': 'GEL',
+    u'USD': 'USD', u'$': 'USD', u'\u10d3\u10dd\u10da\u10d0\u10e0\u10d8': 'USD',
+    u'EUR': 'EUR', u'\u20ac': 'EUR', u'\u10d4\u10d5\u10e0\u10dd': 'EUR',
+}
+#: currency all amounts are normalised to
+BASE_CURRENCY = 'GEL'
+
+
+
+class ExchangeRate (models.Model):
+    """Rate of a currency in GEL, valid from a date on."""
+    #: currency code
+    currency = models.CharField(max_length=3, help_text=_('Currency Code'))
+    #: first day the rate applies to
+    date = models.DateField(help_text=_('Valid from'))
+    #: GEL for one unit of the currency
+    rate = models.DecimalField(max_digits=12, decimal_places=6,
+        help_text=_('Rate in GEL'))
+
+    class Meta:
+        ordering = ('currency', 'date')
+        unique_together = (('currency', 'date'),)
+
+
+    def __unicode__ (self):
+        return u'%s %s: %s' % (self.currency, self.date, self.rate)
+
+
+
+class AmountParser (object):
+    """Parse free text amounts of declarations and normalise them to GEL.
+
+    Loads all exchange rates once, so it can be used for many rows.
+    """
+
+    def __init__ (self):
+        #: { currency: ([ date ], [ rate ]) }, sorted by date
+        self.rates = {}
+        for currency, date, rate in ExchangeRate.objects.order_by(
+                'currency', 'date').values_list('currency', 'date', 'rate'):
+            dates, rates = self.rates.setdefault(currency, ([], []))
+            dates.append(date)
+            rates.append(rate)
+
+
+    def parse (self, text):
+        """Parse given amount.
+
+        @param text: amount as declared, e.g. '1 234.50 GEL'
+        @type text: unicode
+        @return: amount (None if unparseable) and currency code
+        @rtype: (Decimal, str)
+        """
+        match = REGEX_AMOUNT.match(text or u'')
+        if not match:
+            return (None, '')
+
+        number = re.sub(r'\s', '', match.group(1)).rstrip(',.')
+        if ',' in number and '.' not in number and \
+                len(number.rsplit(',', 1)[1]) != 3: # decimal comma
+            number = number.replace(',', '.')
+        else:
+            number = number.replace(',', '')
+        try:
+            amount = Decimal(number).quantize(Decimal('0.01'))
+        except InvalidOperation:
+            return (None, '')
+
+        currency = match.group(2).upper()
+        return (amount, CURRENCIES.get(currency, currency[:3]))
+
+
+    def to_gel (self, amount, currency, date):
+        """Convert given amount to GEL.
+
+        Uses the latest rate valid on given date, or the earliest rate if
+        there is none yet.
+
+        @param amount: amount to convert
+        @type amount: Decimal
+        @param currency: currency code of the amount
+        @type currency: str
+        @param date: date of the amount, e.g. of the declaration
+        @type date: datetime.date
+        @return: amount in GEL, None if there is no rate for the currency
+        @rtype: Decimal
+        """
+        if amount is None:
+            return None
+        if currency == BASE_CURRENCY:
+            return amount
+        try:
+            dates, rates = self.rates[currency]
+        except KeyError:
+            return None
+        index = max(bisect_right(dates, date or datetime.date.max) - 1, 0)
+        return (amount * rates[index]).quantize(Decimal('0.01'))
+
+
+    def fill (self, obj, date):
+        """Set the parsed amount fields of a declaration section object.
+
+        @param obj: object of a model with AMOUNTS
+        @type obj: django.db.models.Model
+        @param date: date of the declaration
+        @type date: datetime.date
+        """
+        for field, prefix in obj.AMOUNTS:
+            text = getattr(obj, field + '_en', None) or getattr(obj, field + '_ka', None)
+            amount, currency = self.parse(text)
+            setattr(obj, prefix + '_amount', amount)
+            setattr(obj, prefix + '_currency', currency)
+            setattr(obj, prefix + '_gel', self.to_gel(amount, currency, date))
+
 
 
 class IncomeDeclaration (models.Model):
@@ -35,9 +161,20 @@ class IncomeDeclaration (models.Model):
         ordering = ('decl_id',)
 
 
-    def save (self, *args, **kwargs):
+    def make_slug (self):
+        """Get the slug for this declaration, without saving it.
+
+        Used by save() and by the importer writing in bulk, bypassing save().
+
+        @return: slug built from declaration ID and name
+        @rtype: str
+        """
         max_len = self._meta.get_field('slug').max_length
-        self.slug = slughifi(str(self)[:max_len])
+        return slughifi(str(self)[:max_len])
+
+
+    def save (self, *args, **kwargs):
+        self.slug = self.make_slug()
         super(IncomeDeclaration, self).save(*args, **kwargs)
 
 
@@ -83,6 +220,18 @@ class DeclarationCash (models.Model):
     #: amount
     amt_currency = models.TextField(help_text=_('Amount & Currency'))
 
+    #: amount, parsed from the text by AmountParser
+    cash_amount = models.DecimalField(max_digits=16, decimal_places=2,
+        blank=True, null=True, editable=False)
+    #: currency code of cash_amount
+    cash_currency = models.CharField(max_length=3, blank=True, db_index=True,
+        editable=False)
+    #: cash_amount in GEL
+    cash_gel = models.DecimalField(max_digits=16, decimal_places=2,
+        blank=True, null=True, editable=False)
+    #: (text field, prefix of parsed amount fields)
+    AMOUNTS = (('amt_currency', 'cash'),)
+
     def __unicode__ (self):
         return '%s %s: %s' % (
             self.declaration.decl_id, self.declaration.name, self.amt_currency)
@@ -131,6 +280,18 @@ class DeclarationDeposit (models.Model):
     #: deposit balance
     balance = models.TextField(help_text=_('Balance'))
 
+    #: balance, parsed from the text by AmountParser
+    balance_amount = models.DecimalField(max_digits=16, decimal_places=2,
+        blank=True, null=True, editable=False)
+    #: currency code of balance_amount
+    balance_currency = models.CharField(max_length=3, blank=True, db_index=True,
+        editable=False)
+    #: balance_amount in GEL
+    balance_gel = models.DecimalField(max_digits=16, decimal_places=2,
+        blank=True, null=True, editable=False)
+    #: (text field, prefix of parsed amount fields)
+    AMOUNTS = (('balance', 'balance'),)
+
     def __unicode__ (self):
         return '%s %s: %s' % (
             self.declaration.decl_id, self.declaration.name, self.balance)
@@ -159,6 +320,18 @@ class DeclarationEntrepreneurial (models.Model):
     #: income record
     income_rec = models.TextField(help_text=_('Income Record'))
 
+    #: income, parsed from the text by AmountParser
+    income_amount = models.DecimalField(max_digits=16, decimal_places=2,
+        blank=True, null=True, editable=False)
+    #: currency code of income_amount
+    income_currency = models.CharField(max_length=3, blank=True, db_index=True,
+        editable=False)
+    #: income_amount in GEL
+    income_gel = models.DecimalField(max_digits=16, decimal_places=2,
+        blank=True, null=True, editable=False)
+    #: (text field, prefix of parsed amount fields)
+    AMOUNTS = (('income_rec', 'income'),)
+
     def __unicode__ (self):
         return '%s %s: %s' % (
             self.declaration.decl_id, self.declaration.name, self.corp_name_addr)
@@ -340,6 +513,18 @@ class DeclarationWage (models.Model):
     #: income record
     income_rec = models.TextField(help_text=_('Income Record'))
 
+    #: income, parsed from the text by AmountParser
+    income_amount = models.DecimalField(max_digits=16, decimal_places=2,
+        blank=True, null=True, editable=False)
+    #: currency code of income_amount
+    income_currency = models.CharField(max_length=3, blank=True, db_index=True,
+        editable=False)
+    #: income_amount in GEL
+    income_gel = models.DecimalField(max_digits=16, decimal_places=2,
+        blank=True, null=True, editable=False)
+    #: (text field, prefix of parsed amount fields)
+    AMOUNTS = (('income_rec', 'income'),)
+
     def __unicode__ (self):
         return '%s %s: %s' % (
             self.declaration.decl_id, self.declaration.name, self.desc_job)
@@ -350,6 +535,145 @@ class DeclarationWage (models.Model):
 
 
 
+class RepresentativeWealth (models.Model):
+    """Wealth of a representative by declaration year.
+
+    Derived from the sections of the representative's linked declarations by
+    L{update}, so the time series can be shown without reading all sections.
+    Amounts are in GEL and cover the whole declaration, i.e. family, too.
+    """
+    #: the representative
+    representative = models.ForeignKey('representative.Representative',
+        related_name='wealth')
+    #: latest declaration of the representative in this year
+    declaration = models.ForeignKey(IncomeDeclaration, related_name='wealth')
+    #: year of the declaration
+    year = models.IntegerField()
+    #: wages and entrepreneurial income
+    total_income = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    #: balance of deposits
+    deposits = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    #: number of real estates
+    real_estates = models.IntegerField(default=0)
+    #: cash
+    cash = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    #: fields of the time series
+    SERIES = ('total_income', 'deposits', 'real_estates', 'cash')
+
+    class Meta:
+        ordering = ('representative', 'year')
+        unique_together = (('representative', 'year'),)
+
+
+    def __unicode__ (self):
+        return u'%s %s: %s' % (self.representative_id, self.year, self.total_income)
+
+
+    @classmethod
+    def _aggregate (cls, queryset, aggregate, decls):
+        """Aggregate a declaration section, grouped by declaration.
+
+        @param queryset: section objects
+        @type queryset: QuerySet
+        @param aggregate: aggregate, e.g. Sum('cash_gel')
+        @type aggregate: django.db.models.Aggregate
+        @param decls: primary keys of declarations
+        @type decls: [ int ]
+        @return: aggregated value by declaration, missing if there are no objects
+        @rtype: { int: number }
+        """
+        values = queryset.filter(declaration__in=decls).values(
+            'declaration').annotate(value=aggregate).order_by()
+        return dict((v['declaration'], v['value'] or 0) for v in values)
+
+
+    @classmethod
+    def update (cls, representative_ids=None):
+        """Update the time series of given representatives.
+
+        To be called whenever declarations are linked to representatives or
+        their sections change.
+
+        @param representative_ids: primary keys of representatives, all if None
+        @type representative_ids: [ int ]
+        """
+        from representative.models import Representative
+        if representative_ids is None:
+            representative_ids = Representative.objects.values_list('pk', flat=True)
+
+        for batch in batches(sorted(set(representative_ids))):
+            cls.objects.filter(representative__in=batch).delete()
+
+            # later declarations of a year replace earlier ones
+            latest = {}
+            for pk, representative, date, scrape_date in IncomeDeclaration.objects.filter(
+                    representative__in=batch).order_by('date', 'scrape_date', 'pk').values_list(
+                    'pk', 'representative', 'date', 'scrape_date'):
+                year = (date or scrape_date).year
+                latest[(representative, year)] = pk
+
+            decls = latest.values()
+            wages = cls._aggregate(DeclarationWage.objects, Sum('income_gel'), decls)
+            entrepreneurials = cls._aggregate(DeclarationEntrepreneurial.objects,
+                Sum('income_gel'), decls)
+            deposits = cls._aggregate(DeclarationDeposit.objects,
+                Sum('balance_gel'), decls)
+            real_estates = cls._aggregate(DeclarationRealEstate.objects,
+                Count('pk'), decls)
+            cash = cls._aggregate(DeclarationCash.objects, Sum('cash_gel'), decls)
+
+            bulk_create(cls, [cls(representative_id=representative,
+                declaration_id=pk, year=year,
+                total_income=wages.get(pk, 0) + entrepreneurials.get(pk, 0),
+                deposits=deposits.get(pk, 0), real_estates=real_estates.get(pk, 0),
+                cash=cash.get(pk, 0)) for (representative, year), pk in
+                sorted(latest.iteritems())])
+
+
+    @classmethod
+    def series (cls, representative):
+        """Get the time series of a representative, ready for charts.
+
+        @param representative: primary key of the representative
+        @type representative: int
+        @return: years and the values of every L{SERIES} field by year
+        @rtype: { str: [ number ] }
+        """
+        series = dict((field, []) for field in ('year',) + cls.SERIES)
+        for values in cls.objects.filter(representative=representative).values(
+                'year', *cls.SERIES):
+            for field, value in values.iteritems():
+                series[field].append(value if field in ('year', 'real_estates')
+                    else float(value))
+        return series
+
+
+    @classmethod
+    def differences (cls, representative):
+        """Get year-over-year differences of a representative.
+
+        @param representative: primary key of the representative
+        @type representative: int
+        @return: wealth by year with the differences to the previous year,
+            latest first; differences are None for the first year
+        @rtype: [ (RepresentativeWealth, { str: number }) ]
+        """
+        rows = []
+        previous = None
+        for wealth in cls.objects.filter(
+                representative=representative).select_related('declaration'):
+            diff = dict.fromkeys(cls.SERIES)
+            if previous is not None:
+                for field in cls.SERIES:
+                    diff[field] = getattr(wealth, field) - getattr(previous, field)
+            rows.append((wealth, diff))
+            previous = wealth
+        rows.reverse()
+        return rows
+
+
+
 # There must be a bug in CMS plugin models. Without exception handler, on
 # running an admin command, the class definition would yield:
 #  File "/votingrecord/models.py", line 70, in <module>
@@ -5,10 +5,22 @@ Tests for app incomedeclaration
 """
 __docformat__ = 'epytext en'
 
+import csv
+import datetime
+import os
+import shutil
+import tempfile
+from decimal import Decimal
+from StringIO import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 
-from incomedeclaration.models import IncomeDeclaration
+from incomedeclaration import loader
+from incomedeclaration.management.commands.import_incomedeclarations import Command as ImportCommand
+from incomedeclaration.models import AmountParser, ExchangeRate, IncomeDeclaration,\
+    DeclarationBiography, DeclarationCash
 
 
 class IncomeDeclarationTest (TestCase):
@@ -26,6 +38,52 @@ class IncomeDeclarationTest (TestCase):
 
 
 
+    def test_AmountParser (self):
+        ExchangeRate.objects.all().delete()
+        ExchangeRate.objects.create(currency='USD', date=datetime.date(2010, 1, 1), rate='1.5')
+        ExchangeRate.objects.create(currency='USD', date=datetime.date(2012, 1, 1), rate='2')
+        parser = AmountParser()
+
+        self.assertEqual(parser.parse(u'1 234.50 GEL'), (Decimal('1234.50'), 'GEL'))
+        self.assertEqual(parser.parse(u'1,234 usd'), (Decimal('1234'), 'USD'))
+        self.assertEqual(parser.parse(u'12,5 EUR'), (Decimal('12.5'), 'EUR'))
+        self.assertEqual(parser.parse(u'none'), (None, ''))
+
+        self.assertEqual(parser.to_gel(Decimal('10'), 'GEL', None), Decimal('10'))
+        self.assertEqual(parser.to_gel(Decimal('10'), 'USD', datetime.date(2011, 6, 1)), Decimal('15'))
+        self.assertEqual(parser.to_gel(Decimal('10'), 'USD', datetime.date(2013, 1, 1)), Decimal('20'))
+        self.assertEqual(parser.to_gel(Decimal('10'), 'USD', datetime.date(2000, 1, 1)), Decimal('15'))
+        self.assertEqual(parser.to_gel(Decimal('10'), 'EUR', None), None)
+
+
+
+    def test_loader (self):
+        cash = [DeclarationCash.objects.create(declaration_id=pk, name=u'name',
+            amt_currency=u'%d GEL' % pk) for pk in (3491, 3490, 3491)]
+        cache.clear()
+
+        # declarations, sections and representatives with their names
+        with self.assertNumQueries(1 + len(loader.SECTIONS) + 2):
+            loaded = loader.load([3490, 3491], 'en')
+        self.assertEqual([c.amt_currency for c in loaded[3491].cash], [u'3491 GEL', u'3491 GEL'])
+        self.assertEqual(len(loaded[3490].cash), 1)
+        self.assertEqual(loaded[3490].wages, ())
+        self.assertEqual(loaded[3491].representative.pk, 1)
+        self.assertEqual(loaded[3490].representative, None)
+        self.assertRaises(AttributeError, setattr, loaded[3491], 'name', u'other')
+
+        decl = loader.get('000039-paata-lezhava', 'en')
+        with self.assertNumQueries(1):
+            self.assertEqual(loader.get('000039-paata-lezhava', 'en'), decl)
+        self.assertEqual(unicode(decl), u'000039 ' + decl.name)
+
+        # changed declarations get a new key
+        cash[0].delete()
+        IncomeDeclaration.objects.filter(pk=3491).update(scrape_date=datetime.date(2012, 1, 1))
+        self.assertEqual(len(loader.get('000039-paata-lezhava', 'en').cash), 1)
+
+
+
     def test_List (self):
         url = reverse('incomedeclaration_list')
         response = self.client.get(url)
@@ -39,3 +97,66 @@ class IncomeDeclarationTest (TestCase):
         response = self.client.get(url)
         self.assertContains(response, 'incomedeclaration')
         self.assertTemplateUsed(response, 'incomedeclaration/detail.html')
+
+
+
+class ImportTest (TestCase):
+    """Command import_incomedeclarations, by the rules of importing row by row."""
+    fixtures = ['incomedeclaration_testdata']
+
+    def setUp (self):
+        self.dirname = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.dirname)
+
+
+    def _import (self, sections, **options):
+        for section in ImportCommand().sectionmap:
+            writer = csv.writer(open(os.path.join(self.dirname, section + '.csv'), 'w'),
+                delimiter='|')
+            writer.writerows(sections.get(section, []))
+        call_command('import_incomedeclarations', self.dirname,
+            stdout=StringIO(), stderr=StringIO(), **options)
+
+
+    def _row (self, decl_id, scrape_date, *values):
+        return [decl_id, scrape_date, 'Name', '01/02/2012', ''] + list(values)
+
+
+    def _cash (self, decl_id):
+        return sorted(DeclarationCash.objects.filter(declaration__decl_id=decl_id,
+            ).values_list('amt_currency', flat=True))
+
+
+    def test_import (self):
+        sections = {
+            'biography': [self._row('900001', '2012-03-01', 'MP', 'Tbilisi', 'Batumi')],
+            'cash': [
+                self._row('900001', '2012-03-01', 'Name', '10 GEL'),
+                self._row('900002', '2012-03-01', 'Name', '20 GEL'),
+                self._row('900001', '2012-03-01', 'Name', '30 GEL'),
+                ['900003', 'no date'],
+            ],
+        }
+        self._import(sections)
+
+        first = IncomeDeclaration.objects.get(decl_id='900001')
+        self.assertEqual(IncomeDeclaration.objects.filter(decl_id='900002').count(), 1)
+        self.assertFalse(IncomeDeclaration.objects.filter(decl_id='900003').exists())
+        self.assertEqual(first.scrape_date, datetime.date(2012, 3, 1))
+        self.assertEqual(DeclarationBiography.objects.get(declaration=first).position_en, 'MP')
+        self.assertEqual(self._cash('900001'), [u'10 GEL', u'30 GEL'])
+        self.assertEqual(self._cash('900002'), [u'20 GEL'])
+
+        # same scrape date, skipped
+        IncomeDeclaration.objects.filter(pk=first.pk).update(representative=1)
+        self._import(sections)
+        self.assertEqual(IncomeDeclaration.objects.get(decl_id='900001').pk, first.pk)
+        self.assertEqual(self._cash('900001'), [u'10 GEL', u'30 GEL'])
+
+        # newer scrape date, replaced, keeping the representative
+        self._import({'cash': [self._row('900001', '2012-04-01', 'Name', '40 GEL')]})
+        replaced = IncomeDeclaration.objects.get(decl_id='900001')
+        self.assertNotEqual(replaced.pk, first.pk)
+        self.assertEqual(replaced.representative_id, 1)
+        self.assertEqual(self._cash('900001'), [u'40 GEL'])
+        self.assertEqual(self._cash('900002'), [u'20 GEL'])
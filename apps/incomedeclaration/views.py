@@ -6,12 +6,14 @@ Views incomedeclaration
 __docformat__ = 'epytext en'
 
 from django.core.urlresolvers import reverse
+from django.http import Http404
 from django.views.generic import DetailView, ListView
 try:
     from menus.utils import set_language_changer
 except ImportError:
     from cms.utils import set_language_changer
 
+from . import loader
 from .models import IncomeDeclaration
 
 
@@ -34,6 +36,14 @@ class Detail (DetailView):
     slug_field = 'slug'
 
 
+    def get_object (self, queryset=None):
+        """Get the declaration's view model, with all sections loaded."""
+        obj = loader.get(self.kwargs['slug'])
+        if obj is None:
+            raise Http404
+        return obj
+
+
     def get_context_data(self, **kwargs):
         context = super(Detail, self).get_context_data(**kwargs)
         obj = context['obj']
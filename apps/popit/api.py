@@ -5,14 +5,19 @@
 # Override key/value lookups to not need data__key__name=&data__value= somehow
 
 from tastypie.cache import SimpleCache
+import datetime
 from tastypie.constants import ALL, ALL_WITH_RELATIONS
+from tastypie.exceptions import BadRequest
 from tastypie.resources import ModelResource
 from tastypie.throttle import CacheThrottle
 from tastypie import fields
 
+from api.resources.common import CursorMixin, FieldsMixin, FormatsMixin,\
+    PrefetchMixin, PrefetchToManyField, ValuesMixin, VersionedMixin
 from popit import models
 
-class CommonResource(ModelResource):
+class CommonResource(FormatsMixin, CursorMixin, VersionedMixin, ValuesMixin,
+        FieldsMixin, PrefetchMixin, ModelResource):
     class Meta:
         allowed_methods = [ 'get' ]
         cache = SimpleCache()
@@ -40,10 +45,10 @@ class DataResource(CommonResource):
 # Organisations
 
 class OrganisationResource(CommonResource):
-    data = fields.ToManyField('popit.api.OrgDataResource', 'data', full=True)
-    names = fields.ToManyField('popit.api.OrgNameResource', 'names', full=True)
-    codes = fields.ToManyField('popit.api.OrgCodeResource', 'codes', full=True)
-    positions = fields.ToManyField('popit.api.PositionResource', 'position_set')
+    data = PrefetchToManyField('popit.api.OrgDataResource', 'data', full=True)
+    names = PrefetchToManyField('popit.api.OrgNameResource', 'names', full=True)
+    codes = PrefetchToManyField('popit.api.OrgCodeResource', 'codes', full=True)
+    positions = PrefetchToManyField('popit.api.PositionResource', 'position_set')
     class Meta:
         queryset = models.Organisation.objects.all()
         filtering = {
@@ -85,12 +90,14 @@ class OrgCodeResource(CommonResource):
 # Person
 
 class PersonResource(CommonResource):
-    data = fields.ToManyField('popit.api.PersonDataResource', 'data', full=True)
-    names = fields.ToManyField('popit.api.PersonNameResource', 'names', full=True)
-    codes = fields.ToManyField('popit.api.PersonCodeResource', 'codes', full=True)
-    positions = fields.ToManyField('popit.api.PositionResource', 'position_set', full=True)
+    data = PrefetchToManyField('popit.api.PersonDataResource', 'data', full=True)
+    names = PrefetchToManyField('popit.api.PersonNameResource', 'names', full=True)
+    codes = PrefetchToManyField('popit.api.PersonCodeResource', 'codes', full=True)
+    positions = PrefetchToManyField('popit.api.PositionResource', 'position_set', full=True)
     class Meta:
         queryset = models.Person.objects.all()
+        # the primary name is among the names
+        excludes = models.PRIMARY_FIELDS
         filtering = {
             'date_of_birth': ALL,
             'date_of_death': ALL,
@@ -170,8 +177,34 @@ class PositionResource(CommonResource):
             'type': ALL_WITH_RELATIONS,
             'organisation': ALL_WITH_RELATIONS,
             'person': ALL_WITH_RELATIONS,
+            'start_day': ALL,
+            'end_day': ALL,
+            'is_current': ALL,
         }
 
+    def build_filters(self, filters=None):
+        """
+        Also filter positions held on active_on=YYYY-MM-DD, or on any day from
+        active_from to active_to, as PositionQuerySet does.
+        """
+        if filters is None:
+            filters = {}
+        orm_filters = super(PositionResource, self).build_filters(filters)
+        days = {}
+        for param in ('active_on', 'active_from', 'active_to'):
+            if filters.get(param):
+                try:
+                    days[param] = datetime.datetime.strptime(filters[param], '%Y-%m-%d').date()
+                except ValueError:
+                    raise BadRequest("Invalid date '%s' of %s, expected YYYY-MM-DD." % (filters[param], param))
+        if 'active_on' in days:
+            days['active_from'] = days['active_to'] = days['active_on']
+        if 'active_from' in days:
+            orm_filters['end_day__gte'] = days['active_from']
+        if 'active_to' in days:
+            orm_filters['start_day__lte'] = days['active_to']
+        return orm_filters
+
 class PositionDataKeyResource(DataKeyResource):
     class Meta(DataKeyResource.Meta):
         queryset = models.PositionDataKey.objects.all()
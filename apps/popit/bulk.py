@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+Bulk writes of people with their names.
+
+Saving a PersonName saves its person again to set the primary name and
+slug, and saving a Representative switches the active language to compute
+its slug, so importing people one by one writes every person several times.
+L{upsert_people} computes primary names and slugs in memory instead, writes
+each person once and all names in bulk, in one transaction per batch.
+
+Bulk writes send no signals for names and updated people, receivers
+interested in them can connect to L{people_upserted}, which is sent once
+per batch.
+"""
+__docformat__ = 'epytext en'
+
+import datetime
+from django.conf import settings
+from django.db import models, transaction
+from django.dispatch import Signal
+from django.template.defaultfilters import slugify
+from django.utils.translation import activate, get_language
+from unidecode import unidecode
+
+from util import versions
+from util.db import batches, bulk_create
+
+from .models import Person, PersonName, cascades_suspended
+
+
+#: number of people written per transaction
+BATCH_SIZE = 100
+#: sent with the people written by a batch, after the names were written
+people_upserted = Signal(providing_args=['people'])
+
+
+
+def get_primary (names):
+    """Get the primary one of given names, as by the ordering of PersonName.
+
+    @param names: names of a person
+    @type names: [ PersonName ]
+    @return: the primary name, None if there are no names
+    @rtype: PersonName
+    """
+    def prepared (name, field):
+        value = getattr(name, field)
+        return PersonName._meta.get_field(field).get_prep_value(value) or u''
+
+    # stable sorts, by the last key first
+    names = sorted(names, key=lambda name: name.__dict__.get('name') or u'')
+    names.sort(key=lambda name: prepared(name, 'end_date'))
+    names.sort(key=lambda name: prepared(name, 'start_date'), reverse=True)
+    names.sort(key=lambda name: bool(name.main), reverse=True)
+    return names[0] if names else None
+
+
+
+def _get_update_fields (model):
+    """Get the fields of given model written when updating people.
+
+    @param model: model of the people
+    @type model: django.db.models.Model
+    @return: fields
+    @rtype: [ django.db.models.Field ]
+    """
+    return [f for f in model._meta.fields if not f.primary_key and
+        not isinstance(f, models.AutoField) and f.name != 'created']
+
+
+
+@transaction.commit_on_success
+def _upsert_batch (model, people, replace):
+    """Insert or update a batch of people, see L{upsert_people}."""
+    lang = get_language()
+    activate(settings.LANGUAGE_CODE) # slugs are in the default language
+    try:
+        for person, names in people:
+            primary = get_primary(names)
+            person.__dict__.update(PersonName.get_primary_values(primary))
+            person.slug = slugify(unidecode(primary.name or u'')) if primary else u''
+    finally:
+        activate(lang)
+
+    existing = {}
+    slugs = set(person.slug for person, names in people)
+    for slug, pk in model.objects.filter(slug__in=slugs).order_by('-pk').values_list('slug', 'pk'):
+        existing[slug] = pk
+    kept = model.objects.in_bulk([existing[p.slug] for p, n in people
+        if p.slug in existing and not replace])
+
+    now = datetime.datetime.now()
+    fields = _get_update_fields(model)
+    inserted = {}
+    written = []
+    results = []
+    for person, names in people:
+        if person.slug in existing:
+            pk = existing[person.slug]
+            if not replace:
+                if pk in kept:
+                    person = kept[pk]
+                    person.created = False
+                else: # inserted by this batch already
+                    person = inserted[pk]
+                results.append(person)
+                continue
+            person.pk = pk
+            person.created = False
+            person.updated = now
+            # not through the translation descriptors, which set by language
+            model.objects.filter(pk=pk).update(**dict(
+                (f.attname, person.__dict__[f.attname]) for f in fields))
+        else:
+            # without the model's save, which would compute the slug again
+            models.Model.save(person)
+            person.created = True
+            existing[person.slug] = person.pk
+            inserted[person.pk] = person
+        written.append((person, names))
+        results.append(person)
+
+    with cascades_suspended():
+        replaced = [person.pk for person, names in written if not person.created]
+        if replaced:
+            PersonName.objects.filter(person__in=replaced).delete()
+        for person, names in written:
+            for name in names:
+                name.person_id = person.pk
+        bulk_create(PersonName, [name for person, names in written for name in names])
+
+    if written:
+        people_upserted.send(sender=model, people=[person for person, names in written])
+    return results
+
+
+
+def upsert_people (people, replace=False, batch_size=BATCH_SIZE):
+    """Insert or update people with their names, matched by slug.
+
+    The slug and primary name of each person are computed from the given
+    names. New people are inserted, with their names. Existing people with
+    the same slug are updated with all fields of the given person and get
+    the given names instead of theirs, if replace is set, otherwise they are
+    kept as they are.
+
+    Custom save methods of people and names are not called, neither are
+    signals sent for names and updated people.
+
+    @param people: unsaved people and their unsaved names
+    @type people: iterable of (Person, [ PersonName ]), all of one model
+    @param replace: if existing people are replaced
+    @type replace: bool
+    @param batch_size: number of people written per transaction
+    @type batch_size: int
+    @return: people written or kept, in the given order, with attribute
+        created set if they were inserted
+    @rtype: [ Person ]
+    """
+    results = []
+    for batch in batches(people, batch_size):
+        model = type(batch[0][0])
+        results.extend(_upsert_batch(model, batch, replace))
+    if results:
+        versions.bump(Person, PersonName, *set(type(person) for person in results))
+    return results
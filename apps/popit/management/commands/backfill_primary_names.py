@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""
+Command to backfill the primary names of people.
+
+Person keeps the first of its names, kept up to date when names are saved or
+deleted. This sets it for people whose names were stored before, reading all
+names with one query.
+"""
+__docformat__ = 'epytext en'
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import get_models
+
+from util import versions
+
+
+
+class Command (BaseCommand):
+    """Command to backfill the primary names of people."""
+    #: help string
+    help = 'Sets the primary name of all people to the first of their names.'
+
+
+    @transaction.commit_on_success
+    def handle (self, *args, **options):
+        """Command handler."""
+        from popit.models import PRIMARY_FIELDS, PRIMARY_NAME_FIELDS, Person, PersonName
+
+        ordering = ['person'] + list(PersonName._meta.ordering)
+        primary = {}
+        names = PersonName.objects.order_by(*ordering).values_list('person', *PRIMARY_NAME_FIELDS)
+        for row in names.iterator():
+            primary.setdefault(row[0], row[1:])
+
+        no_name = PersonName.get_primary_values(None)
+        no_name = [no_name[f] for f in PRIMARY_FIELDS]
+        changed = 0
+        for row in list(Person.objects.values_list('pk', *PRIMARY_FIELDS)):
+            values = list(primary.get(row[0], no_name))
+            if values != list(row[1:]):
+                Person.objects.filter(pk=row[0]).update(**dict(zip(PRIMARY_FIELDS, values)))
+                changed += 1
+
+        if changed:
+            versions.bump(*[m for m in get_models() if issubclass(m, Person)])
+        self.stdout.write('%d people with names, %d primary names set.\n' % (len(primary), changed))
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+"""
+Command to refresh which positions are current.
+
+Position keeps whether it is held today, set when it is saved. Positions
+starting or ending later need a refresh, run this daily, e.g. from cron.
+With --dates the day ranges of all positions are computed from their dates
+first, once for positions stored before they were kept.
+"""
+__docformat__ = 'epytext en'
+
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from util import versions
+
+
+
+class Command (BaseCommand):
+    """Command to refresh which positions are current."""
+    #: help string
+    help = 'Refreshes which positions are current, with --dates also their day ranges.'
+    #: options
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--dates',
+            action='store_true',
+            dest='dates',
+            default=False,
+            help='Compute the day ranges of all positions from their dates first.'
+        ),
+    )
+
+
+    def _set_day_ranges (self):
+        """Set the day ranges of all positions from their dates.
+
+        @return: number of positions changed
+        @rtype: int
+        """
+        from popit.models import Position
+        changed = 0
+        rows = Position.objects.values_list('pk', 'start_date', 'end_date',
+            'start_day', 'end_day')
+        for pk, start_date, end_date, start_day, end_day in list(rows):
+            day_range = Position(start_date=start_date, end_date=end_date).get_day_range()
+            if day_range != (start_day, end_day):
+                Position.objects.filter(pk=pk).update(start_day=day_range[0],
+                    end_day=day_range[1])
+                changed += 1
+        return changed
+
+
+    @transaction.commit_on_success
+    def handle (self, *args, **options):
+        """Command handler."""
+        from popit.models import Position
+        ranges = self._set_day_ranges() if options.get('dates') else 0
+        current = Position.objects.refresh_current()
+
+        if ranges or current:
+            versions.bump(Position)
+        if options.get('dates'):
+            self.stdout.write('%d day ranges set.\n' % ranges)
+        self.stdout.write('%d positions started or ended being current.\n' % current)
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*
 # extended by Sebastian Henschel sebastiantransparency@gmail.com for
 # http://shenmartav.ge
+import threading
+from contextlib import contextmanager
+from django.conf import settings
 from django.contrib.contenttypes import generic
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.template.defaultfilters import slugify
 from django.utils.translation import ugettext_lazy as _
 from unidecode import unidecode
@@ -13,12 +18,62 @@ from django_date_extensions.fields import ApproximateDateField
 from apps.popit.models import ModelBase, DataKey, Data, date_help_text, CodeType
 
 
+#: fields of PersonName kept on Person as its primary name, with translations
+PRIMARY_NAME_FIELDS = [field + suffix for field in ('title', 'name')
+    for suffix in [''] + ['_' + code for code, name in settings.LANGUAGES]]
+#: fields of Person keeping the primary name
+PRIMARY_FIELDS = ['primary_' + field for field in PRIMARY_NAME_FIELDS]
+
+#: per thread, if saving or deleting names updates their person
+_cascades = threading.local()
+
+
+@contextmanager
+def cascades_suspended():
+    """Don't update people when their names are saved or deleted, in this
+    thread, for bulk writes which update people themselves, see popit.bulk.
+    """
+    enabled = getattr(_cascades, 'enabled', True)
+    _cascades.enabled = False
+    try:
+        yield
+    finally:
+        _cascades.enabled = enabled
+
+
+class PrimaryName(object):
+    """A person's primary name as kept on Person, used like a PersonName."""
+
+    def __init__ (self, title, name):
+        """
+        @param title: title of the name
+        @type title: unicode
+        @param name: the name
+        @type name: unicode
+        """
+        self.title = title or u''
+        self.name = name or u''
+
+    def __unicode__ (self):
+        if self.title:
+            return u'%s %s' % (self.title, self.name)
+        else:
+            return self.name
+
+    def __str__ (self):
+        return unicode(self).encode('utf-8')
+
+
 class Person(ModelBase):
     slug            = models.SlugField(editable=False)
     date_of_birth   = ApproximateDateField(blank=True, help_text=date_help_text)
     date_of_death   = ApproximateDateField(blank=True, help_text=date_help_text)
     #gender          = models.CharField(max_length=1, choices=(('m','Male'),('f','Female')) )
     description     = models.TextField(blank=True, default='')
+    # title of the primary name, kept by PersonName
+    primary_title   = models.CharField(max_length=100, blank=True, editable=False)
+    # primary name, the first of names, kept by PersonName
+    primary_name    = models.CharField(max_length=300, blank=True, editable=False)
 
     class Meta:
         ordering = [ 'slug' ]
@@ -30,10 +85,29 @@ class Person(ModelBase):
 
     @property
     def name(self):
-        try:
-            return self.names.all()[0]
-        except:
+        """The primary name, without querying the names.
+
+        @return: the primary name or 'Unknown' if there are no names
+        @rtype: PrimaryName or str
+        """
+        if not self.primary_name:
             return 'Unknown'
+        return PrimaryName(self.primary_title, self.primary_name)
+
+    def set_primary_name (self):
+        """Set the primary name to the first of self's names.
+
+        Writes by a query update, so the person isn't saved, and sets the
+        fields of self as well.
+        """
+        values = self.names.values(*PRIMARY_NAME_FIELDS)[:1]
+        if values:
+            values = dict(zip(PRIMARY_FIELDS, [values[0][f] for f in PRIMARY_NAME_FIELDS]))
+        else:
+            values = PersonName.get_primary_values(None)
+        Person.objects.filter(pk=self.pk).update(**values)
+        # not through the translation descriptors, which set by language
+        self.__dict__.update(values)
 
     @models.permalink
     def get_absolute_url (self, language=None):
@@ -71,17 +145,34 @@ class PersonName(ModelBase):
 
 
 
+    @classmethod
+    def get_primary_values (cls, name):
+        """Get the values of a person's primary name fields for given name.
+
+        @param name: the primary name, None if there are no names
+        @type name: PersonName
+        @return: values by field of Person, see L{PRIMARY_FIELDS}
+        @rtype: { str: unicode }
+        """
+        if name is None:
+            values = dict((field, None) for field in PRIMARY_FIELDS)
+            values['primary_title'] = values['primary_name'] = u''
+            return values
+        # not through the translation descriptors, which get by language
+        return dict((primary, name.__dict__.get(field))
+            for primary, field in zip(PRIMARY_FIELDS, PRIMARY_NAME_FIELDS))
+
     def save(self, *args, **kwargs):
         super(PersonName, self).save(*args, **kwargs)
-        try:
-            person = self.person
-            if person.name is not None:
-                person.slug = slugify(unidecode(person.name.name))
-            else:
-                person.slug = ''
-            person.save()
-        except:
-            pass
+        if not getattr(_cascades, 'enabled', True):
+            return
+        person = self.person
+        person.set_primary_name()
+        if isinstance(person.name, PrimaryName):
+            person.slug = slugify(unidecode(person.name.name))
+        else:
+            person.slug = ''
+        person.save()
 
     def __unicode__(self):
         if self.title:
@@ -89,6 +180,17 @@ class PersonName(ModelBase):
         else:
             return self.name
 
+@receiver(post_delete, sender=PersonName, dispatch_uid='apps.popit.post_delete.remove_primary_name')
+def remove_primary_name (sender, instance, **kwargs):
+    """Set the primary name of a deleted name's person, if still there."""
+    if not getattr(_cascades, 'enabled', True):
+        return
+    try:
+        person = Person.objects.get(pk=instance.person_id)
+    except Person.DoesNotExist:
+        return
+    person.set_primary_name()
+
 class PersonCode(ModelBase):
     person      = models.ForeignKey(Person, related_name='codes')
     type        = models.ForeignKey(CodeType)
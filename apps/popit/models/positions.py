@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+import calendar
 import datetime
 
 from django.db import models
@@ -7,13 +8,32 @@ from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes import generic
 from django.core import exceptions
 from django.db.models import Q
+from django.db.models.query import QuerySet
 from django.conf import settings
 
-from django_date_extensions.fields import ApproximateDateField
+from django_date_extensions.fields import ApproximateDate, ApproximateDateField
 from markitup.fields import MarkupField
 
 from popit.models import ModelBase, date_help_text, Person, Organisation, DataKey, Data
 
+
+def get_day_range(date):
+    """
+    Return the first and last day an approximate date may mean, None if the
+    date is not known. A date in the future means datetime.date.max.
+    """
+    if not date:
+        return None
+    if date.future:
+        return datetime.date.max, datetime.date.max
+    if not date.month:
+        return datetime.date(date.year, 1, 1), datetime.date(date.year, 12, 31)
+    if not date.day:
+        last = calendar.monthrange(date.year, date.month)[1]
+        return datetime.date(date.year, date.month, 1), datetime.date(date.year, date.month, last)
+    day = datetime.date(date.year, date.month, date.day)
+    return day, day
+
 class PositionCategory(ModelBase):
     #category_choices = (
     #    ('political', 'Political'),
@@ -72,6 +92,48 @@ class PositionType(ModelBase):
 #
 #        return orgs
 
+class PositionQuerySet(QuerySet):
+    """
+    Date range queries on the indexed start_day and end_day of positions.
+    """
+
+    def active_on(self, day):
+        """Positions held on the given day."""
+        return self.filter(start_day__lte=day, end_day__gte=day)
+
+    def overlapping(self, start, end):
+        """Positions held on any day from start to end, both included."""
+        return self.filter(start_day__lte=end, end_day__gte=start)
+
+    def current(self):
+        """Positions held today, as by the stored is_current flag."""
+        return self.filter(is_current=True)
+
+class PositionManager(models.Manager):
+    def get_query_set(self):
+        return PositionQuerySet(self.model, using=self._db)
+
+    def active_on(self, day):
+        return self.get_query_set().active_on(day)
+
+    def overlapping(self, start, end):
+        return self.get_query_set().overlapping(start, end)
+
+    def current(self):
+        return self.get_query_set().current()
+
+    def refresh_current(self, day=None):
+        """
+        Set is_current of the positions which started or ended since the last
+        refresh, as of the given day or today. Returns the number changed.
+        """
+        day = day or datetime.date.today()
+        qs = self.get_query_set()
+        started = qs.filter(is_current=False).active_on(day).update(is_current=True)
+        ended = qs.filter(is_current=True).filter(
+            Q(start_day__gt=day) | Q(end_day__lt=day)).update(is_current=False)
+        return started + ended
+
 class Position(ModelBase):
     person          = models.ForeignKey(Person)
     organisation    = models.ForeignKey(Organisation, null=True, blank=True)
@@ -90,6 +152,17 @@ class Position(ModelBase):
     sorting_start_date      = models.CharField(editable=True, default='', max_length=10)
     sorting_end_date        = models.CharField(editable=True, default='', max_length=10)
 
+    # The days the position may have been held, from the dates. Not null, so
+    # range queries use the indexes: an unknown start is datetime.date.min,
+    # an end in the future datetime.date.max. An unknown end is the end of
+    # the start date and positions without any date are held on no day.
+    start_day       = models.DateField(editable=False, db_index=True, default=datetime.date.min)
+    end_day         = models.DateField(editable=False, db_index=True, default=datetime.date.min)
+    # Whether the position is held today, see PositionManager.refresh_current
+    is_current      = models.BooleanField(editable=False, db_index=True, default=False)
+
+    objects = PositionManager()
+
     def __unicode__(self):
         if self.organisation:
             organisation = self.organisation.name
@@ -193,8 +266,23 @@ class Position(ModelBase):
         
         return True
 
+    def get_day_range(self):
+        """Return the start_day and end_day of the dates (does not set them)"""
+        start = get_day_range(self._meta.get_field('start_date').to_python(self.start_date))
+        end = get_day_range(self._meta.get_field('end_date').to_python(self.end_date))
+        if not start and not end:
+            return datetime.date.min, datetime.date.min
+        start_day = start[0] if start else datetime.date.min
+        return start_day, (end or start)[1]
+
+    def _set_day_range(self):
+        """Set the day range and is_current from the dates (does not call save())"""
+        self.start_day, self.end_day = self.get_day_range()
+        self.is_current = self.start_day <= datetime.date.today() <= self.end_day
+
     def save(self, *args, **kwargs):
         self._set_sorting_dates()
+        self._set_day_range()
         super(Position, self).save(*args, **kwargs)
 
 class PositionDataKey(DataKey):
@@ -1,3 +1,5 @@
 # -*- coding: utf-8 -*-
 
 from test_organisation import *
+from test_person import *
+from test_position import *
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from django.core.management import call_command
+from django.test import TestCase
+from popit.bulk import upsert_people
+from popit.models import Person, PersonName
+
+class PersonTest(TestCase):
+    def test_primary_name(self):
+        """
+        Test that the primary name is kept on the person
+        """
+
+        person = Person()
+        person.save()
+        self.assertEqual( person.name, "Unknown" )
+
+        foo_name = person.names.create(
+            person = person,
+            name = "Foo Bar",
+            main = True,
+        )
+        person.names.create(
+            person = person,
+            title = "Dr",
+            name = "Baz",
+        )
+        person = person.fetch_fresh_from_database()
+        with self.assertNumQueries(0):
+            self.assertEqual( unicode(person), u"Foo Bar" )
+            self.assertEqual( person.name.name, "Foo Bar" )
+        self.assertEqual( person.slug, "foo-bar" )
+
+        # deleting the main name makes the other one primary
+        foo_name.delete()
+        person = person.fetch_fresh_from_database()
+        self.assertEqual( unicode(person), u"Dr Baz" )
+        self.assertEqual( person.name.title, "Dr" )
+
+        PersonName.objects.filter(person=person).delete()
+        person = person.fetch_fresh_from_database()
+        self.assertEqual( person.name, "Unknown" )
+
+    def test_backfill(self):
+        """
+        Test that the backfill sets the primary names of existing people
+        """
+
+        person = Person()
+        person.save()
+        person.names.create(person=person, name="Foo Bar", main=True)
+        Person.objects.update(primary_name='', primary_name_en=None, primary_name_ka=None)
+        self.assertEqual( person.fetch_fresh_from_database().name, "Unknown" )
+
+        call_command('backfill_primary_names')
+        self.assertEqual( unicode(person.fetch_fresh_from_database()), u"Foo Bar" )
+
+    def test_upsert_people(self):
+        """
+        Test that bulk upserts set slugs and primary names, keeping or replacing existing people
+        """
+
+        def records(*names):
+            return [(Person(), [PersonName(name=name, main=True),
+                PersonName(name="Other %s" % name)]) for name in names]
+
+        people = upsert_people(records("Foo Bar", "Baz Qux"))
+        self.assertEqual( [p.created for p in people], [True, True] )
+        foo = Person.objects.get(slug="foo-bar")
+        self.assertEqual( unicode(foo), u"Foo Bar" )
+        self.assertEqual( foo.names.count(), 2 )
+
+        people = upsert_people(records("Foo Bar", "New One"), batch_size=1)
+        self.assertEqual( [p.created for p in people], [False, True] )
+        self.assertEqual( people[0].pk, foo.pk )
+        self.assertEqual( Person.objects.count(), 3 )
+
+        people = upsert_people([(Person(), [PersonName(name="Foo Bar", title="Dr")])],
+            replace=True)
+        self.assertEqual( people[0].pk, foo.pk )
+        self.assertFalse( people[0].created )
+        foo = foo.fetch_fresh_from_database()
+        self.assertEqual( unicode(foo), u"Dr Foo Bar" )
+        self.assertEqual( foo.names.count(), 1 )
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+import datetime
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.test.client import RequestFactory
+from popit.models import Person, Position
+from popit.urls import v1_api
+
+class PositionTest(TestCase):
+    def setUp(self):
+        self.person = Person()
+        self.person.save()
+
+    def position(self, start_date, end_date):
+        position = Position(person=self.person, title="MP",
+            start_date=start_date, end_date=end_date)
+        position.save()
+        return position.fetch_fresh_from_database()
+
+    def test_day_range(self):
+        """
+        Test that the days held are set from the approximate dates
+        """
+
+        position = self.position('2008-05-00', '2012-00-00')
+        self.assertEqual( position.start_day, datetime.date(2008, 5, 1) )
+        self.assertEqual( position.end_day, datetime.date(2012, 12, 31) )
+        self.assertFalse( position.is_current )
+
+        position = self.position('', 'future')
+        self.assertEqual( position.start_day, datetime.date.min )
+        self.assertEqual( position.end_day, datetime.date.max )
+        self.assertTrue( position.is_current )
+
+        # unknown end ends with the start, no dates are held on no day
+        position = self.position('2010-02-00', '')
+        self.assertEqual( position.end_day, datetime.date(2010, 2, 28) )
+        position = self.position('', '')
+        self.assertEqual( position.end_day, datetime.date.min )
+
+    def test_queries(self):
+        """
+        Test that positions are found by the day and range they were held
+        """
+
+        old = self.position('2004-00-00', '2008-06-15')
+        new = self.position('2008-06-16', 'future')
+        self.assertEqual( list(Position.objects.active_on(datetime.date(2008, 6, 15))), [old] )
+        self.assertEqual( list(self.person.position_set.active_on(datetime.date.today())), [new] )
+        self.assertEqual( set(Position.objects.overlapping(
+            datetime.date(2008, 1, 1), datetime.date(2008, 12, 31))), set([old, new]) )
+        self.assertEqual( list(Position.objects.overlapping(
+            datetime.date(2001, 1, 1), datetime.date(2003, 12, 31))), [] )
+        self.assertEqual( list(Position.objects.current()), [new] )
+
+        request = RequestFactory().get('/', {'active_on': '2005-01-01'})
+        positions = v1_api._registry['position'].obj_get_list(request)
+        self.assertEqual( list(positions), [old] )
+
+    def test_refresh(self):
+        """
+        Test that refreshing sets which positions are current
+        """
+
+        position = self.position('2004-00-00', 'future')
+        Position.objects.update(start_day=datetime.date.min, end_day=datetime.date.min,
+            is_current=False)
+
+        self.assertEqual( Position.objects.refresh_current(), 0 )
+        call_command('refresh_positions', dates=True)
+        self.assertEqual( list(Position.objects.current()), [position] )
+        self.assertEqual( Position.objects.refresh_current(datetime.date(2003, 1, 1)), 1 )
+        self.assertFalse( position.fetch_fresh_from_database().is_current )
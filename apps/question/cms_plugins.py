@@ -5,9 +5,9 @@ from cms.plugin_pool import plugin_pool
 from cms.models.pluginmodel import CMSPlugin
 from django.utils.translation import get_language, ugettext_lazy as _
 
-from .models import Question, QuestionPluginConf
+from .models import Question, QuestionPluginConf, QuestionStatistics
 from .forms import QuestionForm
-from representative.models import Representative, RandomRepresentative
+from representative.models import Representative, RandomRepresentative, Unit
 
 
 class QuestionPlugin (CMSPluginBase):
@@ -16,16 +16,15 @@ class QuestionPlugin (CMSPluginBase):
     render_template = 'cmsplugins/question.html'
 
 
-    def _add_activity (self, representative):
-        questions = Question.public.filter(representative=representative).count()
-        answered = Question.answered.filter(representative=representative).count()
+    def _add_activity (self, statistics):
+        representative = statistics.representative
         representative.unanswered = {
-            'absolute': questions - answered,
-            'relative': 100 - representative.answered
+            'absolute': statistics.unanswered,
+            'relative': 100 - statistics.percentage
         }
         representative.answered = {
-            'absolute': answered,
-            'relative': representative.answered
+            'absolute': statistics.answered,
+            'relative': statistics.percentage
         }
 
         return representative
@@ -52,16 +51,13 @@ class QuestionPlugin (CMSPluginBase):
             context['least_active'] = None
             return context
 
-        try:
-            representative = representatives.order_by('-answered')[0]
-            context['most_active'] = self._add_activity(representative)
-        except IndexError:
+        leaderboard = QuestionStatistics.get_leaderboard(
+            term=Unit.objects.get(pk=1).active_term_id)
+        if leaderboard:
+            context['most_active'] = self._add_activity(leaderboard[0])
+            context['least_active'] = self._add_activity(leaderboard[-1])
+        else:
             context['most_active'] = None
-
-        try:
-            representative = representatives.order_by('answered')[0]
-            context['least_active'] = self._add_activity(representative)
-        except IndexError:
             context['least_active'] = None
 
         return context
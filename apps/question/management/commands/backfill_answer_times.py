@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+"""
+Command to backfill when questions were answered.
+
+Questions answered before answer times were recorded get the time of their
+first revision with an answer, if reversion has a history of them. Those
+without history stay without answer time and don't count for days to answer.
+Then the question statistics are recounted.
+"""
+__docformat__ = 'epytext en'
+
+from optparse import make_option
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from util import versions
+
+
+
+class Command (BaseCommand):
+    """Command to backfill when questions were answered."""
+    #: help string
+    help = 'Backfill when questions were answered from reversion history, then recount question statistics.'
+    #: options
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--dry-run',
+            action='store_true',
+            dest='dry_run',
+            default=False,
+            help='Only report what would be backfilled.'
+        ),
+    )
+
+
+    def _get_answer_times (self, pks):
+        """Get the times of the first revisions with an answer.
+
+        @param pks: primary keys of the questions to look up
+        @type pks: set
+        @return: time of answer by primary key
+        @rtype: { int: datetime.datetime }
+        """
+        from django.contrib.contenttypes.models import ContentType
+        from django.core.serializers.base import DeserializationError
+        from reversion.models import Version
+        from question.models import Question
+
+        history = Version.objects.filter(
+            content_type=ContentType.objects.get_for_model(Question),
+        ).select_related('revision').order_by('revision__date_created', 'pk')
+
+        times = {}
+        for version in history.iterator():
+            try:
+                pk = int(version.object_id)
+            except ValueError:
+                continue
+            if pk not in pks or pk in times:
+                continue
+            try:
+                answer = getattr(version.object_version.object, 'answer', None)
+            except DeserializationError:
+                continue
+            if answer:
+                times[pk] = version.revision.date_created
+        return times
+
+
+    @transaction.commit_on_success
+    def handle (self, *args, **options):
+        """Command handler."""
+        from question.models import Question, QuestionStatistics
+        missing = Question.objects.filter(answered_at__isnull=True,
+            answer__isnull=False).exclude(answer='')
+        pks = set(missing.values_list('pk', flat=True))
+        times = self._get_answer_times(pks)
+
+        if not options.get('dry_run'):
+            for pk, answered_at in times.iteritems():
+                Question.objects.filter(pk=pk).update(answered_at=answered_at)
+            QuestionStatistics.reconcile()
+            versions.bump(Question)
+
+        self.stdout.write('%d answered questions without answer time, %d backfilled from history.\n' % (
+            len(pks), len(times)))
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""
+Command to recount the question statistics of all representatives.
+
+Meant to run nightly: questions become due after the cutoff without being
+saved, and changes bypassing Question.save, like queryset updates, are not
+counted either.
+"""
+__docformat__ = 'epytext en'
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from question.models import QuestionStatistics
+
+
+
+class Command (BaseCommand):
+    """Command to recount the question statistics of all representatives."""
+    #: help string
+    help = 'Recount the question statistics of all representatives, e.g. nightly.'
+
+
+    @transaction.commit_on_success
+    def handle (self, *args, **options):
+        """Command handler."""
+        statistics = QuestionStatistics.reconcile()
+        self.stdout.write('%d representatives, %d public questions.\n' % (
+            len(statistics), sum(s.total for s in statistics)))
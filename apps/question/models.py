@@ -10,20 +10,40 @@ __docformat__ = 'epytext en'
 import urllib, urllib2, copy, datetime
 from cms.models.pluginmodel import CMSPlugin
 from django.contrib.sites.models import Site
-from django.core.mail import EmailMessage
-from django.db import models
-from django.db.models.signals import post_save
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Count, Max
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.template import Context, loader
-from django.utils.translation import ugettext as _
+from django.utils.translation import ugettext as _, ugettext_lazy
 
 from settings import QUESTION_SMS_URL
 from representative.models import Representative
-
-
-
+from util import outbox, versions
+from util.db import bulk_create
+from util.stats import percentile
+
+
+
+#: days after which questions are due to be answered
+CUTOFF_DAYS = 14
+#: seconds leaderboards are cached
+LEADERBOARD_TIMEOUT = 60 * 60 * 24
+#: what a question not public counts for in statistics, see Question._get_counts
+NO_COUNTS = (0, 0, 0, None, None)
+#: upper bounds of days to answer shown in distributions, None for any
+LATENCY_BUCKETS = (
+    (1, ugettext_lazy('within a day')),
+    (7, ugettext_lazy('within a week')),
+    (14, ugettext_lazy('within two weeks')),
+    (30, ugettext_lazy('within a month')),
+    (None, ugettext_lazy('later')),
+)
 #: URL where to send question to @ parliament.ge
 URL_SEND_PARLIAMENT = 'http://parliament.ge/index.php?option=com_dmaskinfopopup'
+#: parliament_response of questions queued to be sent to parliament.ge
+PARLIAMENT_QUEUED = 'QUEUED'
 #: map representative id @ shenmartav.ge to parliament.ge article id
 SHENMARTAV2PARLIAMENT = {
     '15': '16', # Akaki Bobokhidze
@@ -167,6 +187,22 @@ SHENMARTAV2PARLIAMENT = {
 
 
 
+def get_latency (asked, answered_at):
+    """Get the number of days a question took to be answered.
+
+    @param asked: when the question was asked
+    @type asked: datetime.date
+    @param answered_at: when the question was answered
+    @type answered_at: datetime.datetime
+    @return: days, None if the time of the answer is unknown
+    @rtype: int
+    """
+    if not answered_at:
+        return None
+    return max(0, (answered_at.date() - asked).days)
+
+
+
 class PublicManager (models.Manager):
     """Manager to return public questions."""
     def _clone(self): # bug in Manager? DetailView complains about it missing
@@ -210,6 +246,9 @@ class Question (models.Model):
         help_text=_('Representative being asked'))
     #: the representative's answer
     answer = models.TextField(help_text=_('The Answer'), blank=True)
+    #: when the question was answered
+    answered_at = models.DateTimeField(blank=True, null=True, editable=False,
+        help_text=_('When the question was answered'))
     #: parliament.ge response
     parliament_response = models.TextField(blank=True, help_text=_('Response from parliament.ge when sending the question'))
 
@@ -242,42 +281,72 @@ class Question (models.Model):
 
 
     def _notify_questioner (self):
-        """Send a notification to questioner."""
+        """Queue notifications to questioner, see util.outbox."""
         if self.email:
             subject = _('%(name_asker)s, your question to %(name_representative)s has been answered.' % {
                 'name_asker': self.name,
                 'name_representative': self.representative.name}
             )
             body = self.question + '\n\n' + self.answer
-            msg = EmailMessage(subject=subject, body=body, to=(self.email,))
-            msg.send()
+            outbox.enqueue('email', subject=subject, body=body, to=[self.email])
 
         if self.mobile:
             url = QUESTION_SMS_URL.replace('to=', 'to=' + self.mobile).replace(
                 'msg=', 'msg=' + urllib2.quote((self.answer).encode('utf8')))
-            try:
-                handle = urllib2.urlopen(url)
-                response = handle.read()
-                handle.close()
-            except urllib2.URLError, err:
-                pass # silently ignore for the time being
-#            else:
-#                print 'Response: %s' % response
-
-
-    def _set_percentage_answered (self):
-        """Sets the percentage of questions answered by self's representative."""
-        pk = self.representative.pk
-        total = Question.public.filter(representative=pk).count()
-        two_weeks_ago = datetime.date.today() - datetime.timedelta(14)
-        answered = Question.answered.filter(
-            representative=pk, date__lt=two_weeks_ago).count()
+            outbox.enqueue('sms', url=url)
 
-        try:
-            self.representative.answered = (answered * 100.) / total
-        except ZeroDivisionError:
-            self.representative.answered = 0.
-        self.representative.save()
+
+    def _get_counts (self):
+        """Get what self counts for in its representative's statistics.
+
+        @return: representative id and (total, answered, answered_due, date,
+            days to answer)
+        @rtype: (int, (int, int, int, datetime.date, int))
+        """
+        if not self.is_public:
+            return self.representative_id, NO_COUNTS
+        date = self.date
+        if isinstance(date, datetime.datetime):
+            date = date.date()
+        answered = int(bool(self.answer))
+        due = int(answered and date < QuestionStatistics.get_cutoff())
+        latency = get_latency(date, self.answered_at) if answered else None
+        return self.representative_id, (1, answered, due, date, latency)
+
+
+    def _set_percentage_answered (self, saved=None):
+        """Sets the percentage of questions answered by self's representative.
+
+        Applies the difference between self and its saved version to the
+        statistics of the representatives concerned.
+
+        @param saved: self as it was before saving, None if new
+        @type saved: Question
+        """
+        new = self._get_counts()
+        old = saved._get_counts() if saved else (new[0], NO_COUNTS)
+        if old[0] != new[0]:
+            if old[1][0]:
+                QuestionStatistics.change(old[0], *[-c for c in old[1][:3]],
+                    removed=old[1][3], unanswered_in=old[1][4])
+            old = (new[0], NO_COUNTS)
+        if new == old:
+            return
+
+        counts = [n - o for n, o in zip(new[1][:3], old[1][:3])]
+        asked, removed = new[1][3], old[1][3]
+        if asked == removed:
+            asked = removed = None
+        answered_in, unanswered_in = new[1][4], old[1][4]
+        if answered_in == unanswered_in:
+            answered_in = unanswered_in = None
+
+        statistics = QuestionStatistics.change(new[0], *counts,
+            asked=asked, removed=removed, answered_in=answered_in,
+            unanswered_in=unanswered_in)
+        cache = self._meta.get_field('representative').get_cache_name()
+        if hasattr(self, cache):
+            getattr(self, cache).answered = statistics.percentage
 
 
     def _copy_formdata (self):
@@ -297,13 +366,428 @@ class Question (models.Model):
             if saved.answer != self.answer and self.answer:
                 self._notify_questioner()
         except Question.DoesNotExist:
-            pass
+            saved = None
 
+        if not self.answer:
+            self.answered_at = None
+        elif not self.answered_at:
+            self.answered_at = datetime.datetime.now()
         self._copy_formdata()
         super(Question, self).save(*args, **kwargs)
+        self._set_percentage_answered(saved)
+
+
+
+class QuestionStatistics (models.Model):
+    """Statistics of public questions to a representative.
+
+    Kept up to date by L{Question.save} and on deletion by adding the
+    difference a question makes, so nothing has to be counted on display.
+    Questions only become due after L{CUTOFF_DAYS}, which no save notices:
+    L{reconcile} recounts them, see command reconcile_question_statistics.
+
+    Representatives with public questions are ranked by percentage, which
+    makes the leaderboard, see L{get_leaderboard}.
+    """
+    #: representative being asked
+    representative = models.OneToOneField(Representative,
+        primary_key=True, related_name='question_statistics')
+    #: number of public questions
+    total = models.IntegerField(default=0)
+    #: number of answered public questions
+    answered = models.IntegerField(default=0)
+    #: number of answered public questions asked before the cutoff
+    answered_due = models.IntegerField(default=0)
+    #: date of the last public question
+    last_asked = models.DateField(blank=True, null=True)
+    #: percentage of public questions answered before the cutoff
+    percentage = models.FloatField(default=0, db_index=True)
+    #: rank on the leaderboard, 1 + number of representatives with a higher
+    #: percentage; None without public questions
+    rank = models.IntegerField(blank=True, null=True, db_index=True)
+    #: median of days to answer public questions, see QuestionLatency
+    latency_median = models.FloatField(blank=True, null=True)
+    #: 90th percentile of days to answer public questions
+    latency_p90 = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        ordering = ('rank', '-total', 'representative')
+
+
+    def __unicode__ (self):
+        return u'%s: %d/%d' % (self.representative_id, self.answered, self.total)
+
+
+    @property
+    def unanswered (self):
+        return self.total - self.answered
+
+
+    @property
+    def has_latency (self):
+        """If days to answer are known for any question."""
+        return self.latency_median is not None
+
+
+    def get_percentage (self):
+        """Compute the percentage of public questions answered before the cutoff.
+
+        @return: percentage
+        @rtype: float
+        """
+        try:
+            return (self.answered_due * 100.) / self.total
+        except ZeroDivisionError:
+            return 0.
+
+
+    @classmethod
+    def get_cutoff (cls):
+        """Get the date before which questions are due.
+
+        @return: date CUTOFF_DAYS ago
+        @rtype: datetime.date
+        """
+        return datetime.date.today() - datetime.timedelta(CUTOFF_DAYS)
 
-        if self.is_public:
-            self._set_percentage_answered()
+
+    @classmethod
+    def get (cls, representative_id):
+        """Get the statistics of given representative.
+
+        @param representative_id: id of the representative
+        @type representative_id: int
+        @return: statistics, counted if there are none yet
+        @rtype: QuestionStatistics
+        """
+        try:
+            return cls.objects.get(representative=representative_id)
+        except cls.DoesNotExist:
+            return cls.reconcile([representative_id])[0]
+
+
+    @classmethod
+    def change (cls, representative_id, total, answered, answered_due,
+            asked=None, removed=None, answered_in=None, unanswered_in=None,
+            create=True):
+        """Change the statistics of given representative by given numbers.
+
+        The counts are changed in the database, so concurrent changes add up.
+        Statistics which don't exist yet are counted from scratch instead.
+
+        @param representative_id: id of the representative
+        @type representative_id: int
+        @param total: difference of public questions
+        @type total: int
+        @param answered: difference of answered public questions
+        @type answered: int
+        @param answered_due: difference of answered public questions due
+        @type answered_due: int
+        @param asked: date of a public question added
+        @type asked: datetime.date
+        @param removed: date of a public question removed
+        @type removed: datetime.date
+        @param answered_in: days to answer of a public question answered
+        @type answered_in: int
+        @param unanswered_in: days to answer of a public question no longer
+            answered
+        @type unanswered_in: int
+        @param create: if statistics which don't exist yet are created
+        @type create: bool
+        @return: statistics as changed, None if not created
+        @rtype: QuestionStatistics
+        """
+        statistics = cls.objects.filter(representative=representative_id)
+        if not statistics.update(total=F('total') + total,
+                answered=F('answered') + answered,
+                answered_due=F('answered_due') + answered_due):
+            if not create:
+                return None
+            return cls.reconcile([representative_id])[0]
+
+        if removed:
+            last = Question.public.filter(
+                representative=representative_id).aggregate(Max('date'))
+            statistics.filter(last_asked=removed).update(
+                last_asked=last['date__max'])
+        if asked:
+            statistics.filter(models.Q(last_asked__isnull=True) |
+                models.Q(last_asked__lt=asked)).update(last_asked=asked)
+
+        statistics = statistics.get()
+        if answered_in is not None or unanswered_in is not None:
+            QuestionLatency.change(representative_id, answered_in, unanswered_in)
+            statistics.set_latency()
+        cls._move(statistics)
+        Representative.objects.filter(pk=representative_id).update(
+            answered=statistics.percentage)
+        versions.bump(Representative, cls)
+        return statistics
+
+
+    @classmethod
+    def _move (cls, statistics):
+        """Move given statistics to their new place on the leaderboard.
+
+        Only the representatives between the old and the new percentage
+        change rank: those below the old one move up, those below the new one
+        move down.
+
+        @param statistics: statistics with changed counts, but the old
+            percentage and rank
+        @type statistics: QuestionStatistics
+        """
+        old = statistics.percentage if statistics.rank is not None else None
+        percentage = statistics.get_percentage()
+        new = percentage if statistics.total > 0 else None
+        if old == new:
+            return
+
+        board = cls.objects.filter(rank__isnull=False).exclude(pk=statistics.pk)
+        if old is not None:
+            board.filter(percentage__lt=old).update(rank=F('rank') - 1)
+        rank = None
+        if new is not None:
+            board.filter(percentage__lt=new).update(rank=F('rank') + 1)
+            rank = board.filter(percentage__gt=new).count() + 1
+
+        statistics.percentage = percentage
+        statistics.rank = rank
+        cls.objects.filter(pk=statistics.pk).update(percentage=percentage, rank=rank)
+
+
+    @classmethod
+    def reconcile (cls, representative_ids=None):
+        """Recount the statistics of given representatives.
+
+        Also updates Representative.answered, without saving the
+        representatives.
+
+        @param representative_ids: ids of representatives, all if None
+        @type representative_ids: [ int ]
+        @return: statistics recounted
+        @rtype: [ QuestionStatistics ]
+        """
+        questions = Question.public.order_by()
+        if representative_ids is None:
+            representative_ids = Representative.objects.values_list('pk', flat=True)
+        else:
+            questions = questions.filter(representative__in=representative_ids)
+        answered = questions.filter(answer__isnull=False).exclude(answer='')
+
+        counts = dict((pk, cls(representative_id=pk))
+            for pk in representative_ids)
+        for row in questions.values('representative').annotate(
+                total=Count('pk'), last_asked=Max('date')):
+            counts[row['representative']].total = row['total']
+            counts[row['representative']].last_asked = row['last_asked']
+        for row in answered.values('representative').annotate(count=Count('pk')):
+            counts[row['representative']].answered = row['count']
+        for row in answered.filter(date__lt=cls.get_cutoff()).values(
+                'representative').annotate(count=Count('pk')):
+            counts[row['representative']].answered_due = row['count']
+
+        for statistics in counts.itervalues():
+            statistics.percentage = statistics.get_percentage()
+        cls._rank(counts)
+        histograms = QuestionLatency.reconcile(counts.keys())
+        for pk, statistics in counts.iteritems():
+            statistics.latency_median, statistics.latency_p90 = \
+                QuestionLatency.get_percentiles(histograms.get(pk, {}))
+
+        existing = set(cls.objects.filter(
+            representative__in=counts.keys()).values_list('representative', flat=True))
+        for pk, statistics in counts.iteritems():
+            statistics.save(force_update=pk in existing,
+                force_insert=pk not in existing)
+            Representative.objects.filter(pk=pk).update(
+                answered=statistics.percentage)
+        versions.bump(Representative, cls)
+        return counts.values()
+
+
+    def set_latency (self):
+        """Set the percentiles of days to answer from the latency histogram."""
+        histogram = dict(QuestionLatency.objects.filter(
+            representative=self.representative_id).values_list('days', 'count'))
+        self.latency_median, self.latency_p90 = QuestionLatency.get_percentiles(histogram)
+        QuestionStatistics.objects.filter(pk=self.pk).update(
+            latency_median=self.latency_median, latency_p90=self.latency_p90)
+
+
+    def get_latency_distribution (self):
+        """Get the distribution of days to answer, by L{LATENCY_BUCKETS}.
+
+        @return: label, number and percentage of answered questions by bucket
+        @rtype: [ (unicode, int, float) ]
+        """
+        histogram = QuestionLatency.objects.filter(
+            representative=self.representative_id, count__gt=0)
+        counts = [0] * len(LATENCY_BUCKETS)
+        for days, count in histogram.values_list('days', 'count'):
+            for i, (bound, label) in enumerate(LATENCY_BUCKETS):
+                if bound is None or days < bound:
+                    counts[i] += count
+                    break
+
+        total = sum(counts)
+        return [(label, count, total and count * 100. / total)
+            for (bound, label), count in zip(LATENCY_BUCKETS, counts)]
+
+
+    @classmethod
+    def _rank (cls, counts):
+        """Rank given statistics among all others.
+
+        @param counts: recounted statistics by representative id
+        @type counts: { int: QuestionStatistics }
+        """
+        others = cls.objects.filter(rank__isnull=False).exclude(
+            representative__in=counts.keys())
+        percentages = [s.percentage for s in counts.itervalues() if s.total > 0]
+        percentages += others.values_list('percentage', flat=True)
+        percentages.sort(reverse=True)
+
+        ranks = {}
+        for i, percentage in enumerate(percentages):
+            ranks.setdefault(percentage, i + 1)
+        for statistics in counts.itervalues():
+            statistics.rank = ranks[statistics.percentage] if statistics.total > 0 else None
+        for percentage, rank in ranks.iteritems():
+            others.filter(percentage=percentage).update(rank=rank)
+
+
+    @classmethod
+    def get_leaderboard (cls, unit=None, term=None):
+        """Get the leaderboard of representatives with public questions.
+
+        Cached until questions or representatives change, which the versions
+        in the shared cache tell every process, including the nightly
+        reconcile. The attribute place is the rank among the representatives
+        shown.
+
+        @param unit: id of the unit to show representatives of, all if None
+        @type unit: int
+        @param term: id of the term to show representatives of, all if None
+        @type term: int
+        @return: statistics with representatives, by rank
+        @rtype: [ QuestionStatistics ]
+        """
+        current = versions.get(cls, Representative)
+        # ordered by table, the same in every process
+        tokens = [current[model][0] for model in
+            sorted(current, key=lambda model: model._meta.db_table)]
+        key = 'question:leaderboard:%s:%s:%s' % (unit, term, ':'.join(tokens))
+        leaderboard = cache.get(key)
+        if leaderboard is not None:
+            return leaderboard
+
+        leaderboard = cls.objects.filter(rank__isnull=False).select_related(
+            'representative')
+        if unit:
+            leaderboard = leaderboard.filter(representative__unit=unit)
+        if term:
+            leaderboard = leaderboard.filter(representative__terms=term)
+        leaderboard = list(leaderboard)
+
+        for i, statistics in enumerate(leaderboard):
+            if i and statistics.rank == leaderboard[i - 1].rank:
+                statistics.place = leaderboard[i - 1].place
+            else:
+                statistics.place = i + 1
+        cache.set(key, leaderboard, LEADERBOARD_TIMEOUT)
+        return leaderboard
+
+
+
+class QuestionLatency (models.Model):
+    """Number of a representative's public questions answered in a number of days.
+
+    A histogram of days to answer, small enough to get percentiles from
+    without going through the questions. Kept up to date along with
+    L{QuestionStatistics}.
+    """
+    #: representative being asked
+    representative = models.ForeignKey(Representative,
+        related_name='question_latencies')
+    #: days to answer
+    days = models.IntegerField()
+    #: number of public questions answered in that many days
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ('representative', 'days')
+        unique_together = (('representative', 'days'),)
+
+
+    def __unicode__ (self):
+        return u'%s: %d in %d days' % (self.representative_id, self.count, self.days)
+
+
+    @classmethod
+    def change (cls, representative_id, added=None, removed=None):
+        """Count a question answered in added days, and one no longer in removed.
+
+        @param representative_id: id of the representative
+        @type representative_id: int
+        @param added: days to answer of a question answered
+        @type added: int
+        @param removed: days to answer of a question no longer answered
+        @type removed: int
+        """
+        latencies = cls.objects.filter(representative=representative_id)
+        if removed is not None:
+            latencies.filter(days=removed).update(count=F('count') - 1)
+        if added is not None:
+            if not latencies.filter(days=added).update(count=F('count') + 1):
+                sid = transaction.savepoint()
+                try:
+                    cls.objects.create(representative_id=representative_id,
+                        days=added, count=1)
+                    transaction.savepoint_commit(sid)
+                except IntegrityError:
+                    transaction.savepoint_rollback(sid)
+                    latencies.filter(days=added).update(count=F('count') + 1)
+
+
+    @classmethod
+    def reconcile (cls, representative_ids):
+        """Recount the histograms of given representatives.
+
+        @param representative_ids: ids of representatives
+        @type representative_ids: [ int ]
+        @return: histograms, i.e. number of questions by days, by representative
+        @rtype: { int: { int: int } }
+        """
+        answered = Question.public.order_by().filter(
+            representative__in=representative_ids, answered_at__isnull=False)
+        histograms = {}
+        for pk, asked, answered_at in answered.exclude(answer='').values_list(
+                'representative', 'date', 'answered_at'):
+            histogram = histograms.setdefault(pk, {})
+            days = get_latency(asked, answered_at)
+            histogram[days] = histogram.get(days, 0) + 1
+
+        cls.objects.filter(representative__in=representative_ids).delete()
+        bulk_create(cls, [cls(representative_id=pk, days=days, count=count)
+            for pk, histogram in sorted(histograms.items())
+            for days, count in sorted(histogram.items())])
+        return histograms
+
+
+    @classmethod
+    def get_percentiles (cls, histogram):
+        """Get the median and 90th percentile of a histogram.
+
+        @param histogram: number of questions by days to answer
+        @type histogram: { int: int }
+        @return: median and 90th percentile, None if empty
+        @rtype: (float, float)
+        """
+        values = []
+        for days, count in sorted(histogram.items()):
+            values.extend([days] * max(0, count))
+        return percentile(values, 0.5), percentile(values, 0.9)
 
 
 
@@ -354,11 +838,11 @@ def _get_send_data (question, arid):
 
 @receiver(post_save, sender=Question, dispatch_uid='apps.question.post_save.send_parliament')
 def send_parliament (sender, **kwargs):
-    """Send a question to parliament(arian).
+    """Queue a question to be sent to parliament(arian), see util.outbox.
 
-    CAREFUL: it is executed on Question.post_save and calls Question.save if
-    public and no parliament_response is set. Might be a cause for infinite
-    loops.
+    It is executed on Question.post_save if public and no parliament_response
+    is set. The parliament_response is set without saving the question, to
+    PARLIAMENT_QUEUED until L{_save_parliament_response} sets the response.
     """
     question = kwargs['instance']
     if not question.is_public or question.parliament_response:
@@ -369,29 +853,76 @@ def send_parliament (sender, **kwargs):
     except KeyError:
         arid = None
 
-    response = []
     if arid:
-        data = _get_send_data(question, arid)
-        req = urllib2.Request(URL_SEND_PARLIAMENT, data)
-        try:
-            opened = urllib2.urlopen(req)
-            response += [
-                'RESPONSE CODE: ' + str(opened.getcode()),
-                'RESPONSE CONTENT: ' + opened.read(),
-            ]
-        except urllib2.URLError, err:
-            response += [
-                'URL ERROR: ' + str(err),
-                'URL: ' + URL_SEND_PARLIAMENT,
-            ]
-        response.append('SENT DATA LENGTH: ' + str(len(data)))
-        response.append('SENT DATA: ' + data)
+        outbox.enqueue('parliament', question=question.pk,
+            data=_get_send_data(question, arid))
+        response = PARLIAMENT_QUEUED
     else:
         name = str(question.representative.name)
-        response.append('No arid @ parliament.ge for representative %s' % name)
+        response = 'No arid @ parliament.ge for representative %s' % name
+
+    question.parliament_response = response
+    Question.objects.filter(pk=question.pk).update(parliament_response=response)
+    versions.bump(Question)
+
+
+
+def _send_sms (url):
+    """Send an SMS by requesting given URL of the SMS server."""
+    return outbox.fetch(url)[1]
+
+
+
+def _post_parliament (question, data):
+    """Post a question to parliament.ge.
+
+    @param question: primary key of the question
+    @type question: int
+    @param data: urlencoded send data, see L{_get_send_data}
+    @type data: str
+    @return: response
+    @rtype: str
+    """
+    code, content = outbox.fetch(URL_SEND_PARLIAMENT, data)
+    return '\n'.join([
+        'RESPONSE CODE: ' + str(code),
+        'RESPONSE CONTENT: ' + content,
+    ])
+
+
+
+def _save_parliament_response (message):
+    """Save the response of parliament.ge, or the error if sending failed."""
+    payload = message.get_payload()
+    response = [message.response]
+    if message.state == message.FAILED:
+        response = ['URL ERROR: ' + message.response, 'URL: ' + URL_SEND_PARLIAMENT]
+    response.append('SENT DATA LENGTH: ' + str(len(payload['data'])))
+    response.append('SENT DATA: ' + payload['data'])
+    Question.objects.filter(pk=payload['question']).update(
+        parliament_response='\n'.join(response))
+    versions.bump(Question)
+
+
+
+outbox.register('sms', _send_sms, concurrency=4)
+outbox.register('parliament', _post_parliament, concurrency=1,
+    done=_save_parliament_response)
+
+
+
+@receiver(post_delete, sender=Question, dispatch_uid='apps.question.post_delete.remove_statistics')
+def remove_statistics (sender, instance, **kwargs):
+    """Remove a deleted question from its representative's statistics.
+
+    Missing statistics are not created, the representative might be deleted
+    along with the question.
+    """
+    representative_id, counts = instance._get_counts()
+    if counts[0]:
+        QuestionStatistics.change(representative_id, *[-c for c in counts[:3]],
+            removed=counts[3], unanswered_in=counts[4], create=False)
 
-    question.parliament_response = '\n'.join(response)
-    question.save()
 
 
 
@@ -94,6 +94,11 @@ QuestionList = {
         Base.disable('#question #list');
 
         var url = QuestionList.urlItems + QuestionList.nextPage + '/';
+        // continue after the last item loaded (keyset pagination)
+        var cursor = $('#question #list #items .item:last').attr('data-cursor');
+        if (QuestionList.nextPage > 1 && cursor) {
+            url += '?after=' + cursor;
+        }
         $.ajax(url, {
             success: function (data, textStatus, jqXHR) {
                 if (data) {
@@ -4,11 +4,16 @@ Tests for app question
 """
 __docformat__ = 'epytext en'
 
+import datetime
 from django.core import mail
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 
-from question.models import Question
+from question import models, views
+from question.models import Question, QuestionStatistics
+from representative.models import Representative
+from util import outbox
+from util.tests import SharedCaches, StandInServer
 from question.views import notify_question_change, Items
 
 
@@ -33,7 +38,9 @@ class QuestionTest (TestCase):
         # assert answer exists
         obj.answer = 'answer'
         obj._notify_questioner()
+        self.assertEqual(len(mail.outbox), 0)
 
+        outbox.process()
         self.assertEqual(len(mail.outbox), 1)
         msg = mail.outbox[0]
         self.assertEqual(msg.subject, u'test site, your question to აბულაშვილი ნუგზარი has been answered.')
@@ -54,6 +61,33 @@ class QuestionTest (TestCase):
         self.assertEqual(obj.representative.answered, previous)
 
 
+    def test_QuestionStatistics (self):
+        def counts ():
+            s = QuestionStatistics.get(1)
+            return s.total, s.answered, s.answered_due, s.last_asked
+
+        date = datetime.date(2012, 6, 5)
+        self.assertEqual(counts(), (6, 2, 2, date))
+
+        obj = Question.objects.get(pk=1)
+        obj.is_public = True
+        obj.answer = 'answer'
+        obj.save()
+        self.assertEqual(counts(), (7, 3, 3, date))
+
+        obj.is_public = False
+        obj.save()
+        self.assertEqual(counts(), (6, 2, 2, date))
+
+        Question.objects.get(pk=3).delete()
+        self.assertEqual(counts(), (5, 1, 1, date))
+        self.assertEqual(Representative.objects.get(pk=1).answered, 20.)
+
+        Question.public.filter(pk=6).update(answer='')
+        QuestionStatistics.reconcile()
+        self.assertEqual(counts(), (5, 0, 0, date))
+
+
     def test_List (self):
         url = reverse('question_list')
         response = self.client.get(url)
@@ -128,6 +162,59 @@ class QuestionTest (TestCase):
         self.assertEqual(len(objs), 6)
 
 
+    def test_get_items_after (self):
+        item = Items()
+        objs = item._get_items(1).object_list
+        self.assertEqual([o.pk for o in objs], [7, 6, 5, 4, 3, 2])
+        self.assertEqual([o.state['text'] for o in objs], ['unanswered-old',
+            'answered', 'unanswered-old', 'unanswered-old', 'answered',
+            'unanswered-old'])
+
+        page = item._get_items(1, item._parse_cursor('2012-06-05.5'))
+        self.assertEqual([o.pk for o in page.object_list], [4, 3, 2])
+        self.assertEqual(page.cursor, '2012-06-05.2')
+
+
+    def test_Items_cached (self):
+        url = reverse('question_items', args=[1])
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'question/items.html')
+        response = self.client.get(url)
+        self.assertTemplateNotUsed(response, 'question/items.html')
+        self.assertEqual(response.content.count('status answered'), 2)
+
+        obj = Question.objects.get(pk=7)
+        obj.answer = 'answer'
+        obj.save()
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'question/items.html')
+        self.assertEqual(response.content.count('status answered'), 3)
+
+        response = self.client.get(url, {'after': 'foo'})
+        self.assertEqual(response.status_code, 404)
+
+
+    def test_Items_cached_shared (self):
+        url = reverse('question_items', args=[1])
+        caches = SharedCaches(views)
+        try:
+            caches.use('web')
+            self.client.get(url)
+
+            # answered through the admin served by another process
+            caches.use('worker')
+            obj = Question.objects.get(pk=7)
+            obj.answer = 'answer'
+            obj.save()
+
+            caches.use('web')
+            response = self.client.get(url)
+            self.assertTemplateUsed(response, 'question/items.html')
+            self.assertEqual(response.content.count('status answered'), 3)
+        finally:
+            caches.close()
+
+
     def test_Detail (self):
         url = reverse('question_detail', args=[2])
         response = self.client.get(url)
@@ -153,10 +240,135 @@ class QuestionTest (TestCase):
     def test_notify_question_change (self):
         obj = Question.public.all()[0]
         notify_question_change(obj.pk, obj.question)
+        self.assertEqual(len(mail.outbox), 0)
 
+        outbox.process()
         self.assertEqual(len(mail.outbox), 1)
         msg = mail.outbox[0]
         self.assertEqual(msg.subject, u'[ShenMartav] \u10d0\u10ee\u10d0\u10da\u10d8 \u10e8\u10d4\u10d9\u10d8\u10d7\u10ee\u10d5\u10d0: 2')
         self.assertEqual(msg.to, [u'sebastiantransparency@gmail.com'])
         self.assertEqual(msg.body, u'blabla\n\nPlease manage at http://example.com/admin/question/question/2/')
 
+
+    def test_send_parliament (self):
+        server = StandInServer()
+        url = models.URL_SEND_PARLIAMENT
+        models.URL_SEND_PARLIAMENT = server.url
+        try:
+            obj = Question(representative_id=1, first_name='foo',
+                last_name='bar', email='foo@bar.com', question='question',
+                is_public=True)
+            obj.save()
+            self.assertEqual(Question.objects.get(pk=obj.pk).parliament_response,
+                models.PARLIAMENT_QUEUED)
+
+            outbox.process(['parliament'])
+        finally:
+            models.URL_SEND_PARLIAMENT = url
+            server.close()
+
+        self.assertEqual(len(server.requests), 1)
+        method, path, data = server.requests[0]
+        self.assertEqual(method, 'POST')
+        self.assertTrue('arid=3' in data)
+        response = Question.objects.get(pk=obj.pk).parliament_response
+        self.assertTrue(response.startswith('RESPONSE CODE: 200\nRESPONSE CONTENT: ok'))
+
+
+
+class LeaderboardTest (TestCase):
+    fixtures = ['representative_testdata']
+
+    def _ask (self, representative, answer=''):
+        obj = Question(representative_id=representative, first_name='foo',
+            last_name='bar', question='question', answer=answer,
+            date=datetime.date(2012, 6, 5), is_public=True,
+            parliament_response='test')
+        obj.save()
+        return obj
+
+
+    def _ranks (self):
+        return [(s.representative_id, s.rank, s.percentage)
+            for s in QuestionStatistics.get_leaderboard()]
+
+
+    def test_get_leaderboard (self):
+        QuestionStatistics.reconcile()
+        self.assertEqual(self._ranks(), [(1, 1, 50.)])
+
+        obj = self._ask(3, 'answer')
+        self._ask(4)
+        self._ask(5)
+        self.assertEqual(self._ranks(), [(3, 1, 100.), (1, 2, 50.), (4, 3, 0.), (5, 3, 0.)])
+
+        leaderboard = QuestionStatistics.get_leaderboard(term=1)
+        self.assertEqual([s.place for s in leaderboard], [1, 2, 3, 3])
+        self.assertEqual(QuestionStatistics.get_leaderboard(unit=2), [])
+
+        obj.delete()
+        ranks = self._ranks()
+        self.assertEqual(ranks, [(1, 1, 50.), (4, 2, 0.), (5, 2, 0.)])
+        QuestionStatistics.reconcile()
+        self.assertEqual(self._ranks(), ranks)
+
+
+    def test_get_leaderboard_reconciled (self):
+        caches = SharedCaches(models)
+        try:
+            caches.use('web')
+            QuestionStatistics.reconcile()
+            self.assertEqual(self._ranks(), [(1, 1, 50.)])
+
+            # the nightly reconcile runs in another process
+            caches.use('worker')
+            Question.objects.filter(pk=2).update(answer='answer')
+            QuestionStatistics.reconcile()
+
+            caches.use('web')
+            self.assertEqual(self._ranks(), [(1, 1, 100.)])
+        finally:
+            caches.close()
+
+
+    def test_latency (self):
+        QuestionStatistics.reconcile()
+        self.assertFalse(QuestionStatistics.get(1).has_latency)
+
+        obj = Question.objects.get(pk=2)
+        obj.answer = 'answer'
+        obj.save()
+        self.assertTrue(obj.answered_at)
+        days = (datetime.date.today() - obj.date).days
+        statistics = QuestionStatistics.get(1)
+        self.assertEqual((statistics.latency_median, statistics.latency_p90), (days, days))
+
+        today = Question(representative_id=1, first_name='foo', last_name='bar',
+            question='question', answer='answer', is_public=True,
+            parliament_response='test')
+        today.save()
+        statistics = QuestionStatistics.get(1)
+        self.assertEqual((statistics.latency_median, statistics.latency_p90),
+            (days * 0.5, days * 0.9))
+
+        obj.answer = ''
+        obj.save()
+        self.assertEqual(obj.answered_at, None)
+        statistics = QuestionStatistics.get(1)
+        self.assertEqual((statistics.latency_median, statistics.latency_p90), (0, 0))
+        self.assertEqual([c for label, c, p in statistics.get_latency_distribution()],
+            [1, 0, 0, 0, 0])
+
+        QuestionStatistics.reconcile()
+        statistics = QuestionStatistics.get(1)
+        self.assertEqual((statistics.latency_median, statistics.latency_p90), (0, 0))
+
+
+    def test_Leaderboard (self):
+        QuestionStatistics.reconcile()
+        url = reverse('question_leaderboard')
+        response = self.client.get(url, {'unit': 1})
+        self.assertEqual(len(response.context['object_list']), 1)
+        response = self.client.get(url, {'term': 'foo'})
+        self.assertEqual(response.status_code, 404)
+
@@ -6,16 +6,17 @@ Depends on representative.
 """
 __docformat__ = 'epytext en'
 
-import datetime, socket
+import datetime, hashlib
 
 from django.contrib.sites.models import Site
-from django.core.mail import mail_managers
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
-from django.db import IntegrityError
+from django.db import IntegrityError, connection
+from django.db.models import Q
 from django.http import Http404, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import redirect
-from django.utils.translation import ugettext as _
+from django.utils.translation import get_language, ugettext as _
 from django.views.generic import DetailView, ListView, FormView, TemplateView
 try:
     from menus.utils import set_language_changer
@@ -27,14 +28,43 @@ try:
 except ImportError:
     QUESTION_SMS_EMAIL = 'root@localhost'
 
-from representative.models import Representative
+from representative.models import Representative, Term, Unit
+from util import outbox, versions
 
-from .models import Question
+from .models import Question, QuestionStatistics
 from .forms import QuestionForm
 
 
 #: pagination value
 PAGINATE_BY = 30
+#: seconds rendered pages of question items are cached
+ITEMS_TIMEOUT = 60 * 60
+#: values of question item states
+ANSWERED, UNANSWERED_NEW, UNANSWERED_OLD = 2, 1, 0
+#: question item states by value
+ITEM_STATES = {
+    ANSWERED: { 'text': 'answered', 'value': ANSWERED },
+    UNANSWERED_NEW: { 'text': 'unanswered-new', 'value': UNANSWERED_NEW },
+    UNANSWERED_OLD: { 'text': 'unanswered-old', 'value': UNANSWERED_OLD },
+}
+
+
+
+class ItemsPage (object):
+    """A page of question items."""
+    def __init__ (self, object_list):
+        self.object_list = object_list
+
+
+    @property
+    def cursor (self):
+        """Date and pk of the last item, to get the next page after it."""
+        if not self.object_list:
+            return None
+        last = self.object_list[-1]
+        return '%s.%d' % (last.date.strftime('%Y-%m-%d'), last.pk)
+
+
 
 def _get_form (view, representative=None):
     """Get question form for given representative.
@@ -60,7 +90,7 @@ def _get_form (view, representative=None):
 
 
 def notify_question_change (pk, question):
-    """Notify site managers of a new/changed question.
+    """Queue a notification of site managers of a new/changed question.
 
     @param pk: primary key of the question
     @type pk: int
@@ -79,10 +109,7 @@ def notify_question_change (pk, question):
         'uri': uri}
     )
 
-    try:
-        mail_managers(subject, message)
-    except socket.error: # silently ignore if mail system not setup, e.g. localhost
-        pass
+    outbox.enqueue('managers', subject=subject, message=message)
 
 
 class List (ListView):
@@ -115,9 +142,6 @@ class Ask (FormView):
  
     def form_valid (self, form):
         obj = form.save()
- 
-        # at some stage it might be wise to have these added to a queueing
-        # system (celery? rabbitmq?)
         notify_question_change(obj.pk, obj.question)
  
         self.request.session['form_question'] = {
@@ -187,25 +211,48 @@ class Detail (DetailView):
         context['url_feed'] = reverse('question_feed_list')
         set_language_changer(self.request, context['obj'].get_absolute_url)
 
-        question = context['obj']
-        context["total_questions"] = Question.objects.filter(representative=question.representative_id, is_public='t').count()
-        context["answered_questions"] = Question.objects.filter(representative=question.representative_id, is_public='t').exclude(answer__isnull=True).exclude(answer__exact='').count()
+        statistics = QuestionStatistics.get(context['obj'].representative_id)
+        context["total_questions"] = statistics.total
+        context["answered_questions"] = statistics.answered
 
         return context
 
 
 
 class Leaderboard (ListView):
-    """Shows a leaderboard of representatives by questions answered."""
-    model = Representative
-    queryset = Representative.objects.filter(questions__is_public=True,
-        questions__isnull=False).distinct().order_by('-answered')
+    """Shows a leaderboard of representatives by questions answered.
+
+    The parameters unit and term limit it to the representatives of a unit
+    or a term.
+    """
     template_name = 'question/leaderboard.html'
 
 
+    def _get_filter (self, name, model):
+        """Get the object of given model selected by given parameter."""
+        pk = self.request.GET.get(name)
+        if not pk:
+            return None
+        try:
+            return model.objects.get(pk=int(pk))
+        except (ValueError, model.DoesNotExist):
+            raise Http404
+
+
+    def get_queryset (self):
+        self.unit = self._get_filter('unit', Unit)
+        self.term = self._get_filter('term', Term)
+        return QuestionStatistics.get_leaderboard(
+            unit=self.unit and self.unit.pk, term=self.term and self.term.pk)
+
+
     def get_context_data (self, **kwargs):
         context = super(Leaderboard, self).get_context_data(**kwargs)
         context['url_feed'] = reverse('question_feed_list')
+        context['unit'] = self.unit
+        context['term'] = self.term
+        context['units'] = Unit.objects.all()
+        context['terms'] = Term.objects.all()
         return context
 
 
@@ -219,61 +266,99 @@ class Info (DetailView):
 
     def get_context_data (self, **kwargs):
         context = super(Info, self).get_context_data(**kwargs)
-        question = context['obj']
-        context["total_questions"] = Question.objects.filter(representative=question.representative_id, is_public='t').count()
-        context["answered_questions"] = Question.objects.filter(representative=question.representative_id, is_public='t').exclude(answer__isnull=True).exclude(answer__exact='').count()
+        statistics = QuestionStatistics.get(context['obj'].representative_id)
+        context["total_questions"] = statistics.total
+        context["answered_questions"] = statistics.answered
         return context
 
 
 
 class Items (TemplateView):
-    """Implements a view with paged question items."""
+    """Implements a view with paged question items.
+
+    Pages follow each other by the date and pk of their last item, given as
+    parameter after, e.g. ?after=2012-06-05.7 (keyset pagination). Rendered
+    pages are cached until a question or representative changes.
+    """
     template_name = 'question/items.html'
 
 
-    def _add_item_states (self, page):
-        """Set item states in given page.
+    def _parse_cursor (self, after):
+        """Parse the date and pk of the item a page comes after.
 
-        @param page: page number to retrieve
-        @type page: int
-        @return: a page with questions
-        @rtype: Paginator.page
+        @param after: date and pk, e.g. 2012-06-05.7
+        @type after: str
+        @return: date and pk, None if not given
+        @rtype: (datetime.date, int)
         """
-        if not page:
+        if not after:
             return None
+        try:
+            date, pk = after.split('.')
+            return datetime.datetime.strptime(date, '%Y-%m-%d').date(), int(pk)
+        except ValueError:
+            raise Http404
 
-        two_weeks_ago = datetime.date.today() - datetime.timedelta(14)
-        answered = { 'text': 'answered', 'value': 2 }
-        unanswered_new = { 'text': 'unanswered-new', 'value': 1 }
-        unanswered_old = { 'text': 'unanswered-old', 'value': 0 }
-
-        for item in page.object_list:
-            if item.answer:
-                item.state = answered
-            else:
-                if item.date >= two_weeks_ago:
-                    item.state = unanswered_new
-                else:
-                    item.state = unanswered_old
-
-        return page
 
+    def _get_items (self, page, after=None):
+        """Get a page of public questions with their item states.
 
-    def _get_items (self, page):
-        """Get given queryset as page.
+        The state is computed by the database: answered, unanswered-new or
+        unanswered-old, i.e. asked before the cutoff.
 
-        @param page: page number to retrieve
+        @param page: page number to retrieve, if not given after
         @type page: int
+        @param after: date and pk of the last item of the previous page
+        @type after: (datetime.date, int)
         @return: a page with questions
-        @rtype: Paginator.page
+        @rtype: ItemsPage
         """
-        queryset = Question.public.order_by('-date')
-        return self._add_item_states(queryset)
+        table = connection.ops.quote_name(Question._meta.db_table)
+        queryset = Question.public.select_related('representative').extra(
+            select={'state_value': """CASE
+                WHEN %(table)s.answer <> '' THEN %(answered)d
+                WHEN %(table)s.date >= %%s THEN %(new)d
+                ELSE %(old)d END""" % {'table': table, 'answered': ANSWERED,
+                'new': UNANSWERED_NEW, 'old': UNANSWERED_OLD}},
+            select_params=(QuestionStatistics.get_cutoff(),),
+        ).order_by('-date', '-pk')
+
+        if after:
+            date, pk = after
+            queryset = queryset.filter(Q(date__lt=date) | Q(date=date, pk__lt=pk))
+        else:
+            start = (max(1, int(page or 1)) - 1) * PAGINATE_BY
+            queryset = queryset[start:]
+
+        items = list(queryset[:PAGINATE_BY])
+        for item in items:
+            item.state = ITEM_STATES[item.state_value]
+        return ItemsPage(items)
+
+
+    def get (self, request, *args, **kwargs):
+        after = request.GET.get('after')
+        self.after = self._parse_cursor(after)
+        # versions are shared by all processes, ordered by table to match
+        current = versions.get(Question, Representative)
+        tokens = [current[model][0] for model in
+            sorted(current, key=lambda model: model._meta.db_table)]
+        key = 'question:items:' + hashlib.sha1(repr((tokens,
+            datetime.date.today(), get_language(), kwargs.get('page'), after))).hexdigest()
+        content = cache.get(key)
+        if content is not None:
+            return HttpResponse(content)
+
+        response = super(Items, self).get(request, *args, **kwargs)
+        response.render()
+        cache.set(key, response.content, ITEMS_TIMEOUT)
+        return response
 
 
     def get_context_data (self, **kwargs):
         context = super(Items, self).get_context_data(**kwargs)
-        context['items'] = self._get_items(context['params']['page'])
+        context['items'] = self._get_items(context['params']['page'],
+            getattr(self, 'after', None))
 
         return context
 
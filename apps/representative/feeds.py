@@ -51,7 +51,7 @@ class FeedDetail (Feed):
 
         try:
             income_declaration = protocol + self._site.domain +\
-                obj.incomedeclaration.all()[0].get_absolute_url()
+                obj.incomedeclaration.order_by('-date', '-pk')[0].get_absolute_url()
         except KeyError:
             income_declaration = None
 
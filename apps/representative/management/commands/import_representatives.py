@@ -2,7 +2,8 @@
 """
 Command import_people as provided by CIPPD
 
-Depends on popit.
+Depends on popit. Representatives and their names are written in bulk, see
+popit.bulk, in one transaction per batch of rows.
 """
 __docformat__ = 'epytext en'
 
@@ -15,11 +16,16 @@ from django.db import transaction
 from optparse import make_option
 
 import glt
+from popit.bulk import upsert_people
 from popit.models import *
+from util import versions
+from util.db import batches, bulk_create
 
 
 #: CSV delimiter
 DELIMITER = '|'
+#: number of rows imported per transaction
+BATCH_SIZE = 100
 
 
 class Command (BaseCommand):
@@ -102,15 +108,20 @@ class Command (BaseCommand):
             return None
 
 
-    def _add_representative_data (self, row, representative):
-        """Add data to a representative record.
+    def _get_representative (self, row):
+        """Get an unsaved representative with its names from a row.
 
         @param row: data row
         @type row: [ str ]
-        @param representative: a representative
-        @type representative: representative.Representative
+        @return: a representative and its names
+        @rtype: (representative.Representative, [ popit.PersonName ])
         """
-        from representative.models import AdditionalInformation, Url
+        from representative.models import Representative
+        name = glt.firstname_first(row[1])
+        representative = Representative(
+            date_of_birth=self._get_isodate(row[9].decode('utf-8')),
+            description=row[8].decode('utf-8').strip(),
+            unit=self.unit)
         representative.is_majoritarian = (self._get_data(row, 2) == u'მაჟორიტარი')
         representative.electoral_district = self._get_data(row, 4)
         representative.elected = self._get_data(row, 5)
@@ -123,61 +134,71 @@ class Command (BaseCommand):
             self._get_data(row, 14), self._get_data(row, 15)])
         representative.contact_address_phone = self._get_data(row, 16)
 
+        pname = PersonName(name_ka=name, name_en=glt.to_latin(name), main=True)
+        return representative, [pname]
+
+
+    def _get_related_data (self, row, representative):
+        """Get the unsaved urls and additional information of a representative.
+
+        @param row: data row
+        @type row: [ str ]
+        @param representative: a representative
+        @type representative: representative.Representative
+        @return: urls and additional information
+        @rtype: [ representative.Url or representative.AdditionalInformation ]
+        """
+        from representative.models import AdditionalInformation, Url
+        related = []
         url = self._get_data(row, 17)
         if url:
-            url = Url(representative=representative, label=url, url=url)
-            url.save()
+            related.append(Url(representative=representative, label=url, url=url))
 
         for i in xrange(40, 50):
             data = self._get_data(row, i)
             if data:
-                info = AdditionalInformation(
-                    representative=representative, value=data)
-                info.save()
-
-        representative.save()
+                related.append(AdditionalInformation(
+                    representative=representative, value=data))
+        return related
 
 
     @transaction.commit_on_success
-    def _create_representative (self, row):
-        from representative.models import Representative
-        """Create a complete Representative record.
+    def _import (self, rows):
+        """Import representatives of given rows, with their data.
 
-        @param row: data row
-        @type row: [ str ]
-        @return: a representative
-        @rtype: representative.Representative
+        @param rows: data rows
+        @type rows: [ [ str ] ]
         """
-        name = glt.firstname_first(row[1])
-        self.stdout.write('%s | Representative: %s ... ' % (row[0], name))
-
-        dob = self._get_isodate(row[9].decode('utf-8'))
-        representative = Representative(
-            date_of_birth=dob,
-            description=row[8].decode('utf-8').strip(),
-            unit=self.unit)
-        representative.save()
-
-        pname = PersonName(person=representative, name_ka=name, 
-                           name_en=glt.to_latin(name), main=True)
-        pname.save()
-
-        people = Representative.objects.filter(slug=representative.slug)
-        if len(people) > 1:
-            if self.force:
-                people.exclude(pk=representative.pk).delete()
+        from representative.models import AdditionalInformation, Url
+        people = upsert_people([self._get_representative(row) for row in rows],
+            replace=self.force, batch_size=len(rows))
+
+        replaced = []
+        related = []
+        for row, representative in zip(rows, people):
+            self.stdout.write('%s | Representative: %s ... ' % (
+                row[0], glt.firstname_first(row[1])))
+            if representative.created:
+                self.stdout.write('add new!\n')
+            elif self.force:
                 self.stdout.write('replace existing!\n')
-                self._add_representative_data(row, representative)
-                return representative
+                replaced.append(representative.pk)
             else:
                 self.stdout.write('keep already existing!\n')
-                slug = representative.slug
-                representative.delete()
-                return Representative.objects.get(slug=slug)
-        else:
-            self.stdout.write('add new!\n')
-            self._add_representative_data(row, representative)
-            return representative
+                continue
+            related.extend(self._get_related_data(row, representative))
+
+        if replaced:
+            Url.objects.filter(representative__in=replaced).delete()
+            AdditionalInformation.objects.filter(representative__in=replaced).delete()
+        bulk_create(Url, [obj for obj in related if isinstance(obj, Url)])
+        bulk_create(AdditionalInformation,
+            [obj for obj in related if isinstance(obj, AdditionalInformation)])
+
+        for row, representative in zip(rows, people):
+            self._create_party(representative, row)
+            self._create_positions(representative, row)
+            self.stdout.write('\n')
 
 
     @transaction.commit_on_success
@@ -191,7 +212,7 @@ class Command (BaseCommand):
         @return: an organisation
         @rtype: popit.Organisation
         """
-        from representative.models import Party
+        from representative.models import Party, Representative
         name = row[3].decode('utf-8').strip()
         self.stdout.write(' Party %s ... ' % (name))
 
@@ -210,7 +231,7 @@ class Command (BaseCommand):
         party.unit.add(self.unit)
 
         representative.party = party
-        representative.save()
+        Representative.objects.filter(pk=representative.pk).update(party=party)
 
         return party
 
@@ -296,7 +317,7 @@ class Command (BaseCommand):
 
     def handle (self, *args, **options):
         """Command handler."""
-        from representative.models import Unit
+        from representative.models import AdditionalInformation, Representative, Unit, Url
         self.stdout = codecs.getwriter(locale.getpreferredencoding())(sys.stdout)
         if options.get('force'):
             self.force = True
@@ -314,16 +335,26 @@ class Command (BaseCommand):
             self.unit = Unit.objects.get(short=args[1])
             self.stdout.write('Using unit "%s"\n' % self.unit)
 
-        rows = csv.reader(open(args[0], 'rb'), delimiter=DELIMITER)
+        for rows in batches(self._read(args[0]), BATCH_SIZE):
+            self._import(rows)
+
+        # bulk writes don't send signals
+        versions.bump(Representative, AdditionalInformation, Url)
+
+
+    def _read (self, filename):
+        """Read valid data rows from given file.
+
+        @param filename: name of the CSV file
+        @type filename: str
+        @return: generator of data rows
+        @rtype: generator
+        """
+        rows = csv.reader(open(filename, 'rb'), delimiter=DELIMITER)
         for row in rows:
             if not row or not row[0]: continue # headers
 
             if len(row) < 35:
                 self.stdout.write('Invalid representative record.\n')
                 continue
-
-            representative = self._create_representative(row)
-            if not representative: continue
-            party = self._create_party(representative, row)
-            positions = self._create_positions(representative, row)
-            self.stdout.write('\n')
+            yield row
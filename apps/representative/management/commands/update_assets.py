@@ -3,12 +3,29 @@
 Command update_assets to update parliamentarians' assets as defined in income
 declarations. It updates the fields for salary, expenses, property & assets.
 
+Declarations are linked to representatives through
+IncomeDeclaration.representative, the values of the latest ones are then
+computed with a few grouped queries and only representatives whose values
+changed are written.
+
+Income is summed up from the amounts in GEL set by import_incomedeclarations
+or update_amounts.
+
 Depends on representative and incomedeclaration
 """
 __docformat__ = 'epytext en'
 
 from django.core.management.base import BaseCommand
 from django.db import transaction
+from django.db.models import Sum
+
+from util import versions
+from util.db import batches
+
+
+#: fields of representative updated from declarations
+FIELDS = ('salary', 'other_income', 'expenses', 'property_assets')
+
 
 
 class Command (BaseCommand):
@@ -17,175 +34,276 @@ class Command (BaseCommand):
     help = 'Updates parliamentarians\' assets.'
 
 
-    def _find_declaration (self, name):
+    def _get_names (self):
+        """Get the main name of every representative.
+
+        @return: main name, English and Georgian, by representative
+        @rtype: { int: (unicode, unicode) }
+        """
+        from popit.models import PersonName
+        from representative.models import Representative
+        names = {}
+        values = PersonName.objects.filter(
+            person__in=Representative.objects.values('pk')).values_list(
+            'person_id', 'name_en', 'name_ka')
+        # ordered by PersonName.Meta, so the first one is the main name
+        for pk, name_en, name_ka in values:
+            if pk not in names:
+                names[pk] = (name_en or u'', name_ka or u'')
+        return names
+
+
+    def _find_declaration (self, name, decls):
         """Finds the latest income declaration for given name.
 
         @param name: name of the declaration's submitter
-        @type name: str
-        @return: name's latest income declaration
-        @rtype: incomedeclaration.IncomeDeclaration
+        @type name: unicode
+        @param decls: all declarations as (pk, name in lower case, date), latest first
+        @type decls: [ (int, unicode, datetime.date) ]
+        @return: primary key of name's latest income declaration
+        @rtype: int
         """
         from representative.models import NAME_MINLEN
-        from incomedeclaration.models import IncomeDeclaration
-        first, last = name.split(u' ', 1)
-        decls = IncomeDeclaration.objects.filter(name__icontains=last)
+        try:
+            first, last = name.lower().split(u' ', 1)
+        except ValueError:
+            return None
+
+        decls = [d for d in decls if last in d[1]]
         if not decls:
             return None
 
         if len(decls) == 1:
-            return decls[0]
+            return decls[0][0]
 
-        decls = decls.filter(name__icontains=first).order_by('-date')
-        if decls:
-            return decls[0]
+        found = [d for d in decls if first in d[1]]
+        if found:
+            return found[0][0]
 
         # people might have slightly different first names in declaration /
         # person sets, so we only look for the first CHARS_FIRSTNAME
         first = first[0:NAME_MINLEN]
-        decls = decls.filter(name__icontains=first).order_by('-date')
-        if decls:
-            return decls[0]
+        found = [d for d in decls if first in d[1]]
+        if found:
+            return found[0][0]
 
         return None
 
 
-    def _get_salary (self, decl, name):
-        """Get salary (wages) from given declaration.
+    def _link (self, names):
+        """Link representatives to their declarations.
 
-        @param decl: declaration
-        @type decl: incomedeclaration.IncomeDeclaration
-        @param name: name of the representative
-        @type name: popit.PersonName
-        @return: salary from income declaration
-        @rtype: int
+        The latest declaration is matched by name, earlier ones submitted
+        under the same name are linked, too. Representatives without a match
+        keep declarations linked before, e.g. manually.
+
+        @param names: main name by representative
+        @type names: { int: (unicode, unicode) }
+        @return: latest declaration by representative, number of changed
+            links, representatives whose links changed
+        @rtype: ({ int: int }, int, set)
         """
-        wages = []
-        for w in decl.wages.all():
-            # wages might include other people, e.g. family
-            if not (w.name == name.name_en or w.name == name.name_ka):
+        from incomedeclaration.models import IncomeDeclaration
+        values = IncomeDeclaration.objects.order_by('-date', '-pk').values_list(
+            'pk', 'name', 'date', 'representative')
+        decls = []
+        lowered = {}
+        by_name = {}
+        linked = {}
+        for pk, name, date, representative in values:
+            lowered[pk] = name.lower()
+            decls.append((pk, lowered[pk], date))
+            by_name.setdefault(lowered[pk], []).append(pk)
+            if representative is not None:
+                linked.setdefault(representative, []).append(pk)
+
+        found = {}
+        owners = {}
+        for representative, (name_en, name_ka) in names.iteritems():
+            # look for georgian name first, then english
+            decl = self._find_declaration(name_ka, decls) or\
+                self._find_declaration(name_en, decls)
+            if decl is None:
                 continue
-
-            income = w.income_rec.split()
-            try:
-                if income[1] != 'GEL':
-                    fmt = u'Ignoring Non-GEL value for income in wages: %s.\n'
-                    self.stderr.write(fmt % w.income_rec)
-                else:
-                    wages.append(float(income[0]))
-            except IndexError:
-                pass
-
-        return int(sum(wages));
-
-
-    def _get_other_income (self, decl):
-        """Get other income (entrepreneurials) from given declaration.
-
-        @param decl: declaration
-        @type decl: incomedeclaration.IncomeDeclaration
-        @return: other income from income declaration
-        @rtype: int
+            if decl in owners:
+                fmt = u'Ignoring same declaration for different people %s <> %s.\n'
+                self.stderr.write((fmt % (names[owners[decl]][0],
+                    name_en)).encode('utf-8'))
+                continue
+            found[representative] = [pk for pk in by_name[lowered[decl]]
+                if owners.setdefault(pk, representative) == representative]
+
+        changed = 0
+        relinked = set()
+        current = {}
+        for representative in names:
+            # declarations matched to someone else are relinked below
+            previous = [pk for pk in linked.get(representative, [])
+                if owners.get(pk, representative) == representative]
+            # latest one first, as values are ordered by date
+            wanted = found.get(representative, previous)
+            if wanted:
+                current[representative] = wanted[0]
+
+            stale = [pk for pk in previous if pk not in wanted]
+            if stale:
+                IncomeDeclaration.objects.filter(pk__in=stale).update(
+                    representative=None)
+            added = [pk for pk in wanted if pk not in previous]
+            if added:
+                IncomeDeclaration.objects.filter(pk__in=added).update(
+                    representative=representative)
+            if stale or added:
+                changed += len(stale) + len(added)
+                relinked.add(representative)
+        # representatives who lost declarations to someone else
+        for representative, pks in linked.iteritems():
+            if [pk for pk in pks if owners.get(pk, representative) != representative]:
+                relinked.add(representative)
+        return current, changed, relinked
+
+
+    def _get_salaries (self, current, names):
+        """Get salaries (wages) from given declarations.
+
+        @param current: declaration by representative
+        @type current: { int: int }
+        @param names: main name by representative
+        @type names: { int: (unicode, unicode) }
+        @return: salary by declaration, in GEL
+        @rtype: { int: int }
         """
-        other = []
-        for e in decl.entrepreneurials.all():
-            income = e.income_rec.split()
-            try:
-                if income[1] != 'GEL':
-                    fmt = u'Ignoring Non-GEL value for income in entrepreneurials: %s.\n'
-                    self.stderr.write(fmt % e.income_rec)
-                else:
-                    other.append(float(income[0]))
-            except IndexError:
-                pass
-        return int(sum(other))
-
-
-    def _get_expenses (self, decl):
-        """Get expenses value from given declaration.
-
-        @param decl: declaration
-        @type decl: incomedeclaration.IncomeDeclaration
-        @return: expenses from income declaration
-        @rtype: str
+        from incomedeclaration.models import DeclarationWage
+        # wages might include other people, e.g. family
+        wanted = {}
+        for representative, decl in current.iteritems():
+            wanted[decl] = set(n for n in names[representative] if n)
+
+        salaries = dict((decl, 0) for decl in wanted)
+        for pks in batches(sorted(wanted)):
+            values = DeclarationWage.objects.filter(declaration__in=pks).values(
+                'declaration', 'name_en', 'name_ka').annotate(
+                total=Sum('income_gel')).order_by()
+            for v in values:
+                if wanted[v['declaration']] & set([v['name_en'], v['name_ka']]):
+                    salaries[v['declaration']] += v['total'] or 0
+        return dict((decl, int(total)) for decl, total in salaries.iteritems())
+
+
+    def _get_other_incomes (self, decls):
+        """Get other income (entrepreneurials) from given declarations.
+
+        @param decls: primary keys of declarations
+        @type decls: [ int ]
+        @return: other income by declaration, in GEL
+        @rtype: { int: int }
         """
-        expenses = [e.amount for e in decl.otherinclexpenses.all()]
-        return '; '.join(expenses)
-
-
-    def _get_property (self, decl):
-        """Get property & assets value from given declaration.
-
-        @param decl: declaration
-        @type decl: incomedeclaration.IncomeDeclaration
-        @return: property & assets from income declaration
-        @rtype: str
+        from incomedeclaration.models import DeclarationEntrepreneurial
+        incomes = dict((decl, 0) for decl in decls)
+        for pks in batches(decls):
+            values = DeclarationEntrepreneurial.objects.filter(
+                declaration__in=pks).values('declaration').annotate(
+                total=Sum('income_gel')).order_by()
+            for v in values:
+                incomes[v['declaration']] = int(v['total'] or 0)
+        return incomes
+
+
+    def _join (self, decls, *querysets):
+        """Join the values of given related querysets by declaration.
+
+        @param decls: primary keys of declarations
+        @type decls: [ int ]
+        @param querysets: pairs of queryset and field, joined in given order
+        @type querysets: [ (QuerySet, str) ]
+        @return: joined values by declaration
+        @rtype: { int: unicode }
         """
-        properties = [p.description for p in decl.properties.all()]
-        properties += [r.prop_type for r in decl.realestates.all()]
-        return '; '.join(properties)
-
-
-    @transaction.commit_on_success
-    def _update (self, representative, decl):
-        """Update person's assets with given declaration.
-
-        @param representative: a representative
-        @type representative: representative.Representative
-        @param decl: representative\'s income declaration
-        @type decl: incomedeclaration.IncomeDeclaration
-        @return: output message
-        @rtype: [str]
+        parts = dict((decl, []) for decl in decls)
+        for queryset, field in querysets:
+            for pks in batches(decls):
+                values = queryset.filter(declaration__in=pks).order_by(
+                    'declaration', 'pk').values_list('declaration', field)
+                for decl, value in values:
+                    parts[decl].append(value)
+        return dict((decl, u'; '.join(p)) for decl, p in parts.iteritems())
+
+
+    def _get_values (self, current, names):
+        """Get new values of representatives from their declarations.
+
+        @param current: declaration by representative
+        @type current: { int: int }
+        @param names: main name by representative
+        @type names: { int: (unicode, unicode) }
+        @return: values of L{FIELDS} by representative
+        @rtype: { int: dict }
         """
-        msg = []
-        name = representative.names.all()[0]
-        representative.salary = self._get_salary(decl, name)
-        if representative.salary:
-            msg.append(u'i: %d' % representative.salary)
-
-        representative.other_income = self._get_other_income(decl)
-        if representative.other_income:
-            msg.append(u' o: %d' % representative.other_income)
-
-        representative.expenses = self._get_expenses(decl)
-        if representative.expenses:
-            msg.append(u' e: %s' % representative.expenses)
-
-        representative.property_assets = self._get_property(decl)
-        if representative.property_assets:
-            msg.append(' p: %s' % representative.property_assets)
-
-        representative.save()
-        return msg
+        from incomedeclaration.models import DeclarationOtherInclExpense,\
+            DeclarationProperty, DeclarationRealEstate
+        decls = sorted(current.values())
+        salaries = self._get_salaries(current, names)
+        others = self._get_other_incomes(decls)
+        expenses = self._join(decls,
+            (DeclarationOtherInclExpense.objects.all(), 'amount'))
+        properties = self._join(decls,
+            (DeclarationProperty.objects.all(), 'description'),
+            (DeclarationRealEstate.objects.all(), 'prop_type'))
+
+        values = {}
+        for representative, decl in current.iteritems():
+            values[representative] = {
+                'salary': salaries[decl],
+                'other_income': others[decl],
+                'expenses': expenses[decl],
+                'property_assets': properties[decl],
+            }
+        return values
+
+
+    def _update (self, values):
+        """Update representatives whose values changed.
+
+        Uses update() to skip Representative.save, which rebuilds the slug.
+
+        @param values: new values of L{FIELDS} by representative
+        @type values: { int: dict }
+        @return: changed fields by representative
+        @rtype: { int: [ str ] }
+        """
+        from representative.models import Representative
+        changed = {}
+        old = Representative.objects.filter(pk__in=values.keys()).values(
+            'pk', *FIELDS)
+        for current in old:
+            pk = current['pk']
+            new = values[pk]
+            # null incomes count as 0, like the field defaults
+            fields = [f for f in FIELDS if
+                (current[f] or new[f].__class__()) != new[f]]
+            if fields:
+                Representative.objects.filter(pk=pk).update(
+                    **dict((f, new[f]) for f in fields))
+                changed[pk] = fields
+        return changed
 
 
     @transaction.commit_on_success
     def handle (self, *args, **options):
         """Command handler."""
-        from representative.models import Representative
-        decl_ids = {}
-        for representative in Representative.objects.all():
-            self.stdout.write(u'%s: ' % representative.name)
-
-            name = representative.names.all()[0]
-            # look for georgian name first
-            decl = self._find_declaration(name.name_ka)
-            if not decl: # then check english
-                decl = self._find_declaration(representative.name.name_en)
-            if not decl:
-                self.stdout.write('\n')
-                continue
-
-            if decl.decl_id in decl_ids.keys():
-                fmt = u'Ignoring same declaration for different people %s <> %s.\n'
-                self.stderr.write(fmt % (decl_ids[decl.decl_id], representative.name))
-                continue
-            else:
-                decl_ids[decl.decl_id] = representative.name
-                self.stdout.write(u'%s ' % decl.decl_id)
-
-            decl.representative = representative
-            decl.save()
-            msg = self._update(representative, decl)
-            # tired of Python's unicode awkwardness, worse in 2.6 than 2.7
-            print ''.join(msg)
-            #self.stdout.write(''.join(msg) + '\n')
+        from incomedeclaration.models import RepresentativeWealth
+        names = self._get_names()
+        current, links, relinked = self._link(names)
+        RepresentativeWealth.update(relinked)
+        values = self._get_values(current, names)
+        changed = self._update(values)
+        # links and values were updated in bulk
+        versions.bump_app('incomedeclaration', 'representative')
+
+        for pk in sorted(changed, key=lambda pk: names[pk]):
+            self.stdout.write((u'%s: %s\n' % (names[pk][0] or names[pk][1],
+                u', '.join(changed[pk]))).encode('utf-8'))
+        self.stdout.write(('%d representatives, %d with declaration, ' +
+            '%d links changed, %d updated, %d unchanged.\n') % (
+            len(names), len(current), links, len(changed),
+            len(current) - len(changed)))
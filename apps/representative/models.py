@@ -543,6 +543,101 @@ class Representative(Person):
         super(Representative, self).save(*args, **kwargs)
 
 
+class NameMatcher(object):
+    """
+    Find representatives by name in memory.
+
+    Applies the same rules as Representative.find, but loads the names of all
+    representatives with one query up front and remembers every result. Meant
+    for commands resolving many names in one go.
+    """
+
+    def __init__(self, representatives=None):
+        """
+        @param representatives: queryset of representatives to match, using all() if None
+        @type representatives: QuerySet
+        """
+        if representatives is None:
+            representatives = Representative.objects.all()
+
+        #: [(pk, name, name_en, name_ka)] in the order of Representative.find
+        self.names = []
+        values = representatives.order_by('slug').values_list(
+            'pk', 'names__name', 'names__name_en', 'names__name_ka')
+        for pk, name, name_en, name_ka in values:
+            self.names.append((pk, name or u'', name_en or u'', name_ka or u''))
+        #: results of find by name
+        self.found = {}
+
+    def _match_parts(self, first, last, contained):
+        """
+        Get representative whose name starts and ends with the given parts or
+        contains the given string (case-insensitive).
+
+        @return: primary key of the matching representative
+        @rtype: int
+        """
+        contained = contained.lower()
+        for pk, name, name_en, name_ka in self.names:
+            if name_ka.startswith(first) and name_ka.endswith(last):
+                return pk
+            if name_en.startswith(first) and name_en.endswith(last):
+                return pk
+            if contained in name.lower():
+                return pk
+        return None
+
+    def _match_contained(self, contained):
+        """
+        Get representative whose name contains the given string (case-insensitive).
+
+        @return: primary key of the matching representative
+        @rtype: int
+        """
+        contained = contained.lower()
+        for pk, name, name_en, name_ka in self.names:
+            if (contained in name.lower() or contained in name_en.lower() or
+                    contained in name_ka.lower()):
+                return pk
+        return None
+
+    def _find(self, name):
+        name = Representative._filter_name(name)
+        if len(name) < NAME_MINLEN:
+            return None
+
+        lastname_first = glt.lastname_first(name)
+        parts = lastname_first.split()
+        if len(parts) > 1:
+            pk = self._match_parts(parts[0], parts[1], lastname_first)
+            if pk is not None:
+                return pk
+
+        firstname_first = glt.firstname_first(name)
+        parts = firstname_first.split()
+        if len(parts) > 1:
+            pk = self._match_parts(parts[0], parts[-1], firstname_first)
+            if pk is not None:
+                return pk
+
+        return self._match_contained(name)
+
+    def find(self, name):
+        """
+        Find a representative with given name.
+
+        @param name: name of the representative
+        @type name: unicode
+        @return: primary key of the representative matching the name
+        @rtype: int
+        """
+        try:
+            return self.found[name]
+        except KeyError:
+            pk = self.found[name] = self._find(name)
+            return pk
+
+
 class AdditionalInformation(models.Model):
     """
     Additional information for representative
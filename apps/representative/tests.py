@@ -5,15 +5,20 @@ Tests for app representative
 __docformat__ = 'epytext en'
 
 import datetime
+from decimal import Decimal
+from StringIO import StringIO
 from django.utils.timezone import utc
 
 from django.conf import settings
+from django.core.management import call_command
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 
-from representative.models import Attendance, Representative, RandomRepresentative, NAME_MINLEN
+from representative.models import Attendance, NameMatcher, Representative, RandomRepresentative, NAME_MINLEN
 from representative.views import UnitParliament, Detail
 from question.models import Question
+from incomedeclaration.models import DeclarationEntrepreneurial, DeclarationOtherInclExpense,\
+    DeclarationProperty, DeclarationRealEstate, DeclarationWage, IncomeDeclaration, RepresentativeWealth
 
 
 class RepresentativeTest (TestCase):
@@ -130,6 +135,34 @@ class RepresentativeTest (TestCase):
         self.assertTemplateUsed(response, 'representative/votingrecords.html')
 
 
+    def test_wealth (self):
+        for year, income in ((2011, 100), (2012, 150)):
+            decl = IncomeDeclaration.objects.create(decl_id=str(year),
+                name=u'აბულაშვილი ნუგზარი', scrape_date=datetime.date(year, 6, 1),
+                date=datetime.date(year, 5, 1), representative_id=1)
+            DeclarationWage.objects.create(declaration=decl, name='', desc_workplace='',
+                desc_job='', income_rec='%d GEL' % income, income_gel=income)
+            DeclarationRealEstate.objects.create(declaration=decl, name_shares='',
+                prop_type='', loc_area='', co_owners='')
+        RepresentativeWealth.update([1])
+
+        url = reverse('representative_wealth_series', args=[1])
+        response = self.client.get(url)
+        self.assertContains(response, '"year": [2011, 2012]')
+        self.assertContains(response, '"total_income": [100.0, 150.0]')
+
+        rows = RepresentativeWealth.differences(1)
+        self.assertEqual([w.year for w, diff in rows], [2012, 2011])
+        self.assertEqual(rows[0][1]['total_income'], 50)
+        self.assertEqual(rows[0][1]['real_estates'], 0)
+        self.assertEqual(rows[1][1]['total_income'], None)
+
+        url = reverse('representative_wealth', args=[1, 'nugzar-abulashvili'])
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'representative/wealth.html')
+
+
+
     def test_query (self):
         url = reverse('representative_query', args=[u'აბულაშვილი ნუგზარი'])
         response = self.client.get(url)
@@ -171,6 +204,21 @@ class RepresentativeTest (TestCase):
         self.assertEqual(Representative.find(name), None)
 
 
+    def test_NameMatcher_find (self):
+        matcher = NameMatcher()
+        for name in [u'Foo Bar', u'აბულაშვილი ნუგზარი', u'ნუგზარ აბულაშვილი',
+                u'აბულაშვილი', u'ნუგზარ']:
+            representative = Representative.find(name)
+            if hasattr(representative, 'pk'):
+                self.assertEqual(matcher.find(name), representative.pk)
+            else:
+                self.assertEqual(matcher.find(name), representative[0].pk)
+
+        self.assertEqual(matcher.find(u'idontexistinthisdatabase'), None)
+        self.assertEqual(matcher.find(u'ნუგზარ'[:NAME_MINLEN - 1]), None)
+        self.assertTrue(u'ნუგზარ' in matcher.found)
+
+
     def test_Representative_income (self):
         r = Representative.objects.get(pk=1)
         self.assertEqual(r.income['total'], 49272)
@@ -218,3 +266,115 @@ class RandomRepresentativeTest (TestCase):
             self.assertNotEqual(current.representative.pk, rr.pk)
         else:
             self.assertEqual(current.representative.pk, rr.pk)
+
+
+
+class UpdateAssetsTest (TestCase):
+    fixtures = ['representative_testdata']
+
+
+    def _declare (self, name, year, representative=None, wages=(),
+            others=(), expenses=(), properties=(), estates=()):
+        """Create a declaration with given related rows."""
+        decl = IncomeDeclaration.objects.create(
+            decl_id='%s-%d' % (IncomeDeclaration.objects.count(), year),
+            name=name, scrape_date=datetime.date(year, 6, 1),
+            date=datetime.date(year, 5, 1), representative_id=representative)
+        for wage_name, income in wages:
+            DeclarationWage.objects.create(declaration=decl, name=wage_name,
+                name_en=wage_name, name_ka=wage_name, desc_workplace='',
+                desc_job='', income_rec='%s GEL' % income,
+                income_gel=Decimal(income))
+        for income in others:
+            DeclarationEntrepreneurial.objects.create(declaration=decl,
+                name='', corp_name_addr='', particn_type='',
+                register_agency='', particn_date='',
+                income_rec='%s GEL' % income, income_gel=Decimal(income))
+        for amount in expenses:
+            DeclarationOtherInclExpense.objects.create(declaration=decl,
+                recip_issuer='', type='', amount=amount)
+        for description in properties:
+            DeclarationProperty.objects.create(declaration=decl,
+                name_shares='', prop_type='', description=description,
+                co_owners='')
+        for prop_type in estates:
+            DeclarationRealEstate.objects.create(declaration=decl,
+                name_shares='', prop_type=prop_type, loc_area='', co_owners='')
+        return decl
+
+
+    def _expected (self, representative, decl):
+        """Compute the values the old per-row path set from a declaration."""
+        name = representative.names.all()[0]
+        wages = [w.income_gel for w in decl.wages.all()
+            if w.name_en in (name.name_en, name.name_ka) or
+                w.name_ka in (name.name_en, name.name_ka)]
+        properties = [p.description for p in decl.properties.all()]
+        properties += [r.prop_type for r in decl.realestates.all()]
+        return {
+            'salary': int(sum(wages)),
+            'other_income': int(sum(e.income_gel for e in
+                decl.entrepreneurials.all())),
+            'expenses': u'; '.join(e.amount for e in
+                decl.otherinclexpenses.all()),
+            'property_assets': u'; '.join(properties),
+        }
+
+
+    def _update (self):
+        out = StringIO()
+        call_command('update_assets', stdout=out, stderr=StringIO())
+        return out.getvalue()
+
+
+    def test_update (self):
+        name = u'აბულაშვილი ნუგზარი'
+        earlier = self._declare(name, 2011, wages=[(name, '90')],
+            others=['10'], expenses=['old'])
+        latest = self._declare(name, 2012,
+            wages=[(name, '100.50'), (name, '50'), (u'სხვა პირი', '1000')],
+            others=['20', '30.75'], expenses=['car', 'rent'],
+            properties=['flat'], estates=['house'])
+        empty = self._declare(u'ალავიძე ანდრო', 2012)
+        # found by the english name, after the georgian one
+        english = self._declare(u'Foo Bar', 2012, wages=[(u'Foo Bar', '70')])
+        # linked manually, the name doesn't match
+        manual = self._declare(u'სხვა სახელი', 2012, representative=3,
+            others=['5'], properties=['land'])
+        # linked to someone it doesn't belong to
+        stray = self._declare(u'ალავიძე ანდრო', 2010, representative=4)
+        expected = {1: latest, 2: empty, 13: english, 3: manual}
+
+        self._update()
+
+        links = dict(IncomeDeclaration.objects.values_list('pk', 'representative'))
+        self.assertEqual(links, {earlier.pk: 1, latest.pk: 1, empty.pk: 2,
+            english.pk: 13, manual.pk: 3, stray.pk: 2})
+        for pk, decl in expected.iteritems():
+            representative = Representative.objects.get(pk=pk)
+            values = self._expected(representative, decl)
+            for field, value in values.iteritems():
+                self.assertEqual(getattr(representative, field), value,
+                    '%s of %d' % (field, pk))
+        self.assertEqual(Representative.objects.get(pk=1).salary, 150)
+        self.assertEqual(Representative.objects.get(pk=1).other_income, 50)
+        self.assertEqual(RepresentativeWealth.objects.filter(
+            representative=1).count(), 2)
+
+
+    def test_update_changed (self):
+        name = u'აბულაშვილი ნუგზარი'
+        self._declare(name, 2012, wages=[(name, '100')], expenses=['car'])
+        self._update()
+        untouched = dict((r.pk, r.expenses) for r in Representative.objects.all())
+
+        output = self._update()
+        self.assertTrue('0 links changed, 0 updated, 1 unchanged' in output)
+
+        Representative.objects.filter(pk=1).update(salary=1, expenses='car')
+        output = self._update()
+        self.assertTrue(u'%s: salary\n' % name in output.decode('utf-8'))
+        self.assertTrue('0 links changed, 1 updated, 0 unchanged' in output)
+        self.assertEqual(Representative.objects.get(pk=1).salary, 100)
+        self.assertEqual(dict((r.pk, r.expenses) for r in
+            Representative.objects.all()), untouched)
@@ -10,6 +10,7 @@ urlpatterns = patterns('',
     # name='person' required by popit
     url(r'^representative/(?P<pk>\d+)/(?P<slug>[-\(\)\w]+)/$', Detail.as_view(), name='person'),
     url(r'^representative/(?P<pk>\d+)/(?P<slug>[-\(\)\w]+)/votingrecords/$', VotingRecords.as_view(), name='representative_votingrecords'),
+    url(r'^representative/(?P<pk>\d+)/(?P<slug>[-\(\)\w]+)/wealth/$', Wealth.as_view(), name='representative_wealth'),
     url(r'^representative/(?P<pk>\d+)/$', Detail.as_view(), name='representative_pk'),
     url(r'^representative/(?P<slug>[-\(\)\w]+)/$', Detail.as_view(), name='representative_slug'),
     url(r'^search/', Search.as_view(), name='representative_search'),
@@ -28,4 +29,5 @@ urlpatterns = patterns('',
     # AJAX calls answered by JSON
     url(r'^query/(?P<query>.*)/$', query, name='representative_query'),
     url(r'^unit/representative/(?P<pk>\d+)/$', unit_representative, name='unit_representative'),
+    url(r'^wealth/(?P<pk>\d+)/$', wealth, name='representative_wealth_series'),
 )
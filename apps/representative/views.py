@@ -20,8 +20,9 @@ except ImportError:
     from cms.utils import set_language_changer
 
 from apps.votingrecord.models import VotingRecordResult, VotingRecord
+from incomedeclaration.models import RepresentativeWealth
 from question.forms import QuestionForm
-from question.models import Question
+from question.models import Question, QuestionStatistics
 
 from .models import Representative, RandomRepresentative, Party, Faction, Cabinet, Unit as UnitModel
 
@@ -234,6 +235,13 @@ def unit_representative (request, pk):
 
 
 
+def wealth (request, pk):
+    """Time series of a representative's wealth, for charts."""
+    data = RepresentativeWealth.series(pk)
+    return HttpResponse(json.dumps(data), content_type='application/json')
+
+
+
 class Detail (DetailView):
     context_object_name = 'obj'
     model = Representative
@@ -311,6 +319,7 @@ class Detail (DetailView):
 
         context['form'] = self._get_form(obj)
         context['questions'] = self._get_questions(obj)
+        context['responsiveness'] = QuestionStatistics.get(obj.pk)
         totalCount = VotingRecordResult.get_counts(representative=obj)
 
         context['attended'] = totalCount['total'] - totalCount['absent']
@@ -339,8 +348,10 @@ class Detail (DetailView):
         context['url_feed'] = reverse('representative_feed_detail', args=[obj.pk])
         context['url_votingrecords'] = reverse(
             'representative_votingrecords', args=[obj.pk, obj.slug])
+        context['url_wealth'] = reverse(
+            'representative_wealth', args=[obj.pk, obj.slug])
         try:
-            context['decl'] = obj.incomedeclaration.all()[0]
+            context['decl'] = obj.incomedeclaration.order_by('-date', '-pk')[0]
         except IndexError:
             context['decl'] = None
 
@@ -426,6 +437,23 @@ class VotingRecords (DetailView):
 
 
 
+class Wealth (DetailView):
+    """Year-over-year differences of a representative's wealth."""
+    context_object_name = 'obj'
+    model = Representative
+    template_name = 'representative/wealth.html'
+
+    def get_context_data(self, **kwargs):
+        context = super(Wealth, self).get_context_data(**kwargs)
+        set_language_changer(self.request, context['obj'].get_absolute_url)
+        context['rows'] = RepresentativeWealth.differences(context['obj'].pk)
+        context['url_series'] = reverse('representative_wealth_series',
+            args=[context['obj'].pk])
+
+        return context
+
+
+
 class Info (Detail):
     context_object_name = 'obj'
     model = Representative
@@ -8,10 +8,26 @@ __docformat__ = 'epytext en'
 from django.contrib import admin
 from modeltranslation.admin import TranslationAdmin
 
-from .models import SMSAlert
+from . import dispatch
+from .models import SMSAlert, SMSDelivery
 
 
 
 class SMSAlertAdmin (TranslationAdmin):
-    pass
+    list_display = ('__unicode__', 'group', 'date_sent', 'queued', 'delivery_counts')
+    actions = ['send']
+
+
+    def delivery_counts (self, obj):
+        counts = obj.get_delivery_counts()
+        return u', '.join(u'%d %s' % (counts[state], state)
+            for state, name in SMSDelivery.STATE_CHOICES)
+    delivery_counts.short_description = u'Deliveries'
+
+
+    def send (self, request, queryset):
+        queued = len([alert for alert in queryset if dispatch.queue(alert)])
+        self.message_user(request,
+            u'%d alerts queued for sending to subscribers.' % queued)
+    send.short_description = u'Send to subscribers'
 admin.site.register(SMSAlert, SMSAlertAdmin)
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+"""
+Sending SMSAlerts to subscribers.
+
+An alert is queued with L{queue}, which only marks it. The worker, command
+send_sms_alerts, expands queued alerts into one SMSDelivery per subscriber
+of the alert's group, in batches of INSERTs, and sends the pending
+deliveries in batches through the gateway, as fast as the gateway's rate
+allows. Failed deliveries are retried with backoff until L{ATTEMPTS} are
+used up.
+
+The rate holds for one worker, so only one should run at a time.
+"""
+__docformat__ = 'epytext en'
+
+import datetime
+import time
+from django.db.models import F, Max
+from django.utils.importlib import import_module
+
+from smsregister.models import ALL, SMSSubscription, get_international_number
+from util import outbox
+from util.db import bulk_create
+
+from .models import SMSAlert, SMSDelivery
+
+try:
+    from settings import LANGUAGES
+except ImportError:
+    LANGUAGES = (('en', 'English'), ('ka', 'Georgian'))
+try:
+    from settings import SMS_GATEWAY
+except ImportError:
+    SMS_GATEWAY = 'smsalert.gateways.HTTPGateway'
+
+
+#: number of subscribers expanded per query
+EXPAND_BATCH_SIZE = 500
+#: maximum number of delivery attempts
+ATTEMPTS = 3
+#: seconds a worker may take to send a batch before others retry it
+LEASE = 5 * 60
+
+
+
+def get_gateway (path=SMS_GATEWAY):
+    """Instantiate the gateway of given dotted path.
+
+    @param path: dotted path of the gateway class
+    @type path: str
+    @return: the gateway
+    @rtype: smsalert.gateways.Gateway
+    """
+    module, name = path.rsplit('.', 1)
+    return getattr(import_module(module), name)()
+
+
+
+class Throttle (object):
+    """Limits the number of messages sent per second."""
+
+
+    def __init__ (self, rate, clock=time.time, sleep=time.sleep):
+        """
+        @param rate: maximum number of messages per second, None for no limit
+        @type rate: float
+        @param clock: function returning the current time in seconds
+        @type clock: function
+        @param sleep: function waiting for given seconds
+        @type sleep: function
+        """
+        self.rate = rate
+        self.clock = clock
+        self.sleep = sleep
+        #: time from which on sending is allowed
+        self.allowed = None
+
+
+    def wait (self, count):
+        """Wait until given number of messages may be sent.
+
+        @param count: number of messages to send
+        @type count: int
+        """
+        if not self.rate:
+            return
+        now = self.clock()
+        if self.allowed is not None and self.allowed > now:
+            self.sleep(self.allowed - now)
+            now = self.allowed
+        self.allowed = now + count / float(self.rate)
+
+
+
+def queue (alert):
+    """Queue given alert for sending to its subscribers, once.
+
+    @param alert: alert to send
+    @type alert: SMSAlert
+    @return: if the alert was queued, False if it was before
+    @rtype: bool
+    """
+    now = datetime.datetime.now()
+    if SMSAlert.objects.filter(pk=alert.pk, queued__isnull=True).update(queued=now):
+        alert.queued = now
+        return True
+    return False
+
+
+
+def expand (alert, batch_size=EXPAND_BATCH_SIZE):
+    """Create the deliveries of given alert to its subscribers.
+
+    Subscribers of the alert's group and of all groups get the alert once,
+    in the language they registered with. Expansion goes by registration,
+    so an interrupted one continues where it stopped.
+
+    @param alert: alert to expand
+    @type alert: SMSAlert
+    @param batch_size: number of subscribers per query
+    @type batch_size: int
+    @return: number of deliveries created
+    @rtype: int
+    """
+    count = 0
+    for language, name in LANGUAGES:
+        subscriptions = SMSSubscription.objects.filter(language=language)
+        if alert.group != ALL:
+            subscriptions = subscriptions.filter(group__in=(alert.group, ALL))
+        subscriptions = subscriptions.order_by('registration').values_list(
+            'registration', 'registration__phone_number').distinct()
+
+        last = SMSDelivery.objects.filter(alert=alert, language=language).aggregate(
+            last=Max('registration'))['last'] or 0
+        while True:
+            rows = list(subscriptions.filter(registration__gt=last)[:batch_size])
+            if not rows:
+                break
+            count += bulk_create(SMSDelivery, [SMSDelivery(alert=alert,
+                registration_id=registration, language=language,
+                phone_number=get_international_number(phone_number))
+                for registration, phone_number in rows])
+            last = rows[-1][0]
+
+    alert.expanded = datetime.datetime.now()
+    SMSAlert.objects.filter(pk=alert.pk).update(expanded=alert.expanded)
+    return count
+
+
+
+def _claim (size, now):
+    """Claim due deliveries, at most given number.
+
+    A claim is a conditional update, it expires after L{LEASE}.
+
+    @param size: maximum number of deliveries to claim
+    @type size: int
+    @param now: current time
+    @type now: datetime.datetime
+    @return: deliveries claimed
+    @rtype: [ SMSDelivery ]
+    """
+    due = SMSDelivery.objects.filter(
+        state__in=(SMSDelivery.PENDING, SMSDelivery.SENDING), next_attempt__lte=now)
+    pks = list(due.values_list('pk', flat=True)[:size])
+    if not pks:
+        return []
+    lease = now + datetime.timedelta(seconds=LEASE)
+    due.filter(pk__in=pks).update(state=SMSDelivery.SENDING, next_attempt=lease)
+    return list(SMSDelivery.objects.filter(pk__in=pks, state=SMSDelivery.SENDING,
+        next_attempt=lease))
+
+
+
+def _finish (deliveries, errors, now):
+    """Record the outcome of sending given deliveries.
+
+    Deliveries sent are updated by one query, failed ones one by one.
+
+    @param deliveries: deliveries sent
+    @type deliveries: [ SMSDelivery ]
+    @param errors: for each delivery the error, None if it was sent
+    @type errors: [ unicode ]
+    @param now: current time
+    @type now: datetime.datetime
+    """
+    sent = []
+    for delivery, error in zip(deliveries, errors):
+        delivery.attempts += 1
+        if error is None:
+            delivery.state = SMSDelivery.SENT
+            delivery.sent = now
+            sent.append(delivery.pk)
+            continue
+        delivery.response = error
+        if delivery.attempts >= ATTEMPTS:
+            delivery.state = SMSDelivery.FAILED
+        else:
+            delivery.state = SMSDelivery.PENDING
+            delivery.next_attempt = now + outbox.get_backoff(delivery.attempts)
+        SMSDelivery.objects.filter(pk=delivery.pk).update(state=delivery.state,
+            attempts=delivery.attempts, next_attempt=delivery.next_attempt,
+            response=delivery.response)
+    if sent:
+        SMSDelivery.objects.filter(pk__in=sent).update(state=SMSDelivery.SENT,
+            sent=now, attempts=F('attempts') + 1, response='')
+
+
+
+def process (gateway=None, throttle=None, limit=None):
+    """Expand queued alerts and send the deliveries due now.
+
+    @param gateway: gateway to send with, the one of the settings if None
+    @type gateway: smsalert.gateways.Gateway
+    @param throttle: throttle to pace sending, by the gateway's rate if None
+    @type throttle: Throttle
+    @param limit: maximum number of deliveries to send, all due if None
+    @type limit: int
+    @return: number of deliveries sent and failed
+    @rtype: (int, int)
+    """
+    if gateway is None:
+        gateway = get_gateway()
+    if throttle is None:
+        throttle = Throttle(gateway.rate)
+
+    for alert in SMSAlert.objects.filter(queued__isnull=False, expanded__isnull=True):
+        expand(alert)
+
+    texts = {}
+    sent = failed = 0
+    while limit is None or sent + failed < limit:
+        size = gateway.batch_size
+        if limit is not None:
+            size = min(size, limit - sent - failed)
+        deliveries = _claim(size, datetime.datetime.now())
+        if not deliveries:
+            break
+
+        messages = []
+        for delivery in deliveries:
+            key = (delivery.alert_id, delivery.language)
+            if key not in texts:
+                texts[key] = delivery.alert.get_text(delivery.language)
+            messages.append((delivery.phone_number, texts[key]))
+        throttle.wait(len(messages))
+        errors = gateway.send(messages)
+        _finish(deliveries, errors, datetime.datetime.now())
+
+        failures = len([e for e in errors if e is not None])
+        sent += len(errors) - failures
+        failed += failures
+    return sent, failed
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+Gateways sending SMS, for L{smsalert.dispatch}.
+
+A gateway sends a batch of messages at once and reports the outcome of each
+one. Which gateway is used is set by the dotted path SMS_GATEWAY in the
+settings.
+"""
+__docformat__ = 'epytext en'
+
+import threading
+import urllib2
+
+from util import outbox
+
+try:
+    from settings import SMS_GATEWAY_URL
+except ImportError:
+    from settings import QUESTION_SMS_URL as SMS_GATEWAY_URL
+try:
+    from settings import SMS_GATEWAY_RATE
+except ImportError:
+    SMS_GATEWAY_RATE = 50
+
+
+
+class Gateway (object):
+    """Base class of gateways."""
+    #: maximum number of messages sent by one call of send
+    batch_size = 100
+    #: maximum number of messages per second, None for no limit
+    rate = None
+
+
+    def send (self, messages):
+        """Send given messages.
+
+        @param messages: phone numbers and texts
+        @type messages: [ (unicode, unicode) ]
+        @return: for each message the error, None if it was sent
+        @rtype: [ unicode ]
+        """
+        raise NotImplementedError
+
+
+
+class HTTPGateway (Gateway):
+    """Gateway requesting SMS_GATEWAY_URL for each message.
+
+    The URL has empty parameters to= and msg=, which are filled in like
+    for SMS answers to questions. Messages of a batch are requested by
+    several threads at once.
+    """
+    rate = SMS_GATEWAY_RATE
+
+
+    def __init__ (self, url=SMS_GATEWAY_URL, concurrency=10):
+        """
+        @param url: URL of the SMS server
+        @type url: str
+        @param concurrency: number of requests at the same time
+        @type concurrency: int
+        """
+        self.url = url
+        self.concurrency = concurrency
+
+
+    def _get_url (self, phone_number, text):
+        return self.url.replace('to=', 'to=' + urllib2.quote(phone_number.encode('utf8'))).replace(
+            'msg=', 'msg=' + urllib2.quote(text.encode('utf8')))
+
+
+    def _send_slice (self, messages, errors, start, step):
+        for i in xrange(start, len(messages), step):
+            try:
+                outbox.fetch(self._get_url(*messages[i]))
+            except Exception, e:
+                errors[i] = u'%s: %s' % (e.__class__.__name__, e)
+
+
+    def send (self, messages):
+        errors = [None] * len(messages)
+        step = max(1, min(self.concurrency, len(messages)))
+        threads = [threading.Thread(target=self._send_slice,
+            args=(messages, errors, start, step)) for start in xrange(step)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return errors
+
+
+
+class FakeGateway (Gateway):
+    """Gateway keeping messages instead of sending them, for tests."""
+
+
+    def __init__ (self, failing=()):
+        """
+        @param failing: phone numbers to fail sending to
+        @type failing: [ unicode ]
+        """
+        #: messages sent
+        self.sent = []
+        #: phone numbers to fail sending to
+        self.failing = set(failing)
+
+
+    def send (self, messages):
+        errors = []
+        for phone_number, text in messages:
+            if phone_number in self.failing:
+                errors.append(u'Failing %s' % phone_number)
+            else:
+                self.sent.append((phone_number, text))
+                errors.append(None)
+        return errors
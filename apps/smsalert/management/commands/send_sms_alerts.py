@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+"""
+Command send_sms_alerts, the worker sending SMSAlerts to subscribers.
+
+Runs until interrupted, see L{smsalert.dispatch}.
+"""
+__docformat__ = 'epytext en'
+
+import datetime
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand
+
+
+
+class Command (BaseCommand):
+    """Command to send queued SMSAlerts to subscribers."""
+    #: help string
+    help = 'Sends queued SMS alerts to subscribers through the SMS gateway.'
+    #: options
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--once',
+            action='store_true',
+            dest='once',
+            default=False,
+            help='Send the deliveries due now and exit.'
+        ),
+        make_option(
+            '--sleep',
+            dest='sleep',
+            type='float',
+            default=5,
+            help='Seconds to wait when no delivery is due.'
+        ),
+    )
+
+
+    def handle (self, *args, **options):
+        """Command handler."""
+        from smsalert import dispatch
+        gateway = dispatch.get_gateway()
+        throttle = dispatch.Throttle(gateway.rate)
+
+        started = datetime.datetime.now()
+        sent = failed = 0
+        try:
+            while True:
+                counts = dispatch.process(gateway, throttle)
+                sent += counts[0]
+                failed += counts[1]
+                if options.get('once'):
+                    break
+                if not any(counts):
+                    time.sleep(options.get('sleep'))
+        except KeyboardInterrupt:
+            pass
+
+        elapsed = datetime.datetime.now() - started
+        self.stdout.write('%d sent, %d failed attempts, %.1f per second, in %s.\n' % (
+            sent, failed, sent / max(1., elapsed.total_seconds()), elapsed))
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+import datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    depends_on = (
+        ("smsregister", "0005_auto__chg_field_smsregister_phone_number__add_smssubscription"),
+    )
+
+    def forwards(self, orm):
+        # Adding field 'SMSAlert.group'
+        db.add_column('smsalert_smsalert', 'group',
+                      self.gf('django.db.models.fields.CharField')(default=u'all', max_length=32),
+                      keep_default=False)
+
+        # Adding field 'SMSAlert.queued'
+        db.add_column('smsalert_smsalert', 'queued',
+                      self.gf('django.db.models.fields.DateTimeField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding field 'SMSAlert.expanded'
+        db.add_column('smsalert_smsalert', 'expanded',
+                      self.gf('django.db.models.fields.DateTimeField')(null=True, blank=True),
+                      keep_default=False)
+
+        # Adding model 'SMSDelivery'
+        db.create_table('smsalert_smsdelivery', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('alert', self.gf('django.db.models.fields.related.ForeignKey')(related_name='deliveries', to=orm['smsalert.SMSAlert'])),
+            ('registration', self.gf('django.db.models.fields.related.ForeignKey')(related_name='sms_deliveries', to=orm['smsregister.SMSRegister'])),
+            ('phone_number', self.gf('django.db.models.fields.CharField')(max_length=32)),
+            ('language', self.gf('django.db.models.fields.CharField')(max_length=8)),
+            ('state', self.gf('django.db.models.fields.CharField')(default='pending', max_length=16, db_index=True)),
+            ('attempts', self.gf('django.db.models.fields.IntegerField')(default=0)),
+            ('next_attempt', self.gf('django.db.models.fields.DateTimeField')(default=datetime.datetime.now, db_index=True)),
+            ('sent', self.gf('django.db.models.fields.DateTimeField')(null=True, blank=True)),
+            ('response', self.gf('django.db.models.fields.TextField')(blank=True)),
+        ))
+        db.send_create_signal('smsalert', ['SMSDelivery'])
+
+        # Adding unique constraint on 'SMSDelivery', fields ['alert', 'registration']
+        db.create_unique('smsalert_smsdelivery', ['alert_id', 'registration_id'])
+
+    def backwards(self, orm):
+        # Removing unique constraint on 'SMSDelivery', fields ['alert', 'registration']
+        db.delete_unique('smsalert_smsdelivery', ['alert_id', 'registration_id'])
+
+        # Deleting model 'SMSDelivery'
+        db.delete_table('smsalert_smsdelivery')
+
+        # Deleting field 'SMSAlert.expanded'
+        db.delete_column('smsalert_smsalert', 'expanded')
+
+        # Deleting field 'SMSAlert.queued'
+        db.delete_column('smsalert_smsalert', 'queued')
+
+        # Deleting field 'SMSAlert.group'
+        db.delete_column('smsalert_smsalert', 'group')
+
+    models = {
+        'draftlaw.draftlaw': {
+            'Meta': {'ordering': "('-bill_number',)", 'object_name': 'DraftLaw'},
+            'author': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'author_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'author_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'bill_number': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'bureau_date': ('django.db.models.fields.DateField', [], {}),
+            'enable_annotations': ('django.db.models.fields.BooleanField', [], {'default': 'True'}),
+            'enacted_text_url': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'full_text': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'full_text_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'full_text_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'full_text_url': ('django.db.models.fields.CharField', [], {'max_length': '255', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'initiator': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'initiator_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'initiator_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'law_number': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'moderate_annotations': ('django.db.models.fields.DateField', [], {'default': 'datetime.date.today'}),
+            'related_1': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'related_2': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'related_3': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'related_4': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'related_5': ('django.db.models.fields.files.FileField', [], {'max_length': '100', 'blank': 'True'}),
+            'shortstatus': ('django.db.models.fields.CharField', [], {'default': "'D'", 'max_length': '1'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '100'}),
+            'status': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'status_en': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'status_ka': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True', 'blank': 'True'}),
+            'summary': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'summary_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'summary_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'title': ('django.db.models.fields.TextField', [], {}),
+            'title_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'title_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'voting_record': ('django.db.models.fields.related.ForeignKey', [], {'blank': 'True', 'related_name': "'voting_on'", 'null': 'True', 'to': "orm['votingrecord.VotingRecord']"})
+        },
+        'smsalert.smsalert': {
+            'Meta': {'object_name': 'SMSAlert'},
+            'date_created': ('django.db.models.fields.DateField', [], {'default': 'datetime.date.today'}),
+            'date_sent': ('django.db.models.fields.DateField', [], {}),
+            'draftlaws': ('django.db.models.fields.related.ManyToManyField', [], {'related_name': "'sms_alerts'", 'symmetrical': 'False', 'to': "orm['draftlaw.DraftLaw']"}),
+            'expanded': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'group': ('django.db.models.fields.CharField', [], {'default': "u'all'", 'max_length': '32'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'queued': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'text': ('django.db.models.fields.TextField', [], {}),
+            'text_en': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'}),
+            'text_ka': ('django.db.models.fields.TextField', [], {'null': 'True', 'blank': 'True'})
+        },
+        'smsalert.smsdelivery': {
+            'Meta': {'ordering': "('next_attempt', 'id')", 'unique_together': "(('alert', 'registration'),)", 'object_name': 'SMSDelivery'},
+            'alert': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'deliveries'", 'to': "orm['smsalert.SMSAlert']"}),
+            'attempts': ('django.db.models.fields.IntegerField', [], {'default': '0'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'language': ('django.db.models.fields.CharField', [], {'max_length': '8'}),
+            'next_attempt': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now', 'db_index': 'True'}),
+            'phone_number': ('django.db.models.fields.CharField', [], {'max_length': '32'}),
+            'registration': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'sms_deliveries'", 'to': "orm['smsregister.SMSRegister']"}),
+            'response': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'sent': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'state': ('django.db.models.fields.CharField', [], {'default': "'pending'", 'max_length': '16', 'db_index': 'True'})
+        },
+        'smsregister.smsregister': {
+            'Meta': {'ordering': "('-name',)", 'object_name': 'SMSRegister'},
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75'}),
+            'groups': ('django.db.models.fields.TextField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'modified': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'db_index': 'True', 'blank': 'True'}),
+            'name': ('django.db.models.fields.TextField', [], {}),
+            'phone_number': ('django.db.models.fields.CharField', [], {'max_length': '32', 'db_index': 'True'}),
+            'selected_language': ('django.db.models.fields.TextField', [], {})
+        },
+        'votingrecord.votingrecord': {
+            'Meta': {'ordering': "['-date', '-number']", 'object_name': 'VotingRecord'},
+            'amended_by': ('django.db.models.fields.related.ManyToManyField', [], {'symmetrical': 'False', 'related_name': "'amending'", 'null': 'True', 'to': "orm['votingrecord.VotingRecord']"}),
+            'date': ('django.db.models.fields.DateField', [], {'null': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'kan_id': ('django.db.models.fields.IntegerField', [], {'null': 'True'}),
+            'name': ('django.db.models.fields.CharField', [], {'max_length': '512', 'null': 'True'}),
+            'name_en': ('django.db.models.fields.CharField', [], {'max_length': '512', 'null': 'True', 'blank': 'True'}),
+            'name_ka': ('django.db.models.fields.CharField', [], {'max_length': '512', 'null': 'True', 'blank': 'True'}),
+            'number': ('django.db.models.fields.CharField', [], {'max_length': '32', 'null': 'True'}),
+            'scrape_date': ('django.db.models.fields.DateField', [], {'null': 'True'}),
+            'slug': ('django.db.models.fields.SlugField', [], {'max_length': '100'}),
+            'url': ('django.db.models.fields.CharField', [], {'max_length': '255', 'null': 'True'})
+        }
+    }
+
+    complete_apps = ['smsalert']
\ No newline at end of file
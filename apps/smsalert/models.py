@@ -3,7 +3,7 @@
 """
 Model smsalert
 
-Depends on draftlaw.
+Depends on draftlaw and smsregister.
 """
 __docformat__ = 'epytext en'
 
@@ -13,6 +13,7 @@ from django.db import models
 from django.utils.translation import get_language, ugettext_lazy as _
 
 from draftlaw.models import DraftLaw
+from smsregister.models import ALL, GROUP_CHOICES, SMSRegister
 
 
 
@@ -29,6 +30,13 @@ class SMSAlert (models.Model):
     # draftlaws it refers to
     draftlaws = models.ManyToManyField(DraftLaw, related_name='sms_alerts',
         help_text=_('Draft Laws related to this alert'), blank=True)
+    # group of subscribers to send the alert to
+    group = models.CharField(max_length=32, choices=GROUP_CHOICES, default=ALL,
+        help_text=_('Subscribers to send the alert to'))
+    # when the alert was queued for sending to subscribers
+    queued = models.DateTimeField(blank=True, null=True, editable=False)
+    # when the alert was expanded into deliveries to subscribers
+    expanded = models.DateTimeField(blank=True, null=True, editable=False)
 
 
     class Meta:
@@ -37,3 +45,70 @@ class SMSAlert (models.Model):
 
     def __unicode__ (self):
         return u'%s' % self.text[:50]
+
+
+    def get_text (self, language):
+        """Get the text of self in given language.
+
+        @param language: language code
+        @type language: str
+        @return: text in that language, or the default one if not translated
+        @rtype: unicode
+        """
+        return getattr(self, 'text_' + language, None) or self.text
+
+
+    def get_delivery_counts (self):
+        """Get the number of deliveries of self by state.
+
+        @return: number of deliveries by state
+        @rtype: { str: int }
+        """
+        counts = dict((state, 0) for state, name in SMSDelivery.STATE_CHOICES)
+        rows = self.deliveries.order_by().values('state').annotate(count=models.Count('pk'))
+        for row in rows:
+            counts[row['state']] = row['count']
+        return counts
+
+
+
+class SMSDelivery (models.Model):
+    """An SMSAlert to one subscriber, see L{smsalert.dispatch}."""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATE_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    # alert delivered
+    alert = models.ForeignKey(SMSAlert, related_name='deliveries')
+    # registration delivered to
+    registration = models.ForeignKey(SMSRegister, related_name='sms_deliveries')
+    # phone number, with country code
+    phone_number = models.CharField(max_length=32)
+    # language of the text delivered
+    language = models.CharField(max_length=8)
+    # state of delivery
+    state = models.CharField(max_length=16, choices=STATE_CHOICES,
+        default=PENDING, db_index=True)
+    # number of delivery attempts
+    attempts = models.IntegerField(default=0)
+    # when to attempt delivery next, or when a worker's claim expires
+    next_attempt = models.DateTimeField(default=datetime.datetime.now, db_index=True)
+    # when the alert was delivered
+    sent = models.DateTimeField(blank=True, null=True)
+    # last error of the gateway
+    response = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ('next_attempt', 'id')
+        unique_together = (('alert', 'registration'),)
+
+
+    def __unicode__ (self):
+        return u'%s %s %s' % (self.alert_id, self.phone_number, self.state)
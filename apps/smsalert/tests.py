@@ -22,3 +22,103 @@ class SMSAlertTest (TestCase):
         response = self.client.get(url)
         self.assertContains(response, 'alert')
         self.assertTemplateUsed(response, 'smsalert/page.html')
+
+
+
+class DispatchTest (TestCase):
+    fixtures = ['smsalert_testdata']
+
+
+    def setUp (self):
+        from smsregister.models import SMSRegister
+        self.registrations = [SMSRegister.objects.create(name=u'name %d' % i,
+            selected_language=language, phone_number=u'59900000%d' % i,
+            email=u'%d@example.com' % i, groups=groups) for i, (language, groups) in
+            enumerate((('ka', u'BUDGET|SPORT'), ('en', u'ALL'), ('ka', u'AGRARIAN')))]
+
+
+    def test_subscriptions (self):
+        registration = self.registrations[0]
+        self.assertEqual(sorted(registration.subscriptions.values_list('group', 'language')),
+            [(u'budget', u'ka'), (u'sport', u'ka')])
+
+        registration.groups = u'SPORT'
+        registration.selected_language = 'en'
+        registration.save()
+        self.assertEqual(list(registration.subscriptions.values_list('group', 'language')),
+            [(u'sport', u'en')])
+
+
+    def test_register (self):
+        from smsregister.forms import SMSRegisterForm
+        from smsregister.models import SMSRegister
+        from smsregister.views import Show
+
+        form = SMSRegisterForm()
+        form.cleaned_data = {'name': u'name', 'lang': u'en',
+            'phone_number': u'599000009', 'email': u'9@example.com',
+            'subscribe': [u'all', u'budget', u'sport']}
+        Show().form_valid(form)
+        registration = SMSRegister.objects.get(phone_number=u'599000009')
+        self.assertEqual(registration.groups, u'ALL|BUDGET|SPORT')
+        self.assertEqual(sorted(registration.subscriptions.values_list('group', flat=True)),
+            [u'all', u'budget', u'sport'])
+
+
+    def test_process (self):
+        from .dispatch import process, queue
+        from .gateways import FakeGateway
+        from .models import SMSDelivery
+
+        alert = SMSAlert.objects.get(pk=1)
+        alert.group = u'budget'
+        alert.save()
+        gateway = FakeGateway()
+        self.assertEqual(process(gateway), (0, 0))
+
+        self.assertTrue(queue(alert))
+        self.assertFalse(queue(alert))
+        self.assertEqual(process(gateway), (2, 0))
+        self.assertEqual(sorted(gateway.sent), [
+            (u'+995599000000', alert.text_ka), (u'+995599000001', alert.text_en)])
+        self.assertEqual(alert.get_delivery_counts()[SMSDelivery.SENT], 2)
+
+        # expanded once, sent once
+        self.assertEqual(process(gateway), (0, 0))
+        self.assertEqual(len(gateway.sent), 2)
+
+
+    def test_process_failing (self):
+        from .dispatch import ATTEMPTS, process, queue
+        from .gateways import FakeGateway
+        from .models import SMSDelivery
+
+        alert = SMSAlert.objects.get(pk=2)
+        queue(alert)
+        gateway = FakeGateway(failing=[u'+995599000002'])
+        self.assertEqual(process(gateway, limit=2), (2, 0))
+        self.assertEqual(process(gateway), (0, 1))
+
+        delivery = alert.deliveries.get(phone_number=u'+995599000002')
+        self.assertEqual((delivery.state, delivery.attempts), (SMSDelivery.PENDING, 1))
+        for i in xrange(ATTEMPTS - 1):
+            alert.deliveries.filter(pk=delivery.pk).update(next_attempt=alert.queued)
+            process(gateway)
+        delivery = alert.deliveries.get(pk=delivery.pk)
+        self.assertEqual((delivery.state, delivery.attempts), (SMSDelivery.FAILED, ATTEMPTS))
+        self.assertEqual(len(gateway.sent), 2)
+
+
+    def test_Throttle (self):
+        from .dispatch import Throttle
+        clock = [0.]
+        slept = []
+        def sleep (seconds):
+            slept.append(seconds)
+            clock[0] += seconds
+        throttle = Throttle(100, clock=lambda: clock[0], sleep=sleep)
+        throttle.wait(50)
+        throttle.wait(100)
+        clock[0] += 0.25
+        throttle.wait(100)
+        self.assertEqual(slept, [0.5, 0.75])
@@ -6,7 +6,7 @@ __docformat__ = 'epytext en'
 
 from django import forms
 from django.utils.translation import ugettext_lazy as _
-from apps.smsregister.models import SMSRegister
+from apps.smsregister.models import GROUP_CHOICES, SMSRegister
 from captcha.fields import CaptchaField
 
 
@@ -26,25 +26,7 @@ class SMSRegisterForm(forms.Form):
     subscribe = forms.MultipleChoiceField(label=_('Subscribe to: '), 
         widget=forms.CheckboxSelectMultiple,
         required=True,
-        choices=(
-            (u"all",_(u"All")),
-            (u"agrarian",_(u"Agrarian Issues Committee")),
-            (u"budget",_(u"Budget and Finance Committee")),
-            (u"environment",_(u"Committee on Environmental Protection and Natural Resources")),
-            (u"diaspora",_(u"Diaspora and Caucasus Issues Committee")),
-            (u"defence",_(u"Defence and Security Committee")),
-            (u"education",_(u"Education, Science and Culture Committee")),
-            (u"eurointegration",_(u"European Integration Committee")),
-            (u"foreignrelations",_(u"Foreign Relations Committee")),
-            (u"healthcare",_(u"Healthcare and Social Issues Committee")),
-            (u"humanrights",_(u"Human Rights and Civil Integration Committee")),
-            (u"legalissues",_(u"Legal Issues Committee")),
-            (u"proceduralissues",_(u"Procedural Issues and Rules Committee")),
-            (u"regionalpolicy",_(u"Regional Policy, Self-government and Mountainous Regions")),
-            (u"sectoreconomy",_(u"Sector Economy and Economic Policy Committee")),
-            (u"sport",_(u"Sport and Youth Affairs Committee")),
-            (u"adjarancouncil",_(u"Adjaran Supreme Council")),
-    ))
+        choices=GROUP_CHOICES)
 
     captcha = CaptchaField()
 
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding field 'SMSRegister.modified'
+        db.add_column('smsregister_smsregister', 'modified',
+                      self.gf('django.db.models.fields.DateTimeField')(default=datetime.datetime.now, auto_now=True, db_index=True, blank=True),
+                      keep_default=False)
+
+        # Adding model 'SMSUnsubscription'
+        db.create_table('smsregister_smsunsubscription', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('registration', self.gf('django.db.models.fields.IntegerField')()),
+            ('phone_number', self.gf('django.db.models.fields.TextField')()),
+            ('deleted', self.gf('django.db.models.fields.DateTimeField')(auto_now_add=True, db_index=True, blank=True)),
+        ))
+        db.send_create_signal('smsregister', ['SMSUnsubscription'])
+
+
+    def backwards(self, orm):
+        # Deleting field 'SMSRegister.modified'
+        db.delete_column('smsregister_smsregister', 'modified')
+
+        # Deleting model 'SMSUnsubscription'
+        db.delete_table('smsregister_smsunsubscription')
+
+
+    models = {
+        'smsregister.smsregister': {
+            'Meta': {'ordering': "('-name',)", 'object_name': 'SMSRegister'},
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75'}),
+            'groups': ('django.db.models.fields.TextField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'modified': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'db_index': 'True', 'blank': 'True'}),
+            'name': ('django.db.models.fields.TextField', [], {}),
+            'phone_number': ('django.db.models.fields.TextField', [], {}),
+            'selected_language': ('django.db.models.fields.TextField', [], {})
+        },
+        'smsregister.smsunsubscription': {
+            'Meta': {'ordering': "('deleted',)", 'object_name': 'SMSUnsubscription'},
+            'deleted': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'db_index': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'phone_number': ('django.db.models.fields.TextField', [], {}),
+            'registration': ('django.db.models.fields.IntegerField', [], {})
+        }
+    }
+
+    complete_apps = ['smsregister']
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Changing field 'SMSRegister.phone_number'
+        db.alter_column('smsregister_smsregister', 'phone_number', self.gf('django.db.models.fields.CharField')(max_length=32))
+
+        # Adding index on 'SMSRegister', fields ['phone_number']
+        db.create_index('smsregister_smsregister', ['phone_number'])
+
+        # Adding model 'SMSSubscription'
+        db.create_table('smsregister_smssubscription', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('group', self.gf('django.db.models.fields.CharField')(max_length=32)),
+            ('language', self.gf('django.db.models.fields.CharField')(max_length=8)),
+            ('registration', self.gf('django.db.models.fields.related.ForeignKey')(related_name='subscriptions', to=orm['smsregister.SMSRegister'])),
+        ))
+        db.send_create_signal('smsregister', ['SMSSubscription'])
+
+        # Adding unique constraint on 'SMSSubscription', fields ['group', 'language', 'registration']
+        db.create_unique('smsregister_smssubscription', ['group', 'language', 'registration_id'])
+
+    def backwards(self, orm):
+        # Removing unique constraint on 'SMSSubscription', fields ['group', 'language', 'registration']
+        db.delete_unique('smsregister_smssubscription', ['group', 'language', 'registration_id'])
+
+        # Deleting model 'SMSSubscription'
+        db.delete_table('smsregister_smssubscription')
+
+        # Removing index on 'SMSRegister', fields ['phone_number']
+        db.delete_index('smsregister_smsregister', ['phone_number'])
+
+        # Changing field 'SMSRegister.phone_number'
+        db.alter_column('smsregister_smsregister', 'phone_number', self.gf('django.db.models.fields.TextField')())
+
+    models = {
+        'smsregister.smsregister': {
+            'Meta': {'ordering': "('-name',)", 'object_name': 'SMSRegister'},
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75'}),
+            'groups': ('django.db.models.fields.TextField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'modified': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'db_index': 'True', 'blank': 'True'}),
+            'name': ('django.db.models.fields.TextField', [], {}),
+            'phone_number': ('django.db.models.fields.CharField', [], {'max_length': '32', 'db_index': 'True'}),
+            'selected_language': ('django.db.models.fields.TextField', [], {})
+        },
+        'smsregister.smssubscription': {
+            'Meta': {'unique_together': "(('group', 'language', 'registration'),)", 'object_name': 'SMSSubscription'},
+            'group': ('django.db.models.fields.CharField', [], {'max_length': '32'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'language': ('django.db.models.fields.CharField', [], {'max_length': '8'}),
+            'registration': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'subscriptions'", 'to': "orm['smsregister.SMSRegister']"})
+        },
+        'smsregister.smsunsubscription': {
+            'Meta': {'ordering': "('deleted',)", 'object_name': 'SMSUnsubscription'},
+            'deleted': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'db_index': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'phone_number': ('django.db.models.fields.TextField', [], {}),
+            'registration': ('django.db.models.fields.IntegerField', [], {})
+        }
+    }
+
+    complete_apps = ['smsregister']
\ No newline at end of file
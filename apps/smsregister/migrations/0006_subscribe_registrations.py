@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import DataMigration
+from django.db import models
+
+
+#: number of registrations subscribed at a time
+CHUNK_SIZE = 100
+#: committees ticked along with ALL by the registration form, whose view
+#: then dropped ALL from the stored groups
+COMMITTEES = frozenset(['agrarian', 'budget', 'environment', 'diaspora',
+    'defence', 'education', 'eurointegration', 'foreignrelations',
+    'healthcare', 'humanrights', 'legalissues', 'proceduralissues',
+    'regionalpolicy', 'sectoreconomy', 'sport', 'adjarancouncil'])
+
+
+class Migration(DataMigration):
+
+    def forwards(self, orm):
+        "Subscribe registrations to their groups, restoring ALL where it was dropped."
+        SMSRegister = orm['smsregister.SMSRegister']
+        SMSSubscription = orm['smsregister.SMSSubscription']
+
+        pks = list(SMSRegister.objects.order_by('pk').values_list('pk', flat=True))
+        for i in xrange(0, len(pks), CHUNK_SIZE):
+            subscriptions = []
+            values = list(SMSRegister.objects.filter(pk__in=pks[i:i+CHUNK_SIZE]).values_list(
+                'pk', 'groups', 'selected_language'))
+            for pk, groups, language in values:
+                subscribed = set(g.strip() for g in groups.lower().split('|'))
+                subscribed.discard('')
+                if 'all' not in subscribed and COMMITTEES <= subscribed:
+                    subscribed.add('all')
+                    SMSRegister.objects.filter(pk=pk).update(
+                        groups='ALL|' + groups, modified=datetime.datetime.now())
+                for group in subscribed:
+                    subscriptions.append(SMSSubscription(registration_id=pk,
+                        group=group, language=language))
+            SMSSubscription.objects.bulk_create(subscriptions)
+
+    def backwards(self, orm):
+        "Remove all subscriptions, the groups of registrations keep ALL."
+        orm['smsregister.SMSSubscription'].objects.all().delete()
+
+    models = {
+        'smsregister.smsregister': {
+            'Meta': {'ordering': "('-name',)", 'object_name': 'SMSRegister'},
+            'email': ('django.db.models.fields.EmailField', [], {'max_length': '75'}),
+            'groups': ('django.db.models.fields.TextField', [], {}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'modified': ('django.db.models.fields.DateTimeField', [], {'auto_now': 'True', 'db_index': 'True', 'blank': 'True'}),
+            'name': ('django.db.models.fields.TextField', [], {}),
+            'phone_number': ('django.db.models.fields.CharField', [], {'max_length': '32', 'db_index': 'True'}),
+            'selected_language': ('django.db.models.fields.TextField', [], {})
+        },
+        'smsregister.smssubscription': {
+            'Meta': {'unique_together': "(('group', 'language', 'registration'),)", 'object_name': 'SMSSubscription'},
+            'group': ('django.db.models.fields.CharField', [], {'max_length': '32'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'language': ('django.db.models.fields.CharField', [], {'max_length': '8'}),
+            'registration': ('django.db.models.fields.related.ForeignKey', [], {'related_name': "'subscriptions'", 'to': "orm['smsregister.SMSRegister']"})
+        },
+        'smsregister.smsunsubscription': {
+            'Meta': {'ordering': "('deleted',)", 'object_name': 'SMSUnsubscription'},
+            'deleted': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'db_index': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'phone_number': ('django.db.models.fields.TextField', [], {}),
+            'registration': ('django.db.models.fields.IntegerField', [], {})
+        }
+    }
+
+    complete_apps = ['smsregister']
+    symmetrical = True
\ No newline at end of file
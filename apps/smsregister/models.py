@@ -1,8 +1,52 @@
 # -*- coding: utf-8 -*-
 
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import get_language, ugettext_lazy as _
 
+from util.db import bulk_create
+
+
+#: group of registrations subscribed to all alerts
+ALL = u'all'
+#: groups one can subscribe to
+GROUP_CHOICES = (
+    (ALL, _(u"All")),
+    (u"agrarian", _(u"Agrarian Issues Committee")),
+    (u"budget", _(u"Budget and Finance Committee")),
+    (u"environment", _(u"Committee on Environmental Protection and Natural Resources")),
+    (u"diaspora", _(u"Diaspora and Caucasus Issues Committee")),
+    (u"defence", _(u"Defence and Security Committee")),
+    (u"education", _(u"Education, Science and Culture Committee")),
+    (u"eurointegration", _(u"European Integration Committee")),
+    (u"foreignrelations", _(u"Foreign Relations Committee")),
+    (u"healthcare", _(u"Healthcare and Social Issues Committee")),
+    (u"humanrights", _(u"Human Rights and Civil Integration Committee")),
+    (u"legalissues", _(u"Legal Issues Committee")),
+    (u"proceduralissues", _(u"Procedural Issues and Rules Committee")),
+    (u"regionalpolicy", _(u"Regional Policy, Self-government and Mountainous Regions")),
+    (u"sectoreconomy", _(u"Sector Economy and Economic Policy Committee")),
+    (u"sport", _(u"Sport and Youth Affairs Committee")),
+    (u"adjarancouncil", _(u"Adjaran Supreme Council")),
+)
+#: country code of registered phone numbers
+PHONE_PREFIX = u'+995'
+
+
+def get_international_number (phone_number):
+    """Get given phone number with country code.
+
+    @param phone_number: registered phone number
+    @type phone_number: unicode
+    @return: phone number to send SMS to
+    @rtype: unicode
+    """
+    if phone_number.startswith(u'+'):
+        return phone_number
+    return PHONE_PREFIX + phone_number
+
+
 class SMSRegister (models.Model):
     """An user that registered for SMS alert."""
 
@@ -11,11 +55,14 @@ class SMSRegister (models.Model):
     # language selected
     selected_language = models.TextField(help_text=_('Language to use'), blank=False)
     # phone number to send the SMS to.
-    phone_number = models.TextField(help_text=_('Phone number to send the SMS to'), blank=False)
+    phone_number = models.CharField(max_length=32, db_index=True,
+        help_text=_('Phone number to send the SMS to'), blank=False)
     # user email address
     email = models.EmailField(help_text=_('User email address'), blank=False)
     # groups the user chooses to subscribe to
     groups = models.TextField(help_text=_('Groups you are subscribing to'), blank=False)
+    # last modification, for exports of changes
+    modified = models.DateTimeField(auto_now=True, db_index=True, editable=False)
 
     class Meta:
         ordering = ('-name',)
@@ -24,3 +71,78 @@ class SMSRegister (models.Model):
     def __unicode__ (self):
         return u'%s' % self.text[:50]
 
+
+    def get_groups (self):
+        """Get the groups self is subscribed to.
+
+        @return: groups, see L{GROUP_CHOICES}
+        @rtype: [ unicode ]
+        """
+        groups = []
+        for group in self.groups.lower().split(u'|'):
+            group = group.strip()
+            if group and group not in groups:
+                groups.append(group)
+        return groups
+
+
+    def set_subscriptions (self):
+        """Set self's subscriptions to self's groups and language."""
+        SMSSubscription.objects.filter(registration=self).delete()
+        bulk_create(SMSSubscription, [SMSSubscription(registration=self,
+            group=group, language=self.selected_language)
+            for group in self.get_groups()])
+
+
+class SMSSubscription (models.Model):
+    """A registration's subscription to alerts of a group.
+
+    Normalizes the groups of registrations, so recipients of an alert are
+    looked up by the index on group and language.
+    """
+
+    # group subscribed to, see GROUP_CHOICES
+    group = models.CharField(max_length=32, choices=GROUP_CHOICES)
+    # language of alerts, of the registration
+    language = models.CharField(max_length=8)
+    # registration subscribed
+    registration = models.ForeignKey(SMSRegister, related_name='subscriptions')
+
+    class Meta:
+        # the unique index doubles as the index on group and language
+        unique_together = (('group', 'language', 'registration'),)
+
+
+    def __unicode__ (self):
+        return u'%s %s %s' % (self.registration_id, self.group, self.language)
+
+
+class SMSUnsubscription (models.Model):
+    """A deleted registration, for exports of changes."""
+
+    # primary key of the deleted registration
+    registration = models.IntegerField()
+    # phone number of the deleted registration
+    phone_number = models.TextField()
+    # time of deletion
+    deleted = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ('deleted',)
+
+
+    def __unicode__ (self):
+        return u'%s %s' % (self.phone_number, self.deleted)
+
+
+@receiver(post_save, sender=SMSRegister, dispatch_uid='apps.smsregister.post_save.subscribe')
+def subscribe (sender, instance, **kwargs):
+    """Keep the subscriptions of a registration up to date."""
+    instance.set_subscriptions()
+
+
+@receiver(post_delete, sender=SMSRegister, dispatch_uid='apps.smsregister.post_delete.unsubscribe')
+def unsubscribe (sender, instance, **kwargs):
+    """Keep track of a deleted registration."""
+    SMSUnsubscription.objects.create(registration=instance.pk,
+        phone_number=instance.phone_number)
@@ -5,7 +5,6 @@ Views contact
 __docformat__ = 'epytext en'
 
 
-from django.core.mail import send_mail
 from django.shortcuts import redirect
 from django.utils.translation import ugettext as _
 from django.views.generic import FormView, TemplateView
@@ -23,28 +22,15 @@ class Show (FormView):
 
 
     def form_valid (self, form):
-        SEP = u"|"
-        subject = u""
-
-        user_name = form.cleaned_data['name']
-        phone_number = form.cleaned_data['phone_number']
-        language = form.cleaned_data['lang']
-        groups = form.cleaned_data['subscribe']
-        email = form.cleaned_data['email']
-
-        upper_groups = u'|'.join(groups).upper()
-
-        body = (u"addmobile " + 
-                user_name.replace(u" ",u"") + SEP +
-                u"+995" + phone_number + SEP +
-                language + SEP +
-                u"False" + SEP +
-                u','.join(groups))
-
-        send_mail(subject, body, 'registration@myparliament.ge',['george.topouria@transparency.ge'])
-
-        new_user = SMSRegister(name=user_name, selected_language=language,
-                               phone_number=phone_number, email=email, groups=upper_groups.replace('ALL|', ''))
+        """Register for SMS alerts, subscriptions are kept by the model."""
+        # all groups are kept, ALL is ticked along with every committee
+        upper_groups = u'|'.join(form.cleaned_data['subscribe']).upper()
+
+        new_user = SMSRegister(name=form.cleaned_data['name'],
+            selected_language=form.cleaned_data['lang'],
+            phone_number=form.cleaned_data['phone_number'],
+            email=form.cleaned_data['email'],
+            groups=upper_groups)
         new_user.save()
 
         return redirect('smsregister_thanks')
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""
+Database helpers shared by the import and update commands.
+"""
+__docformat__ = 'epytext en'
+
+from itertools import islice
+from django.db import connections, router, transaction
+
+
+#: default number of objects written per query
+BATCH_SIZE = 100
+
+
+
+def batches (iterable, size=BATCH_SIZE):
+    """Split given iterable into lists of at most given size.
+
+    The iterable is consumed lazily, so it can be a generator over a file.
+
+    @param iterable: items to split
+    @type iterable: iterable
+    @param size: maximum number of items per batch
+    @type size: int
+    @return: generator of lists of items
+    @rtype: generator
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+
+def bulk_create (model, objs, batch_size=BATCH_SIZE):
+    """Insert given objects in batches.
+
+    Django's bulk_create on our version takes no batch size and runs into
+    SQLite's limit of query parameters (which the tests use), so this splits
+    the objects up first. No signals are sent and no primary keys are set on
+    the given objects.
+
+    @param model: model class of the objects
+    @type model: django.db.models.Model
+    @param objs: unsaved objects to insert
+    @type objs: [ django.db.models.Model ]
+    @param batch_size: maximum number of objects per INSERT
+    @type batch_size: int
+    @return: number of inserted objects
+    @rtype: int
+    """
+    count = 0
+    for batch in batches(objs, batch_size):
+        model.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+
+def bulk_update (model, field, values, batch_size=BATCH_SIZE):
+    """Set a field to a different value per object, one UPDATE per batch.
+
+    Django's update() writes one value to all rows, so this sets the column
+    by a CASE over the primary keys instead. No signals are sent.
+
+    @param model: model class of the objects
+    @type model: django.db.models.Model
+    @param field: name of the field to set
+    @type field: str
+    @param values: values by primary key
+    @type values: { int: object }
+    @param batch_size: maximum number of objects per UPDATE
+    @type batch_size: int
+    @return: number of updated rows
+    @rtype: int
+    """
+    using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    opts = model._meta
+    model_field = opts.get_field(field)
+    table, column, pk = qn(opts.db_table), qn(model_field.column), qn(opts.pk.column)
+
+    count = 0
+    cursor = connection.cursor()
+    for batch in batches(sorted(values.items()), batch_size):
+        sql = 'UPDATE %s SET %s = CASE %s %s END WHERE %s IN (%s)' % (
+            table, column, pk, ' '.join(['WHEN %s THEN %s'] * len(batch)),
+            pk, ', '.join(['%s'] * len(batch)))
+        params = []
+        for key, value in batch:
+            params.extend((key, model_field.get_db_prep_save(value, connection=connection)))
+        params.extend(key for key, value in batch)
+        cursor.execute(sql, params)
+        count += cursor.rowcount
+    transaction.commit_unless_managed(using=using)
+    return count
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Command process_outbox, the worker delivering queued messages.
+
+Runs until interrupted and reports the throughput of every channel in
+between. Several workers may run at the same time, the channels' limits of
+concurrent deliveries hold for all of them together.
+"""
+__docformat__ = 'epytext en'
+
+import datetime
+import time
+from optparse import make_option
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import get_models
+
+
+
+class Command (BaseCommand):
+    """Command to deliver messages queued in the outbox."""
+    args = '[<channel> ...]'
+    #: help string
+    help = 'Delivers messages queued in the outbox, of given channels or all.'
+    #: options
+    option_list = BaseCommand.option_list + (
+        make_option(
+            '--once',
+            action='store_true',
+            dest='once',
+            default=False,
+            help='Deliver the messages due now and exit.'
+        ),
+        make_option(
+            '--sleep',
+            dest='sleep',
+            type='float',
+            default=5,
+            help='Seconds to wait when no message is due.'
+        ),
+        make_option(
+            '--report',
+            dest='report',
+            type='int',
+            default=300,
+            help='Seconds between reports of throughput, 0 for none.'
+        ),
+        make_option(
+            '--metrics',
+            action='store_true',
+            dest='metrics',
+            default=False,
+            help='Print the state of the outbox over the last hour and exit.'
+        ),
+    )
+
+
+    def _write_metrics (self, since):
+        """Write the state and throughput of all channels since given time."""
+        from util import outbox
+        self.stdout.write('%-12s %8s %8s %8s %8s %10s %10s\n' % ('channel',
+            'pending', 'sending', 'failed', 'sent', 'per min', 'latency s'))
+        for name, m in sorted(outbox.get_metrics(since).iteritems()):
+            self.stdout.write('%-12s %8d %8d %8d %8d %10.2f %10s\n' % (name,
+                m.get('pending', 0), m.get('sending', 0), m.get('failed', 0),
+                m.get('sent', 0), m.get('per_minute', 0),
+                '-' if m.get('latency') is None else '%.1f' % m['latency']))
+
+
+    def _write_run (self, counts):
+        """Write what this worker delivered by channel."""
+        for name, (sent, failed, elapsed) in sorted(counts.iteritems()):
+            self.stdout.write('%s: %d sent, %d failed, %.2f s per delivery\n' % (
+                name, sent, failed, elapsed / max(1, sent + failed)))
+
+
+    def handle (self, *args, **options):
+        """Command handler."""
+        get_models() # let all apps register their channels
+        from util import outbox
+        for name in args:
+            if name not in outbox.CHANNELS:
+                raise CommandError('Unknown channel %s, known are: %s' % (
+                    name, ', '.join(sorted(outbox.CHANNELS))))
+        channels = list(args) or None
+
+        if options.get('metrics'):
+            self._write_metrics(datetime.datetime.now() - datetime.timedelta(hours=1))
+            return
+
+        started = reported = datetime.datetime.now()
+        report = datetime.timedelta(seconds=options.get('report'))
+        counts = {}
+        try:
+            while True:
+                messages = outbox.process(channels)
+                for message in messages:
+                    sent, failed, elapsed = counts.get(message.channel, (0, 0, 0.))
+                    counts[message.channel] = (sent + message.succeeded,
+                        failed + (not message.succeeded), elapsed + message.elapsed)
+                if options.get('once'):
+                    break
+
+                now = datetime.datetime.now()
+                if report and now - reported >= report:
+                    self._write_metrics(reported)
+                    reported = now
+                if not messages:
+                    time.sleep(options.get('sleep'))
+        except KeyboardInterrupt:
+            pass
+
+        self._write_run(counts)
+        self.stdout.write('Ran for %s.\n' % (datetime.datetime.now() - started))
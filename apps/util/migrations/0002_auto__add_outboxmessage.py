@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+from south.utils import datetime_utils as datetime
+from south.db import db
+from south.v2 import SchemaMigration
+from django.db import models
+
+
+class Migration(SchemaMigration):
+
+    def forwards(self, orm):
+        # Adding model 'OutboxMessage'
+        db.create_table('util_outboxmessage', (
+            ('id', self.gf('django.db.models.fields.AutoField')(primary_key=True)),
+            ('channel', self.gf('django.db.models.fields.CharField')(max_length=32, db_index=True)),
+            ('payload', self.gf('django.db.models.fields.TextField')()),
+            ('state', self.gf('django.db.models.fields.CharField')(default='pending', max_length=16, db_index=True)),
+            ('attempts', self.gf('django.db.models.fields.IntegerField')(default=0)),
+            ('created', self.gf('django.db.models.fields.DateTimeField')(auto_now_add=True, blank=True)),
+            ('next_attempt', self.gf('django.db.models.fields.DateTimeField')(default=datetime.datetime.now, db_index=True)),
+            ('sent', self.gf('django.db.models.fields.DateTimeField')(null=True, blank=True)),
+            ('response', self.gf('django.db.models.fields.TextField')(blank=True)),
+        ))
+        db.send_create_signal('util', ['OutboxMessage'])
+
+
+    def backwards(self, orm):
+        # Deleting model 'OutboxMessage'
+        db.delete_table('util_outboxmessage')
+
+
+    models = {
+        'util.announcement': {
+            'Meta': {'object_name': 'Announcement'},
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'text': ('django.db.models.fields.CharField', [], {'max_length': '255'}),
+            'url': ('django.db.models.fields.CharField', [], {'max_length': '255'})
+        },
+        'util.outboxmessage': {
+            'Meta': {'ordering': "('next_attempt', 'id')", 'object_name': 'OutboxMessage'},
+            'attempts': ('django.db.models.fields.IntegerField', [], {'default': '0'}),
+            'channel': ('django.db.models.fields.CharField', [], {'max_length': '32', 'db_index': 'True'}),
+            'created': ('django.db.models.fields.DateTimeField', [], {'auto_now_add': 'True', 'blank': 'True'}),
+            'id': ('django.db.models.fields.AutoField', [], {'primary_key': 'True'}),
+            'next_attempt': ('django.db.models.fields.DateTimeField', [], {'default': 'datetime.datetime.now', 'db_index': 'True'}),
+            'payload': ('django.db.models.fields.TextField', [], {}),
+            'response': ('django.db.models.fields.TextField', [], {'blank': 'True'}),
+            'sent': ('django.db.models.fields.DateTimeField', [], {'null': 'True', 'blank': 'True'}),
+            'state': ('django.db.models.fields.CharField', [], {'default': "'pending'", 'max_length': '16', 'db_index': 'True'})
+        }
+    }
+
+    complete_apps = ['util']
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
+import datetime
 from django.db import models
+from django.utils import simplejson
 
 
 class Announcement(models.Model):
@@ -11,3 +13,52 @@ class Announcement(models.Model):
 
     url = models.CharField(max_length=255, blank=False, help_text='Announcement url')
 
+
+
+
+class OutboxMessage (models.Model):
+    """A message to be delivered in the background, see L{util.outbox}."""
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATE_CHOICES = (
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    )
+
+    #: channel delivering the message, e.g. email
+    channel = models.CharField(max_length=32, db_index=True)
+    #: JSON encoded keyword arguments of the channel
+    payload = models.TextField()
+    #: state of delivery
+    state = models.CharField(max_length=16, choices=STATE_CHOICES,
+        default=PENDING, db_index=True)
+    #: number of delivery attempts
+    attempts = models.IntegerField(default=0)
+    #: when the message was queued
+    created = models.DateTimeField(auto_now_add=True)
+    #: when to attempt delivery next, or when a worker's claim expires
+    next_attempt = models.DateTimeField(default=datetime.datetime.now, db_index=True)
+    #: when the message was delivered
+    sent = models.DateTimeField(blank=True, null=True)
+    #: response of the channel or the last error
+    response = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ('next_attempt', 'id')
+
+
+    def __unicode__ (self):
+        return u'%s %s %s' % (self.channel, self.state, self.created)
+
+
+    def get_payload (self):
+        """Get the decoded payload.
+
+        @return: keyword arguments of the channel
+        @rtype: dict
+        """
+        return dict((str(k), v) for k, v in simplejson.loads(self.payload).iteritems())
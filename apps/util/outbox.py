@@ -0,0 +1,290 @@
+# -*- coding: utf-8 -*-
+
+"""
+Outbox of messages delivered in the background.
+
+Requests only queue a message with L{enqueue}, which is one INSERT. The
+worker, command process_outbox, delivers due messages by calling the send
+function registered for their channel, see L{register}. Failed deliveries
+are retried with exponential backoff until the channel's attempts are used
+up. Each channel has a limit of messages delivered at the same time, by all
+workers together.
+
+Send functions are called in threads of their own and must not touch the
+database; they get the payload and return the response to keep. Anything
+to be written back goes into the channel's done function, which is called
+with the message once it was sent or failed for good.
+"""
+__docformat__ = 'epytext en'
+
+import datetime
+import threading
+import time
+import urllib2
+from django.core.mail import EmailMessage, mail_managers
+from django.db.models import Count
+from django.utils import simplejson
+
+from .models import OutboxMessage
+
+
+#: seconds to wait for HTTP responses
+HTTP_TIMEOUT = 30
+#: seconds a worker may take to deliver a message before others retry it
+LEASE = 5 * 60
+#: seconds to wait before the first retry, doubled on every further one
+BACKOFF = 60
+#: maximum seconds to wait before a retry
+MAX_BACKOFF = 6 * 60 * 60
+#: registered channels by name
+CHANNELS = {}
+
+
+
+class Channel (object):
+    """A way to deliver messages."""
+
+    def __init__ (self, name, send, concurrency=1, attempts=8, done=None):
+        """
+        @param name: name of the channel
+        @type name: str
+        @param send: function called with the payload as keyword arguments,
+            returns the response, raises on failure
+        @type send: function
+        @param concurrency: maximum number of messages delivered at once
+        @type concurrency: int
+        @param attempts: maximum number of delivery attempts
+        @type attempts: int
+        @param done: function called with a message sent or failed
+        @type done: function
+        """
+        self.name = name
+        self.send = send
+        self.concurrency = concurrency
+        self.attempts = attempts
+        self.done = done
+
+
+
+def register (name, send, **kwargs):
+    """Register a channel, see L{Channel} for the arguments.
+
+    @return: the channel
+    @rtype: Channel
+    """
+    CHANNELS[name] = Channel(name, send, **kwargs)
+    return CHANNELS[name]
+
+
+
+def enqueue (channel, **payload):
+    """Queue a message for delivery.
+
+    @param channel: name of the channel to deliver with
+    @type channel: str
+    @param payload: keyword arguments of the channel's send function, JSON
+        serializable
+    @type payload: dict
+    @return: the message queued
+    @rtype: OutboxMessage
+    """
+    if channel not in CHANNELS:
+        raise KeyError('Unknown outbox channel %s' % channel)
+    return OutboxMessage.objects.create(channel=channel,
+        payload=simplejson.dumps(payload))
+
+
+
+def get_backoff (attempts):
+    """Get the time to wait before the next attempt.
+
+    @param attempts: number of attempts made
+    @type attempts: int
+    @return: time to wait
+    @rtype: datetime.timedelta
+    """
+    return datetime.timedelta(seconds=min(MAX_BACKOFF,
+        BACKOFF * 2 ** max(0, attempts - 1)))
+
+
+
+def fetch (url, data=None):
+    """Request given URL, POST if there is data.
+
+    @param url: URL to request
+    @type url: str
+    @param data: urlencoded data to post
+    @type data: str
+    @return: response code and content
+    @rtype: (int, str)
+    @raise urllib2.URLError: if the request failed, also on HTTP errors
+    """
+    handle = urllib2.urlopen(url, data, HTTP_TIMEOUT)
+    try:
+        return handle.getcode(), handle.read()
+    finally:
+        handle.close()
+
+
+
+def _claim (channel, now):
+    """Claim due messages of given channel, as many as it may deliver.
+
+    Claims are conditional updates, so concurrent workers don't deliver a
+    message twice. A claim expires after L{LEASE}.
+
+    @param channel: the channel
+    @type channel: Channel
+    @param now: current time
+    @type now: datetime.datetime
+    @return: messages claimed
+    @rtype: [ OutboxMessage ]
+    """
+    messages = OutboxMessage.objects.filter(channel=channel.name)
+    busy = messages.filter(state=OutboxMessage.SENDING,
+        next_attempt__gt=now).count()
+    if busy >= channel.concurrency:
+        return []
+
+    claimed = []
+    lease = now + datetime.timedelta(seconds=LEASE)
+    due = messages.filter(state__in=(OutboxMessage.PENDING, OutboxMessage.SENDING),
+        next_attempt__lte=now)
+    for message in due[:channel.concurrency - busy]:
+        if messages.filter(pk=message.pk, state=message.state,
+                next_attempt=message.next_attempt).update(
+                state=OutboxMessage.SENDING, next_attempt=lease):
+            message.state = OutboxMessage.SENDING
+            message.next_attempt = lease
+            claimed.append(message)
+    return claimed
+
+
+
+def _deliver (message):
+    """Call the send function of a message's channel, in a thread.
+
+    Sets the attributes succeeded, result and elapsed of the message.
+
+    @param message: message to deliver
+    @type message: OutboxMessage
+    """
+    started = time.time()
+    try:
+        result = CHANNELS[message.channel].send(**message.get_payload())
+        if result is None:
+            result = u''
+        elif isinstance(result, str):
+            result = result.decode('utf-8', 'replace')
+        message.succeeded = True
+        message.result = unicode(result)
+    except Exception, e:
+        message.succeeded = False
+        message.result = u'%s: %s' % (e.__class__.__name__, e)
+    message.elapsed = time.time() - started
+
+
+
+def _finish (message, now):
+    """Record the outcome of a delivery.
+
+    @param message: message delivered by L{_deliver}
+    @type message: OutboxMessage
+    @param now: current time
+    @type now: datetime.datetime
+    """
+    channel = CHANNELS[message.channel]
+    message.attempts += 1
+    message.response = message.result
+    if message.succeeded:
+        message.state = OutboxMessage.SENT
+        message.sent = now
+    elif message.attempts >= channel.attempts:
+        message.state = OutboxMessage.FAILED
+    else:
+        message.state = OutboxMessage.PENDING
+        message.next_attempt = now + get_backoff(message.attempts)
+    message.save()
+
+    if channel.done and message.state != OutboxMessage.PENDING:
+        channel.done(message)
+
+
+
+def process (channels=None):
+    """Deliver the messages due now, once.
+
+    Messages of all channels are delivered at the same time, each in a
+    thread of its own; the database is only used from the calling thread.
+
+    @param channels: names of the channels to deliver, all if None
+    @type channels: [ str ]
+    @return: messages processed, with attributes succeeded and elapsed
+    @rtype: [ OutboxMessage ]
+    """
+    now = datetime.datetime.now()
+    messages = []
+    for name, channel in sorted(CHANNELS.items()):
+        if channels is None or name in channels:
+            messages.extend(_claim(channel, now))
+
+    threads = [threading.Thread(target=_deliver, args=(message,))
+        for message in messages]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    now = datetime.datetime.now()
+    for message in messages:
+        _finish(message, now)
+    return messages
+
+
+
+def get_metrics (since):
+    """Get the state and throughput of the channels.
+
+    @param since: start of the period to measure throughput in
+    @type since: datetime.datetime
+    @return: by channel: number of messages by state, messages sent since
+        then and per minute, mean seconds from queueing to delivery
+    @rtype: { str: { str: float } }
+    """
+    metrics = dict((name, {
+        OutboxMessage.PENDING: 0, OutboxMessage.SENDING: 0,
+        OutboxMessage.FAILED: 0, 'sent': 0, 'per_minute': 0., 'latency': None,
+    }) for name in CHANNELS)
+
+    states = OutboxMessage.objects.exclude(state=OutboxMessage.SENT).order_by()
+    for row in states.values('channel', 'state').annotate(count=Count('pk')):
+        metrics.setdefault(row['channel'], {})[row['state']] = row['count']
+
+    minutes = max(1., (datetime.datetime.now() - since).total_seconds() / 60)
+    latencies = {}
+    sent = OutboxMessage.objects.filter(state=OutboxMessage.SENT, sent__gte=since)
+    for channel, created, delivered in sent.values_list('channel', 'created', 'sent'):
+        latencies.setdefault(channel, []).append(
+            (delivered - created).total_seconds())
+    for channel, values in latencies.iteritems():
+        metrics.setdefault(channel, {}).update({
+            'sent': len(values),
+            'per_minute': len(values) / minutes,
+            'latency': sum(values) / len(values),
+        })
+    return metrics
+
+
+
+def _send_email (subject, body, to):
+    EmailMessage(subject=subject, body=body, to=to).send()
+
+
+
+def _send_managers (subject, message):
+    mail_managers(subject, message)
+
+
+
+register('email', _send_email, concurrency=2)
+register('managers', _send_managers, concurrency=1)
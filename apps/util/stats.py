@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+"""
+Statistics helpers for precomputed distributions.
+"""
+__docformat__ = 'epytext en'
+
+
+#: percentiles kept for distributions, by name
+PERCENTILES = (
+    ('p10', 0.1),
+    ('p25', 0.25),
+    ('median', 0.5),
+    ('p75', 0.75),
+    ('p90', 0.9),
+)
+
+
+
+def percentile (values, fraction):
+    """Get a percentile of given values, interpolating linearly.
+
+    @param values: sorted values
+    @type values: [ number ]
+    @param fraction: percentile as fraction, e.g. 0.5 for the median
+    @type fraction: float
+    @return: the percentile, None if there are no values
+    @rtype: float
+    """
+    if not values:
+        return None
+
+    position = (len(values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+
+def distribution (values):
+    """Summarise given values.
+
+    @param values: values to summarise, in any order
+    @type values: [ number ]
+    @return: count, minimum, maximum, mean and L{PERCENTILES}
+    @rtype: { str: number }
+    """
+    values = sorted(values)
+    result = {
+        'count': len(values),
+        'minimum': values[0] if values else None,
+        'maximum': values[-1] if values else None,
+        'mean': float(sum(values)) / len(values) if values else None,
+    }
+    for name, fraction in PERCENTILES:
+        result[name] = percentile(values, fraction)
+    return result
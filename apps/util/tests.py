@@ -7,8 +7,17 @@ when you run "manage.py test".
 Replace this with more appropriate tests for your application.
 """
 
+import BaseHTTPServer
+import datetime
+import shutil
+import tempfile
+import threading
+from django.core.cache import get_cache
 from django.test import TestCase
 
+from util import outbox, versions
+from util.models import OutboxMessage
+
 
 class SimpleTest(TestCase):
     def test_basic_addition(self):
@@ -16,3 +25,175 @@ class SimpleTest(TestCase):
         Tests that 1 + 1 always equals 2.
         """
         self.assertEqual(1 + 1, 2)
+
+
+
+class StandInServer (object):
+    """Local HTTP server standing in for remote ones, e.g. parliament.ge.
+
+    Answers every request with the next of statuses, 200 if there are none,
+    and records them as (method, path, body) in requests.
+    """
+    def __init__ (self):
+        class Handler (BaseHTTPServer.BaseHTTPRequestHandler):
+            def respond (handler):
+                length = int(handler.headers.get('Content-Length') or 0)
+                self.requests.append((handler.command, handler.path,
+                    handler.rfile.read(length)))
+                handler.send_response(self.statuses.pop(0) if self.statuses else 200)
+                handler.end_headers()
+                handler.wfile.write('ok')
+            do_GET = do_POST = respond
+
+            def log_message (handler, *args):
+                pass
+
+        self.requests = []
+        self.statuses = []
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:%d/' % self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever,
+            kwargs={'poll_interval': 0.05})
+        self.thread.daemon = True
+        self.thread.start()
+
+
+    def close (self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+
+class OutboxTest (TestCase):
+    def setUp (self):
+        self.server = StandInServer()
+        self.done = []
+        outbox.register('test', lambda path: outbox.fetch(self.server.url + path)[1],
+            concurrency=2, attempts=2, done=self.done.append)
+
+
+    def tearDown (self):
+        self.server.close()
+        del outbox.CHANNELS['test']
+
+
+    def test_process (self):
+        for path in ('a', 'b', 'c'):
+            outbox.enqueue('test', path=path)
+
+        messages = outbox.process(['test'])
+        self.assertEqual([m.succeeded for m in messages], [True, True])
+        self.assertEqual(sorted(r[1] for r in self.server.requests), ['/a', '/b'])
+        self.assertEqual(len(self.done), 2)
+
+        messages = outbox.process(['test'])
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(self.server.requests[-1], ('GET', '/c', ''))
+
+        sent = OutboxMessage.objects.filter(state=OutboxMessage.SENT)
+        self.assertEqual([(m.attempts, m.response) for m in sent], [(1, 'ok')] * 3)
+        self.assertEqual(outbox.process(['test']), [])
+
+
+    def test_retry (self):
+        self.server.statuses = [500, 503]
+        message = outbox.enqueue('test', path='retry')
+
+        outbox.process(['test'])
+        message = OutboxMessage.objects.get(pk=message.pk)
+        self.assertEqual((message.state, message.attempts), (OutboxMessage.PENDING, 1))
+        self.assertTrue(message.response.startswith('HTTPError'))
+        self.assertTrue(message.next_attempt > datetime.datetime.now() +
+            outbox.get_backoff(1) - datetime.timedelta(seconds=5))
+        self.assertEqual(outbox.process(['test']), [])
+        self.assertEqual(self.done, [])
+
+        OutboxMessage.objects.update(next_attempt=datetime.datetime.now())
+        outbox.process(['test'])
+        message = OutboxMessage.objects.get(pk=message.pk)
+        self.assertEqual((message.state, message.attempts), (OutboxMessage.FAILED, 2))
+        self.assertEqual([m.pk for m in self.done], [message.pk])
+        self.assertEqual(len(self.server.requests), 2)
+
+
+    def test_concurrency (self):
+        leased = datetime.datetime.now() + datetime.timedelta(seconds=outbox.LEASE)
+        for path in ('a', 'b', 'c'):
+            outbox.enqueue('test', path=path)
+        OutboxMessage.objects.filter(payload__contains='"a"').update(
+            state=OutboxMessage.SENDING, next_attempt=leased)
+
+        self.assertEqual(len(outbox.process(['test'])), 1)
+
+        # an expired claim is delivered again
+        OutboxMessage.objects.filter(state=OutboxMessage.SENDING).update(
+            next_attempt=datetime.datetime.now())
+        self.assertEqual(len(outbox.process(['test'])), 2)
+
+
+    def test_get_metrics (self):
+        since = datetime.datetime.now() - datetime.timedelta(minutes=1)
+        outbox.enqueue('test', path='a')
+        outbox.enqueue('test', path='b')
+        outbox.process(['test'])
+        outbox.enqueue('test', path='c')
+
+        metrics = outbox.get_metrics(since)['test']
+        self.assertEqual((metrics['pending'], metrics['sent']), (1, 2))
+        self.assertTrue(metrics['per_minute'] > 0)
+        self.assertTrue(metrics['latency'] >= 0)
+
+
+
+class SharedCaches (object):
+    """Caches of two processes, web and worker, sharing one location like
+    memcached does, for given modules and util.versions.
+
+    Call use() to have the modules use a process' cache, and close() to
+    restore theirs.
+    """
+    def __init__ (self, *modules):
+        self.location = tempfile.mkdtemp()
+        backend = 'django.core.cache.backends.filebased.FileBasedCache'
+        self.web = get_cache(backend, LOCATION=self.location)
+        self.worker = get_cache(backend, LOCATION=self.location)
+        self.modules = dict((module, module.cache)
+            for module in (versions,) + modules)
+
+
+    def use (self, process):
+        for module in self.modules:
+            module.cache = getattr(self, process)
+
+
+    def close (self):
+        for module, cache in self.modules.iteritems():
+            module.cache = cache
+        shutil.rmtree(self.location)
+
+
+
+class VersionsTest (TestCase):
+    """Versions bumped by one process are seen by the others."""
+
+    def setUp (self):
+        self.caches = SharedCaches()
+
+
+    def tearDown (self):
+        self.caches.close()
+
+
+    def test_bump (self):
+        self.caches.use('web')
+        before = versions.get(OutboxMessage)[OutboxMessage]
+        self.assertEqual(versions.get(OutboxMessage)[OutboxMessage], before)
+
+        self.caches.use('worker')
+        self.assertEqual(versions.get(OutboxMessage)[OutboxMessage], before)
+        versions.bump(OutboxMessage)
+        bumped = versions.get(OutboxMessage)[OutboxMessage]
+        self.assertNotEqual(bumped, before)
+
+        self.caches.use('web')
+        self.assertEqual(versions.get(OutboxMessage)[OutboxMessage], bumped)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+"""
+Data versions of models, kept in the cache.
+
+A model's version changes whenever its data changes, so anything derived from
+the data can be keyed or validated by the versions of the models it was built
+from. Saves and deletes bump versions through signals (see api.models), bulk
+writes have to call L{bump} or L{bump_app} themselves.
+
+The cache has to be shared by all processes, e.g. memcached, so versions
+bumped by commands and workers reach the web server. If a version is evicted
+from the cache, a new one is made up, which only costs rebuilding what was
+derived from it.
+"""
+__docformat__ = 'epytext en'
+
+import time
+import uuid
+from django.core.cache import cache
+from django.db.models import get_app, get_models
+
+
+#: seconds versions are kept in the cache
+TIMEOUT = 60 * 60 * 24 * 30
+
+
+
+def _key (model):
+    """Get the cache key of a model's version.
+
+    @param model: model class
+    @type model: django.db.models.Model
+    @return: cache key
+    @rtype: str
+    """
+    return 'version:%s.%s' % (model._meta.app_label, model._meta.object_name.lower())
+
+
+
+def _new ():
+    """Make up a new version.
+
+    @return: unique token and time of modification
+    @rtype: (str, int)
+    """
+    return (uuid.uuid4().hex, int(time.time()))
+
+
+
+def get (*models):
+    """Get the versions of given models, with one cache query.
+
+    @param models: model classes
+    @type models: [ django.db.models.Model ]
+    @return: unique token and time of modification by model
+    @rtype: { django.db.models.Model: (str, int) }
+    """
+    keys = dict((_key(model), model) for model in models)
+    found = cache.get_many(keys.keys())
+
+    versions = {}
+    missing = {}
+    for key, model in keys.iteritems():
+        if key in found:
+            versions[model] = found[key]
+        else:
+            versions[model] = missing[key] = _new()
+    if missing:
+        cache.set_many(missing, TIMEOUT)
+    return versions
+
+
+
+def bump (*models):
+    """Give given models a new version.
+
+    @param models: model classes whose data changed
+    @type models: [ django.db.models.Model ]
+    """
+    cache.set_many(dict((_key(model), _new()) for model in models), TIMEOUT)
+
+
+
+def bump_app (*labels):
+    """Give all models of given apps a new version, e.g. after an import.
+
+    @param labels: app labels
+    @type labels: [ str ]
+    """
+    models = []
+    for label in labels:
+        models.extend(get_models(get_app(label)))
+    bump(*models)
@@ -145,6 +145,21 @@ INSTALLED_APPS = (
 
 
 
+###########################################################
+# cache
+# shared by the web server and the commands / workers, as it holds the data
+# versions (util.versions) validating cached responses and pages
+###########################################################
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '127.0.0.1:11211',
+        'KEY_PREFIX': 'shenmartav',
+    }
+}
+
+
+
 ###########################################################
 # testing-related
 ###########################################################
@@ -155,6 +170,11 @@ if 'test' in sys.argv:
             'ENGINE': 'django.db.backends.sqlite3'
         }
     }
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
 
 
 
@@ -51,7 +51,7 @@ translator.register(FamilyIncome, FamilyIncomeTranslationOptions)
 from popit.models import Person, PersonName, Organisation, OrganisationName, Position
 
 class PersonTranslationOptions (TranslationOptions):
-    fields = ('description',)
+    fields = ('description', 'primary_title', 'primary_name',)
 translator.register(Person, PersonTranslationOptions)
 
 class PersonNameTranslationOptions (TranslationOptions):
@@ -75,7 +75,8 @@ translator.register(Position, PositionTranslationOptions)
 from draftlaw.models import DraftLaw, DraftLawDiscussion, DraftLawChild
 
 class DraftLawTranslationOptions (TranslationOptions):
-    fields = ('title', 'initiator', 'author', 'status', 'summary', 'full_text',)
+    fields = ('title', 'initiator', 'author', 'status', 'summary',
+        'initiator_html', 'author_html',)
 translator.register(DraftLaw, DraftLawTranslationOptions)
 
 class DraftLawDiscussionTranslationOptions (TranslationOptions):